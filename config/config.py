@@ -21,6 +21,9 @@
 import os
 from typing import Any
 
+from celery.schedules import crontab
+from weaviate.config import AdditionalConfig, ConnectionConfig, Timeout
+
 from config.default_config import DEFAULT_CONFIG
 
 
@@ -52,6 +55,17 @@ class Config:
         self.WEAVIATE_GRPC_HOST = _get_env("WEAVIATE_GRPC_HOST")
         self.WEAVIATE_GRPC_PORT = _get_env("WEAVIATE_GRPC_PORT")
         self.WEAVIATE_API_KEY = _get_env("WEAVIATE_API_KEY")
+        self.WEAVIATE_ADDITIONAL_CONFIG = AdditionalConfig(
+            connection=ConnectionConfig(
+                session_pool_connections=int(_get_env("WEAVIATE_POOL_CONNECTIONS")),
+                session_pool_maxsize=int(_get_env("WEAVIATE_POOL_MAXSIZE")),
+            ),
+            timeout=Timeout(
+                query=int(_get_env("WEAVIATE_TIMEOUT_QUERY")),
+                insert=int(_get_env("WEAVIATE_TIMEOUT_INSERT")),
+            ),
+        )
+        self.WEAVIATE_HEALTH_CHECK_INTERVAL = int(_get_env("WEAVIATE_HEALTH_CHECK_INTERVAL"))
 
         # Redis配置
         self.REDIS_HOST = _get_env("REDIS_HOST")
@@ -68,6 +82,14 @@ class Config:
             "task_ignore_result": _get_bool_env("CELERY_TASK_IGNORE_RESULT"),
             "result_expires": int(_get_env("CELERY_RESULT_EXPIRES")),
             "broker_connection_retry_on_startup": _get_bool_env("CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP"),
+            "imports": ("internal.task.analysis_task",),
+            # 定时任务需要启动celery beat，每天凌晨汇总前一天的应用统计数据
+            "beat_schedule": {
+                "rollup-app-daily-stats": {
+                    "task": "internal.task.analysis_task.rollup_app_daily_stats",
+                    "schedule": crontab(hour=0, minute=10),
+                },
+            },
         }
 
         # 辅助Agent应用id标识
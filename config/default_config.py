@@ -41,6 +41,11 @@ DEFAULT_CONFIG = {
     "WEAVIATE_GRPC_HOST": "127.0.0.1",
     "WEAVIATE_GRPC_PORT": 50051,
     "WEAVIATE_API_KEY": "",
+    "WEAVIATE_POOL_CONNECTIONS": 20,
+    "WEAVIATE_POOL_MAXSIZE": 100,
+    "WEAVIATE_TIMEOUT_QUERY": 30,
+    "WEAVIATE_TIMEOUT_INSERT": 90,
+    "WEAVIATE_HEALTH_CHECK_INTERVAL": 30,
 
     # celery默认配置
     "CELERY_BROKER_DB": 1,
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 14:25
+@Author : caixiaorong01@outlook.com
+@File   : __init__.py
+"""
+from .ann_index_command import rebuild_ann_index_command
+from .code_executor_command import code_executor_server_command
+
+__all__ = ["rebuild_ann_index_command", "code_executor_server_command"]
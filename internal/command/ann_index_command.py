@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 14:25
+@Author : caixiaorong01@outlook.com
+@File   : ann_index_command.py
+"""
+import click
+from flask.cli import with_appcontext
+
+
+@click.command("rebuild-ann-index")
+@click.argument("dataset_ids", nargs=-1)
+@with_appcontext
+def rebuild_ann_index_command(dataset_ids: tuple[str, ...]) -> None:
+    """重建知识库的本地向量索引，未传递知识库id时重建所有知识库
+    用法: flask --app app.http.app rebuild-ann-index [DATASET_ID...]
+    """
+    from app.http.module import injector
+    from internal.model import Dataset
+    from internal.service import AnnIndexService
+    from pkg.sqlalchemy import SQLAlchemy
+
+    if len(dataset_ids) == 0:
+        db = injector.get(SQLAlchemy)
+        dataset_ids = [str(id) for id, in db.session.query(Dataset).with_entities(Dataset.id).all()]
+
+    ann_index_service = injector.get(AnnIndexService)
+    for dataset_id in dataset_ids:
+        ann_index_service.rebuild(dataset_id)
+        click.echo(f"{dataset_id}: {ann_index_service.get_index_status(dataset_id)}")
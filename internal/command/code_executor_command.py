@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 18:42
+@Author : caixiaorong01@outlook.com
+@File   : code_executor_command.py
+"""
+import os
+
+import click
+
+
+@click.command("code-executor-server")
+@click.option("--host", default="127.0.0.1", show_default=True, help="监听地址")
+@click.option("--port", default=8081, show_default=True, help="监听端口")
+@click.option("--workers", default=lambda: int(os.getenv("CODE_EXECUTOR_LOCAL_WORKERS", 4)), type=int,
+              help="沙箱进程数量")
+def code_executor_server_command(host: str, port: int, workers: int) -> None:
+    """启动本地云函数替身服务，使用本地沙箱进程池执行代码节点，沙箱并不是完整的隔离层，仅用于本地开发与测试
+    用法: flask --app app.http.app code-executor-server --port 8081
+    随后配置 FUNCTION_CALL_URL=http://127.0.0.1:8081/ 与 FUNCTION_CALL_BATCH_URL=http://127.0.0.1:8081/batch
+    """
+    from internal.core.code_executor import CodeExecutorServer, LocalCodeExecutor
+
+    code_executor = LocalCodeExecutor(
+        max_workers=workers,
+        timeout=float(os.getenv("CODE_EXECUTOR_TIMEOUT", 30)),
+        memory_limit_mb=int(os.getenv("CODE_EXECUTOR_LOCAL_MEMORY_LIMIT_MB", 1024)),
+    )
+    server = CodeExecutorServer((host, port), code_executor)
+    click.echo(f"本地云函数替身服务已启动: http://{host}:{port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -18,16 +18,21 @@
 @Author : caixiaorong01@outlook.com
 @File   : agent_queue_manager.py
 """
-import queue
+import os
 import time
 import uuid
-from queue import Queue
 from typing import Generator
 from uuid import UUID
 
 from redis import Redis
 
 from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
+from internal.core.agent.event_bus import (
+    BaseAgentEventBus,
+    MemoryAgentEventBus,
+    RedisAgentEventBus,
+    stop_signal_listener,
+)
 from internal.entity.conversation_entity import InvokeFrom
 
 
@@ -35,7 +40,9 @@ class AgentQueueManager:
     user_id: UUID
     invoke_from: InvokeFrom
     redis_client: Redis
-    _queues: dict[str, Queue]
+    _event_bus: BaseAgentEventBus
+    _belong_task_ids: set[str]
+    _stopped_task_ids: set[str]
 
     def __init__(
             self,
@@ -44,60 +51,74 @@ class AgentQueueManager:
     ) -> None:
         self.user_id = user_id
         self.invoke_from = invoke_from
-        self._queues = {}
+        self._belong_task_ids = set()
+        self._stopped_task_ids = set()
 
         from app.http.module import injector
         self.redis_client = injector.get(Redis)
 
+        # 根据AGENT_EVENT_BUS_BACKEND选择事件总线，memory为进程内队列(默认)，redis为跨进程的Redis Streams
+        if os.getenv("AGENT_EVENT_BUS_BACKEND", "memory") == "redis":
+            self._event_bus = RedisAgentEventBus(self.redis_client)
+        else:
+            self._event_bus = MemoryAgentEventBus()
+
     def listen(self, task_id: UUID) -> Generator:
         listen_timeout = 60 * 2
+        ping_interval = 10
         start_time = time.time()
         last_ping_time = 0
         first_ping_time = 0
 
-        while True:
-            try:
-                item = self.queue(task_id).get(timeout=1)
-                if item is None:
-                    break
-                if item.event not in [QueueEvent.PING]:
+        self._set_task_belong(task_id)
+        subscription = self._event_bus.subscribe(task_id)
+
+        # 停止信号通过发布订阅推送，收到后向事件流发布停止事件，注册后再检测一次停止标识避免遗漏
+        stop_signal_listener.register(self.redis_client, task_id, lambda: self._publish_stop(task_id))
+        try:
+            if self._is_stopped(task_id):
+                self._publish_stop(task_id)
+
+            while True:
+                # 阻塞读取事件直到下一次ping的时间点，无需轮询
+                elapsed_time = time.time() - start_time
+                items = subscription.read(timeout=max((last_ping_time + 1) * ping_interval - elapsed_time, 0.01))
+                for item in items:
+                    if item is None:
+                        return
                     first_ping_time = 0
-                yield item
-            except queue.Empty:
-                continue
-            finally:
+                    yield item
+
                 elapsed_time = time.time() - start_time
-                if elapsed_time // 10 > last_ping_time:
-                    self.publish(task_id, AgentThought(
+                if elapsed_time // ping_interval > last_ping_time:
+                    last_ping_time = elapsed_time // ping_interval
+                    if first_ping_time == 0:
+                        first_ping_time = time.time()
+                    yield AgentThought(
                         id=uuid.uuid4(),
                         task_id=task_id,
                         event=QueueEvent.PING
-                    ))
-                    last_ping_time = elapsed_time // 10
-                    if first_ping_time == 0:
-                        first_ping_time = time.time()
+                    )
 
                 if first_ping_time != 0 and time.time() - first_ping_time >= listen_timeout:
-                    self.publish(task_id, AgentThought(
+                    yield AgentThought(
                         id=uuid.uuid4(),
                         task_id=task_id,
                         thought="服务器繁忙,请稍后重试",
                         observation="服务器繁忙,请稍后重试",
                         event=QueueEvent.TIMEOUT
-                    ))
-                    first_ping_time = 0
-                if self._is_stopped(task_id):
-                    self.publish(task_id, AgentThought(
-                        id=uuid.uuid4(),
-                        task_id=task_id,
-                        event=QueueEvent.STOP
-                    ))
+                    )
+                    return
+        finally:
+            stop_signal_listener.unregister(task_id)
+            subscription.close()
 
     def stop_listen(self, task_id: UUID) -> None:
-        self.queue(task_id).put(None)
+        self._event_bus.close(task_id)
 
     def publish(self, task_id: UUID, agent_though: AgentThought) -> None:
-        self.queue(task_id).put(agent_though)
+        self._set_task_belong(task_id)
+        self._event_bus.publish(task_id, agent_though)
 
         if agent_though.event in [QueueEvent.STOP, QueueEvent.ERROR, QueueEvent.TIMEOUT, QueueEvent.AGENT_END]:
             self.stop_listen(task_id)
@@ -110,6 +131,22 @@ class AgentQueueManager:
             observation=str(error),
         ))
 
+    def is_publish_blocking(self, task_id: UUID) -> bool:
+        """检测推送任务事件是否会阻塞，redis事件总线及首次记录任务归属时需要访问redis"""
+        return isinstance(self._event_bus, RedisAgentEventBus) or str(task_id) not in self._belong_task_ids
+
+    def is_stop_requested(self, task_id: UUID) -> bool:
+        """检测当前进程中监听的任务是否收到了停止信号，仅读取内存状态，可在事件循环中调用"""
+        return str(task_id) in self._stopped_task_ids
+
+    def _publish_stop(self, task_id: UUID) -> None:
+        self._stopped_task_ids.add(str(task_id))
+        self.publish(task_id, AgentThought(
+            id=uuid.uuid4(),
+            task_id=task_id,
+            event=QueueEvent.STOP
+        ))
+
     def _is_stopped(self, task_id: UUID) -> bool:
         task_stopped_cache_key = self.generate_task_stopped_cache_key(task_id)
         result = self.redis_client.get(task_stopped_cache_key)
@@ -117,22 +154,19 @@ class AgentQueueManager:
             return True
         return False
 
-    def queue(self, task_id: UUID) -> Queue:
-        # 从队列字典中获取对应的任务队列信息
-        q = self._queues.get(str(task_id))
-        if not q:
-            user_prefix = "account" if self.invoke_from in [InvokeFrom.WEB_APP, InvokeFrom.DEBUGGER,
-                                                            InvokeFrom.ASSISTANT_AGENT] else "end-user"
-
-            self.redis_client.setex(
-                self.generate_task_belong_cache_key(task_id),
-                1800,
-                f"{user_prefix}-{str(self.user_id)}"
-            )
+    def _set_task_belong(self, task_id: UUID) -> None:
+        # 每个任务只记录一次归属信息，用于停止任务时校验权限
+        if str(task_id) in self._belong_task_ids:
+            return
 
-            q = Queue()
-            self._queues[str(task_id)] = q
-        return q
+        user_prefix = "account" if self.invoke_from in [InvokeFrom.WEB_APP, InvokeFrom.DEBUGGER,
+                                                        InvokeFrom.ASSISTANT_AGENT] else "end-user"
+        self.redis_client.setex(
+            self.generate_task_belong_cache_key(task_id),
+            1800,
+            f"{user_prefix}-{str(self.user_id)}"
+        )
+        self._belong_task_ids.add(str(task_id))
 
     @classmethod
     def set_stop_flag(cls, task_id: UUID, invoke_from: InvokeFrom, user_id: UUID) -> None:
@@ -156,6 +190,9 @@ class AgentQueueManager:
         stopped_cache_key = cls.generate_task_stopped_cache_key(task_id)
         redis_client.setex(stopped_cache_key, 600, 1)
 
+        # 推送停止信号，正在监听该任务的进程会立即收到
+        stop_signal_listener.publish(redis_client, task_id)
+
     @classmethod
     def generate_task_belong_cache_key(cls, task_id: UUID) -> str:
         return f"generate_task_belong:{str(task_id)}"
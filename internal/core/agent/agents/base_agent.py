@@ -20,8 +20,11 @@
 """
 from __future__ import annotations
 
+import logging
+import os
 import uuid
 from abc import abstractmethod
+from concurrent.futures import Future
 from threading import Thread
 from typing import Optional, Any, Iterator
 
@@ -34,6 +37,7 @@ from internal.core.agent.entities.agent_entity import AgentConfig, AgentState
 from internal.core.agent.entities.queue_entity import AgentResult, AgentThought, QueueEvent
 from internal.core.language_model.entities.model_entity import BaseLanguageModel
 from internal.exception import FailException
+from pkg.event_loop import submit_coroutine
 from .agent_queue_manager import AgentQueueManager
 
 
@@ -136,14 +140,28 @@ class BaseAgent(Serializable, Runnable):
         input["task_id"] = input.get("task_id", uuid.uuid4())
         input["history"] = input.get("history", [])
         input["iteration_count"] = input.get("iteration_count", 0)
-        thread = Thread(
-            target=self._agent.invoke,
-            args=(input,)
-        )
-        thread.start()
+        self._start_agent(input)
 
         yield from self._agent_queue_manager.listen(input["task_id"])
 
+    def _start_agent(self, input: AgentState) -> None:
+        """启动智能体图的执行，异步模式下作为协程运行在进程共享的事件循环中，线程模式下每次对话占用一个线程"""
+        if os.getenv("AGENT_RUNTIME_MODE", "async") == "thread":
+            Thread(target=self._agent.invoke, args=(input,)).start()
+            return
+
+        future = submit_coroutine(self._agent.ainvoke(input))
+        future.add_done_callback(self._log_agent_exception)
+
+    @classmethod
+    def _log_agent_exception(cls, future: Future) -> None:
+        """记录异步执行智能体图时的异常，节点内部已推送错误事件，此处仅用于记录日志"""
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logging.error("智能体执行出错: %(error)s", {"error": error}, exc_info=error)
+
     @property
     def agent_queue_manager(self) -> AgentQueueManager:
         return self._agent_queue_manager
@@ -19,18 +19,25 @@
 @File   : function_call_agent.py
 """
 import asyncio
+import functools
 import json
 import logging
+import os
 import re
+import threading
 import time
 import uuid
-from typing import Literal
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Literal, Optional
 
-from langchain_core.messages import HumanMessage, SystemMessage, RemoveMessage, ToolMessage, AIMessage
+from langchain_core.messages import HumanMessage, SystemMessage, RemoveMessage, ToolMessage, AIMessage, AIMessageChunk
 from langchain_core.messages import messages_to_dict
+from langchain_core.runnables import RunnableLambda
+from langchain_core.tools import BaseTool
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
+from pydantic import PrivateAttr
 
 from internal.core.agent.entities.agent_entity import (
     AgentState,
@@ -40,19 +47,50 @@ from internal.core.agent.entities.agent_entity import (
 from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
 from internal.core.language_model.entities.model_entity import ModelFeature
 from internal.exception import FailException
+from pkg.event_loop import run_coroutine_sync
 from .base_agent import BaseAgent
 
+# 并行执行工具时检测任务是否被停止的间隔(秒)
+TOOL_STOP_CHECK_INTERVAL = 0.5
+
+# 异步节点中事件推送与token计算使用的独立线程池，避免与事件循环默认执行器中的同步工具争抢线程
+_agent_event_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("AGENT_EVENT_PUBLISH_WORKERS", 8)),
+    thread_name_prefix="agent-event",
+)
+
+# 线程无法被中断，停止或超时后仍在运行的同步工具会继续在后台执行直到结束，
+# 进程内最多允许的遗留工具线程数量，超过后新的工具调用直接返回错误，避免遗留线程无限增长
+MAX_ORPHANED_TOOL_THREADS = int(os.getenv("AGENT_MAX_ORPHANED_TOOL_THREADS", 32))
+_orphaned_tool_threads = 0
+_orphaned_tool_threads_lock = threading.Lock()
+
+
+def _track_orphaned_tool_call(future: Future) -> None:
+    """记录被放弃但仍在运行的工具调用，调用结束后自动释放计数"""
+    global _orphaned_tool_threads
+    with _orphaned_tool_threads_lock:
+        _orphaned_tool_threads += 1
+
+    def _release(_: Future) -> None:
+        global _orphaned_tool_threads
+        with _orphaned_tool_threads_lock:
+            _orphaned_tool_threads -= 1
+
+    future.add_done_callback(_release)
+
 
 class FunctionCallAgent(BaseAgent):
     """基于函数调用/工具调用的智能体"""
+    _tools_by_name: dict[str, BaseTool] = PrivateAttr(None)
 
     def _build_agent(self) -> CompiledStateGraph:
         graph = StateGraph(AgentState)
         # 添加节点
         graph.add_node("preset_operation", self._preset_operation_node)
         graph.add_node("long_term_memory_recall", self._long_term_memory_recall_node)
-        graph.add_node("llm", self._llm_node)
-        graph.add_node("tools", self._tools_node)
+        graph.add_node("llm", RunnableLambda(self._llm_node, afunc=self._allm_node))
+        graph.add_node("tools", RunnableLambda(self._tools_node, afunc=self._atools_node))
 
         graph.set_entry_point("preset_operation")
         graph.add_conditional_edges("preset_operation", self._preset_operation_condition)
@@ -142,110 +180,214 @@ class FunctionCallAgent(BaseAgent):
         }
 
     def _llm_node(self, state: AgentState) -> AgentState:
+        """LLM节点，同步流式调用大语言模型"""
         # 检测当前Agent迭代次数是否符合需求
         if state["iteration_count"] > self.agent_config.max_iteration_count:
-            self.agent_queue_manager.publish(
-                state["task_id"],
-                AgentThought(
-                    id=uuid.uuid4(),
-                    task_id=state["task_id"],
-                    event=QueueEvent.AGENT_MESSAGE,
-                    thought=MAX_ITERATION_RESPONSE,
-                    message=messages_to_dict(state["messages"]),
-                    answer=MAX_ITERATION_RESPONSE,
-                    latency=0,
-                ))
-            self.agent_queue_manager.publish(
-                state["task_id"],
-                AgentThought(
-                    id=uuid.uuid4(),
-                    task_id=state["task_id"],
-                    event=QueueEvent.AGENT_END,
-                ))
-            return {"messages": [AIMessage(MAX_ITERATION_RESPONSE)],
-                    "task_id": state["task_id"],
-                    "iteration_count": state["iteration_count"],
-                    "history": state["history"],
-                    "long_term_memory": state["long_term_memory"]
-                    }
-
-        # 从智能体配置中提取大语言模型
+            return self._max_iteration_node_result(state)
+
         id = uuid.uuid4()
         start_at = time.perf_counter()
-        llm = self.llm
-
-        # 检测大语言模型实例是否有bind_tools方法，如果没有则不绑定，如果有还需要检测tools是否为空，不为空则绑定
-        if (
-                ModelFeature.TOOL_CALL in llm.features
-                and hasattr(llm, "bind_tools")
-                and callable(getattr(llm, "bind_tools"))
-                and len(self.agent_config.tools) > 0
-        ):
-            llm = llm.bind_tools(self.agent_config.tools)
+        llm = self._bind_llm_tools()
 
         # 流式调用LLM输出对应内容
         gathered = None
-        is_first_chunk = True
         generation_type = ""
         try:
             for chunk in llm.stream(state["messages"]):
-                # 修复第三方api中转导致数据为None
-                if chunk.usage_metadata is not None:
-                    chunk.usage_metadata['input_tokens'] = 0 if chunk.usage_metadata["input_tokens"] is None else \
-                        chunk.usage_metadata["input_tokens"]
-                    chunk.usage_metadata['output_tokens'] = 0 if chunk.usage_metadata["output_tokens"] is None else \
-                        chunk.usage_metadata["output_tokens"]
-                    chunk.usage_metadata['total_tokens'] = 0 if chunk.usage_metadata["total_tokens"] is None else \
-                        chunk.usage_metadata["total_tokens"]
-                if is_first_chunk:
-                    gathered = chunk
-                    is_first_chunk = False
+                gathered, generation_type = self._process_llm_chunk(
+                    state, chunk, gathered, generation_type, id, start_at,
+                )
+        except Exception as e:
+            self._handle_llm_error(state, e)
+
+        return self._build_llm_node_result(state, gathered, generation_type, id, start_at)
+
+    async def _allm_node(self, state: AgentState) -> AgentState:
+        """LLM节点异步版本，在共享事件循环中流式调用大语言模型，不占用独立线程
+        redis事件推送与token计算为阻塞操作，放到独立的事件线程池中运行，内存事件总线的推送直接在事件循环中完成
+        """
+        if state["iteration_count"] > self.agent_config.max_iteration_count:
+            return await self._run_in_event_executor(self._max_iteration_node_result, state)
+
+        id = uuid.uuid4()
+        start_at = time.perf_counter()
+        llm = self._bind_llm_tools()
+
+        gathered = None
+        generation_type = ""
+        try:
+            async for chunk in llm.astream(state["messages"]):
+                if self.agent_queue_manager.is_publish_blocking(state["task_id"]):
+                    gathered, generation_type = await self._run_in_event_executor(
+                        self._process_llm_chunk, state, chunk, gathered, generation_type, id, start_at,
+                    )
                 else:
-                    gathered += chunk
-
-                # 检测生成类型是工具参数还是文本生成
-                if not generation_type:
-                    if chunk.tool_calls:
-                        generation_type = "thought"
-                    elif chunk.content:
-                        generation_type = "message"
-
-                # 如果生成的是消息则提交智能体消息事件
-                if generation_type == "message":
-                    # 提取片段内容并检测是否开启输出审核
-                    review_config = self.agent_config.review_config
-                    content = chunk.content
-                    if review_config["enable"] and review_config["outputs_config"]["enable"]:
-                        for keyword in review_config["keywords"]:
-                            content = re.sub(re.escape(keyword), "**", content, flags=re.IGNORECASE)
-
-                    self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                        id=id,
-                        task_id=state["task_id"],
-                        event=QueueEvent.AGENT_MESSAGE,
-                        thought=content,
-                        message=messages_to_dict(state["messages"]),
-                        answer=content,
-                        latency=(time.perf_counter() - start_at),
-                    ))
+                    gathered, generation_type = self._process_llm_chunk(
+                        state, chunk, gathered, generation_type, id, start_at,
+                    )
         except Exception as e:
-            logging.exception(
-                "LLM节点发生错误, 错误信息: %(error)s",
-                {"error": str(e) or "LLM出现未知错误"}
-            )
-            self.agent_queue_manager.publish_error(state["task_id"], f"LLM节点发生错误, 错误信息: {str(e)}")
-            raise e
-
-        # 计算输入、输出token数
+            await self._run_in_event_executor(self._handle_llm_error, state, e)
+
+        return await self._run_in_event_executor(
+            self._build_llm_node_result, state, gathered, generation_type, id, start_at,
+        )
+
+    @classmethod
+    async def _run_in_event_executor(cls, func: Callable[..., Any], *args: Any) -> Any:
+        """在独立的事件线程池中执行阻塞的事件推送或token计算"""
+        return await asyncio.get_running_loop().run_in_executor(_agent_event_executor, functools.partial(func, *args))
+
+    def _max_iteration_node_result(self, state: AgentState) -> AgentState:
+        """超过最大迭代次数，直接推送预设回复并结束"""
+        self.agent_queue_manager.publish(
+            state["task_id"],
+            AgentThought(
+                id=uuid.uuid4(),
+                task_id=state["task_id"],
+                event=QueueEvent.AGENT_MESSAGE,
+                thought=MAX_ITERATION_RESPONSE,
+                message=messages_to_dict(state["messages"]),
+                answer=MAX_ITERATION_RESPONSE,
+                latency=0,
+            ))
+        self.agent_queue_manager.publish(
+            state["task_id"],
+            AgentThought(
+                id=uuid.uuid4(),
+                task_id=state["task_id"],
+                event=QueueEvent.AGENT_END,
+            ))
+        return {"messages": [AIMessage(MAX_ITERATION_RESPONSE)],
+                "task_id": state["task_id"],
+                "iteration_count": state["iteration_count"],
+                "history": state["history"],
+                "long_term_memory": state["long_term_memory"]
+                }
+
+    def _bind_llm_tools(self) -> Any:
+        """检测大语言模型实例是否有bind_tools方法，如果没有则不绑定，如果有还需要检测tools是否为空，不为空则绑定"""
+        llm = self.llm
+        if (
+                ModelFeature.TOOL_CALL in llm.features
+                and hasattr(llm, "bind_tools")
+                and callable(getattr(llm, "bind_tools"))
+                and len(self.agent_config.tools) > 0
+        ):
+            llm = llm.bind_tools(self.agent_config.tools)
+        return llm
+
+    def _handle_llm_error(self, state: AgentState, e: Exception) -> None:
+        """记录LLM调用异常并推送错误事件"""
+        logging.exception(
+            "LLM节点发生错误, 错误信息: %(error)s",
+            {"error": str(e) or "LLM出现未知错误"}
+        )
+        self.agent_queue_manager.publish_error(state["task_id"], f"LLM节点发生错误, 错误信息: {str(e)}")
+        raise e
+
+    def _publish_agent_message(self, state: AgentState, id: uuid.UUID, content: str, start_at: float) -> None:
+        """提交智能体消息片段事件，开启输出审核时替换敏感词"""
+        review_config = self.agent_config.review_config
+        if review_config["enable"] and review_config["outputs_config"]["enable"]:
+            for keyword in review_config["keywords"]:
+                content = re.sub(re.escape(keyword), "**", content, flags=re.IGNORECASE)
+
+        self.agent_queue_manager.publish(state["task_id"], AgentThought(
+            id=id,
+            task_id=state["task_id"],
+            event=QueueEvent.AGENT_MESSAGE,
+            thought=content,
+            message=messages_to_dict(state["messages"]),
+            answer=content,
+            latency=(time.perf_counter() - start_at),
+        ))
+
+    def _process_llm_chunk(
+            self,
+            state: AgentState,
+            chunk: AIMessageChunk,
+            gathered: Optional[AIMessageChunk],
+            generation_type: str,
+            id: uuid.UUID,
+            start_at: float,
+    ) -> tuple[AIMessageChunk, str]:
+        """处理流式输出的单个内容块，返回叠加后的内容与生成类型，同步与异步LLM节点共用"""
+        # 修复第三方api中转导致数据为None
+        if chunk.usage_metadata is not None:
+            chunk.usage_metadata['input_tokens'] = 0 if chunk.usage_metadata["input_tokens"] is None else \
+                chunk.usage_metadata["input_tokens"]
+            chunk.usage_metadata['output_tokens'] = 0 if chunk.usage_metadata["output_tokens"] is None else \
+                chunk.usage_metadata["output_tokens"]
+            chunk.usage_metadata['total_tokens'] = 0 if chunk.usage_metadata["total_tokens"] is None else \
+                chunk.usage_metadata["total_tokens"]
+        gathered = chunk if gathered is None else gathered + chunk
+
+        # 检测生成类型是工具参数还是文本生成
+        if not generation_type:
+            if chunk.tool_calls:
+                generation_type = "thought"
+            elif chunk.content:
+                generation_type = "message"
+
+        # 如果生成的是消息则提交智能体消息事件
+        if generation_type == "message":
+            self._publish_agent_message(state, id, chunk.content, start_at)
+
+        return gathered, generation_type
+
+    def _calculate_llm_usage(self, state: AgentState, gathered: AIMessageChunk) -> dict[str, Any]:
+        """计算输入、输出token数及总成本"""
         input_token_count = self.llm.get_num_tokens_from_messages(state["messages"])
         output_token_count = self.llm.get_num_tokens_from_messages([gathered])
 
         # 获取输入/输出价格和单位
         input_price, output_price, unit = self.llm.get_pricing()
 
-        # 计算总token+总成本
-        total_token_count = input_token_count + output_token_count
-        total_price = (input_token_count * input_price + output_token_count * output_price) * unit
+        return {
+            "message_token_count": input_token_count,
+            "message_unit_price": input_price,
+            "message_price_unit": unit,
+            "answer_token_count": output_token_count,
+            "answer_unit_price": output_price,
+            "answer_price_unit": unit,
+            "total_token_count": input_token_count + output_token_count,
+            "total_price": (input_token_count * input_price + output_token_count * output_price) * unit,
+        }
+
+    def _publish_agent_message_end(
+            self,
+            state: AgentState,
+            id: uuid.UUID,
+            usage: dict[str, Any],
+            start_at: float,
+    ) -> None:
+        """LLM直接生成answer则表示已经拿到了最终答案，推送一条空消息用于计算总token+总成本并停止监听"""
+        self.agent_queue_manager.publish(state["task_id"], AgentThought(
+            id=id,
+            task_id=state["task_id"],
+            event=QueueEvent.AGENT_MESSAGE,
+            thought="",
+            message=messages_to_dict(state["messages"]),
+            answer="",
+            latency=(time.perf_counter() - start_at),
+            **usage,
+        ))
+        self.agent_queue_manager.publish(state["task_id"], AgentThought(
+            id=uuid.uuid4(),
+            task_id=state["task_id"],
+            event=QueueEvent.AGENT_END,
+        ))
+
+    def _build_llm_node_result(
+            self,
+            state: AgentState,
+            gathered: AIMessageChunk,
+            generation_type: str,
+            id: uuid.UUID,
+            start_at: float,
+    ) -> AgentState:
+        """流式输出结束后计算用量、推送推理/消息事件并组装节点输出"""
+        usage = self._calculate_llm_usage(state, gathered)
 
         # 如果类型为推理则添加智能体推理事件
         if generation_type == "thought":
@@ -255,41 +397,12 @@ class FunctionCallAgent(BaseAgent):
                 event=QueueEvent.AGENT_THOUGHT,
                 thought=json.dumps(gathered.tool_calls, ensure_ascii=False),
                 message=messages_to_dict(state["messages"]),
-                message_token_count=input_token_count,
-                message_unit_price=input_price,
-                message_price_unit=unit,
                 answer="",
-                answer_token_count=output_token_count,
-                answer_unit_price=output_price,
-                answer_price_unit=unit,
-                total_token_count=total_token_count,
-                total_price=total_price,
                 latency=(time.perf_counter() - start_at),
+                **usage,
             ))
         elif generation_type == "message":
-            # 如果LLM直接生成answer则表示已经拿到了最终答案，推送一条空消息用于计算总token+总成本并停止监听
-            self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                id=id,
-                task_id=state["task_id"],
-                event=QueueEvent.AGENT_MESSAGE,
-                thought="",
-                message=messages_to_dict(state["messages"]),
-                message_token_count=input_token_count,
-                message_unit_price=input_price,
-                message_price_unit=unit,
-                answer="",
-                answer_token_count=output_token_count,
-                answer_unit_price=output_price,
-                answer_price_unit=unit,
-                total_token_count=total_token_count,
-                total_price=total_price,
-                latency=(time.perf_counter() - start_at),
-            ))
-            self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                id=uuid.uuid4(),
-                task_id=state["task_id"],
-                event=QueueEvent.AGENT_END,
-            ))
+            self._publish_agent_message_end(state, id, usage, start_at)
         return {"messages": [gathered],
                 "iteration_count": state["iteration_count"] + 1,
                 "task_id": state["task_id"],
@@ -297,55 +410,181 @@ class FunctionCallAgent(BaseAgent):
                 "long_term_memory": state["long_term_memory"]}
 
     def _tools_node(self, state: AgentState) -> AgentState:
-        """工具执行节点"""
-        # 将工具列表转换成字典，便于调用指定的工具
-        tools_by_name = {tool.name: tool for tool in self.agent_config.tools}
-
-        # 提取消息中的工具调用参数
+        """工具执行节点，多个工具调用使用有界线程池并行执行，工具消息与调用顺序保持一致"""
         tool_calls = state["messages"][-1].tool_calls
+        parallelism = max(min(self.agent_config.max_tool_parallelism, len(tool_calls)), 1)
+        tool_timeout = self.agent_config.tool_timeout
 
-        # 循环执行工具组装工具消息
-        messages = []
-        for tool_call in tool_calls:
-            # 创建智能体动作事件id并记录开始时间
-            id = uuid.uuid4()
-            start_at = time.perf_counter()
+        # 遗留的工具线程过多时不再启动新的工具调用
+        if _orphaned_tool_threads >= MAX_ORPHANED_TOOL_THREADS:
+            logging.warning("遗留的工具线程过多, 数量: %(count)s", {"count": _orphaned_tool_threads})
+            results = [("工具执行繁忙，请稍后重试", 0)] * len(tool_calls)
+            return self._build_tools_node_result(state, self._build_tool_messages(state, tool_calls, results))
 
-            try:
-                # 获取工具并调用工具
-                tool = tools_by_name[tool_call["name"]]
+        started_at: dict[int, float] = {}
+
+        def _invoke(index: int, tool_call: dict[str, Any]) -> tuple[Any, float]:
+            started_at[index] = time.perf_counter()
+            return self._invoke_tool(tool_call)
+
+        # 每次节点调用独立创建线程池，避免多智能体嵌套调用时共享线程池出现相互等待
+        results: list[Optional[tuple[Any, float]]] = [None] * len(tool_calls)
+        executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="agent-tool")
+        try:
+            submitted_at = time.perf_counter()
+            futures = [executor.submit(_invoke, index, tool_call) for index, tool_call in enumerate(tool_calls)]
+            pending = set(range(len(futures)))
+            timed_out = set()
+            while pending:
+                wait([futures[index] for index in pending], timeout=TOOL_STOP_CHECK_INTERVAL, return_when=FIRST_COMPLETED)
+
+                # 1.收集已完成的工具，已开始执行且运行时间超过超时时间的工具标记为超时
+                now = time.perf_counter()
+                for index in list(pending):
+                    if futures[index].done():
+                        results[index] = futures[index].result()
+                        pending.discard(index)
+                    elif tool_timeout > 0 and index in started_at and now - started_at[index] > tool_timeout:
+                        results[index] = (f"工具执行超时({tool_timeout}s)", now - started_at[index])
+                        pending.discard(index)
+                        timed_out.add(index)
+                        _track_orphaned_tool_call(futures[index])
+
+                # 2.任务被停止则取消所有未完成的工具调用，已经在运行的工具无法中断，只能放弃等待
+                if pending and self.agent_queue_manager.is_stop_requested(state["task_id"]):
+                    for index in pending:
+                        if not futures[index].cancel():
+                            _track_orphaned_tool_call(futures[index])
+                        results[index] = ("工具执行已取消", time.perf_counter() - submitted_at)
+                    break
+
+                # 3.所有线程都被超时的工具占用时，剩余的工具无法再开始执行，单独标记为未开始
+                if pending and sum(1 for index in timed_out if not futures[index].done()) >= parallelism:
+                    for index in list(pending):
+                        if futures[index].cancel():
+                            results[index] = ("工具未开始执行，并行线程均被超时的工具占用", 0)
+                            pending.discard(index)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return self._build_tools_node_result(state, self._build_tool_messages(state, tool_calls, results))
+
+    async def _atools_node(self, state: AgentState) -> AgentState:
+        """工具执行节点异步版本，异步工具直接在事件循环中并发等待，同步工具由事件循环的执行器运行"""
+        tool_calls = state["messages"][-1].tool_calls
+        tool_timeout = self.agent_config.tool_timeout
+        semaphore = asyncio.Semaphore(max(self.agent_config.max_tool_parallelism, 1))
+
+        async def _invoke(tool_call: dict[str, Any]) -> tuple[Any, float]:
+            async with semaphore:
+                start_at = time.perf_counter()
                 try:
-                    tool_result = tool.invoke(tool_call["args"])
-                except NotImplementedError as e:
-                    tool_result = asyncio.run(tool.ainvoke(tool_call["args"]))
-            except Exception as e:
-                # 添加错误工具信息
-                tool_result = f"工具执行出错: {str(e)}"
-                logging.exception(f"工具执行出错, 错误信息: {str(e)}")
-
-            # 将工具消息添加到消息列表中
-            messages.append(ToolMessage(
-                tool_call_id=tool_call["id"],
-                content=json.dumps(tool_result, ensure_ascii=False),
-                name=tool_call["name"],
-            ))
+                    return await asyncio.wait_for(self._ainvoke_tool(tool_call), tool_timeout or None)
+                except asyncio.TimeoutError:
+                    return f"工具执行超时({tool_timeout}s)", time.perf_counter() - start_at
+
+        submitted_at = time.perf_counter()
+        tasks = [asyncio.ensure_future(_invoke(tool_call)) for tool_call in tool_calls]
+        pending = set(tasks)
+        while pending:
+            _, pending = await asyncio.wait(pending, timeout=TOOL_STOP_CHECK_INTERVAL)
+            # 任务被停止则取消所有未完成的工具调用
+            if pending and self.agent_queue_manager.is_stop_requested(state["task_id"]):
+                for task in pending:
+                    task.cancel()
+                break
+
+        results = []
+        for task in tasks:
+            if task.cancelled() or not task.done():
+                results.append(("工具执行已取消", time.perf_counter() - submitted_at))
+            else:
+                results.append(task.result())
+
+        # 工具事件推送为阻塞操作，放到独立的事件线程池中运行
+        messages = await self._run_in_event_executor(self._build_tool_messages, state, tool_calls, results)
+        return self._build_tools_node_result(state, messages)
+
+    def _get_tools_by_name(self) -> dict[str, BaseTool]:
+        """将工具列表转换成字典，便于调用指定的工具，同一个智能体只构建一次"""
+        if self._tools_by_name is None:
+            self._tools_by_name = {tool.name: tool for tool in self.agent_config.tools}
+        return self._tools_by_name
+
+    def _invoke_tool(self, tool_call: dict[str, Any]) -> tuple[Any, float]:
+        """调用单个工具，返回工具结果与耗时，工具异常转换为错误信息"""
+        start_at = time.perf_counter()
+        try:
+            # 获取工具并调用工具，仅提供异步实现的工具(如MCP工具)复用共享事件循环执行
+            tool = self._get_tools_by_name()[tool_call["name"]]
+            try:
+                tool_result = tool.invoke(tool_call["args"])
+            except NotImplementedError as e:
+                tool_result = run_coroutine_sync(tool.ainvoke(tool_call["args"]))
+        except Exception as e:
+            # 添加错误工具信息
+            tool_result = f"工具执行出错: {str(e)}"
+            logging.exception(f"工具执行出错, 错误信息: {str(e)}")
 
-            # 判断执行工具的名字，提交不同事件，涵盖智能体动作以及知识库检索
-            event = (
-                QueueEvent.AGENT_ACTION
-                if tool_call["name"] != DATASET_RETRIEVAL_TOOL_NAME
-                else QueueEvent.DATASET_RETRIEVAL
-            )
-            self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                id=id,
-                task_id=state["task_id"],
-                event=event,
-                observation=json.dumps(tool_result, ensure_ascii=False),
-                tool=tool_call["name"],
-                tool_input=tool_call["args"],
-                latency=(time.perf_counter() - start_at),
-            ))
+        return tool_result, time.perf_counter() - start_at
 
+    async def _ainvoke_tool(self, tool_call: dict[str, Any]) -> tuple[Any, float]:
+        """异步调用单个工具，返回工具结果与耗时"""
+        start_at = time.perf_counter()
+        try:
+            tool = self._get_tools_by_name()[tool_call["name"]]
+            tool_result = await tool.ainvoke(tool_call["args"])
+        except Exception as e:
+            tool_result = f"工具执行出错: {str(e)}"
+            logging.exception(f"工具执行出错, 错误信息: {str(e)}")
+
+        return tool_result, time.perf_counter() - start_at
+
+    def _build_tool_messages(
+            self,
+            state: AgentState,
+            tool_calls: list[dict[str, Any]],
+            results: list[tuple[Any, float]],
+    ) -> list[ToolMessage]:
+        """按工具调用顺序提交事件并创建工具消息列表"""
+        return [
+            self._build_tool_message(state, tool_call, tool_result, latency)
+            for tool_call, (tool_result, latency) in zip(tool_calls, results)
+        ]
+
+    def _build_tool_message(
+            self,
+            state: AgentState,
+            tool_call: dict[str, Any],
+            tool_result: Any,
+            latency: float,
+    ) -> ToolMessage:
+        """根据工具执行结果提交事件并创建工具消息"""
+        # 判断执行工具的名字，提交不同事件，涵盖智能体动作以及知识库检索
+        event = (
+            QueueEvent.AGENT_ACTION
+            if tool_call["name"] != DATASET_RETRIEVAL_TOOL_NAME
+            else QueueEvent.DATASET_RETRIEVAL
+        )
+        self.agent_queue_manager.publish(state["task_id"], AgentThought(
+            id=uuid.uuid4(),
+            task_id=state["task_id"],
+            event=event,
+            observation=json.dumps(tool_result, ensure_ascii=False),
+            tool=tool_call["name"],
+            tool_input=tool_call["args"],
+            latency=latency,
+        ))
+
+        return ToolMessage(
+            tool_call_id=tool_call["id"],
+            content=json.dumps(tool_result, ensure_ascii=False),
+            name=tool_call["name"],
+        )
+
+    @classmethod
+    def _build_tools_node_result(cls, state: AgentState, messages: list[ToolMessage]) -> AgentState:
+        """组装工具节点输出"""
         return {"messages": messages,
                 "iteration_count": state["iteration_count"],
                 "task_id": state["task_id"],
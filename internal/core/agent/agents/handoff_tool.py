@@ -47,15 +47,20 @@ class HandoffTool(BaseTool):
         self._agent = agent
 
     def _run(self, *args: Any, **kwargs: Any) -> AgentState:
+        return self._agent.graph.invoke(input=self._build_agent_state(**kwargs))
+
+    async def _arun(self, *args: Any, **kwargs: Any) -> AgentState:
+        return await self._agent.graph.ainvoke(input=self._build_agent_state(**kwargs))
+
+    def _build_agent_state(self, **kwargs: Any) -> AgentState:
         task_description = kwargs.get("task_description", "")
         history = kwargs.get("history", [])
         long_term_memory = kwargs.get("long_term_memory", "")
 
-        agent_state = {
+        return {
             "messages": [self._agent.llm.convert_to_human_message(task_description, [])],
             "history": history,
             "long_term_memory": long_term_memory,
             "task_id": uuid.uuid4(),
             "iteration_count": 0
         }
-        return self._agent.graph.invoke(input=agent_state)
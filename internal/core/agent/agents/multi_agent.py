@@ -22,9 +22,10 @@ import json
 import logging
 import time
 import uuid
-from typing import Any, Literal
+from typing import Any, Literal, Optional
 
 from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableLambda
 from langgraph.constants import END
 from langgraph.graph import StateGraph
 from langgraph.graph.state import CompiledStateGraph
@@ -41,13 +42,13 @@ class MultiAgent(FunctionCallAgent):
 
         graph.add_node("preset_operation", self._preset_operation_node)
         graph.add_node("long_term_memory_recall", self._long_term_memory_recall_node)
-        graph.add_node("llm", self._llm_node)
-        graph.add_node("tools", self._tools_node)
+        graph.add_node("llm", RunnableLambda(self._llm_node, afunc=self._allm_node))
+        graph.add_node("tools", RunnableLambda(self._tools_node, afunc=self._atools_node))
 
         path_map = {END: END, "tools": "tools"}
         if len(self.collaborative_agent) > 0:
             for name in self.collaborative_agent.keys():
-                graph.add_node(name, self._sub_agent)
+                graph.add_node(name, RunnableLambda(self._sub_agent, afunc=self._asub_agent))
                 graph.add_edge(name, "llm")
                 path_map[name] = name
 
@@ -63,49 +64,94 @@ class MultiAgent(FunctionCallAgent):
         return agent
 
     def _sub_agent(self, state: AgentState) -> AgentState:
-
+        """子智能体调度节点"""
         tools_by_name = {tool.name: tool for tool in self.agent_config.tools}
-        tool_calls = state["messages"][-1].tool_calls
 
-        tool_message = []
-        messages = []
-        for tool_call in tool_calls:
-            id = uuid.uuid4()
+        dispatch_results = []
+        for tool_call in state["messages"][-1].tool_calls:
             start_at = time.perf_counter()
-            sub_agent = self.collaborative_agent.get(tool_call["name"])
+            agent_state, error = None, None
+            try:
+                agent_state = tools_by_name[tool_call["name"]].invoke(self._build_sub_agent_args(state, tool_call))
+            except Exception as e:
+                error = e
+            dispatch_results.append(self._handle_sub_agent_result(state, tool_call, agent_state, error, start_at))
+
+        return self._build_sub_agent_node_result(state, dispatch_results)
+
+    async def _asub_agent(self, state: AgentState) -> AgentState:
+        """子智能体调度节点异步版本，子智能体图同样在事件循环中异步执行"""
+        tools_by_name = {tool.name: tool for tool in self.agent_config.tools}
 
-            agent_state = None
+        dispatch_results = []
+        for tool_call in state["messages"][-1].tool_calls:
+            start_at = time.perf_counter()
+            agent_state, error = None, None
             try:
-                tool = tools_by_name[tool_call["name"]]
-                args = {
-                    "task_description": tool_call["args"]["task_description"],
-                    "history": state["history"],
-                    "long_term_memory": state["long_term_memory"]
-                }
-                agent_state = tool.invoke(args)
-                answer = f"成功调度智能体《{sub_agent.zh_name}》"
+                agent_state = await tools_by_name[tool_call["name"]].ainvoke(
+                    self._build_sub_agent_args(state, tool_call),
+                )
             except Exception as e:
-                # 添加错误工具信息
-                answer = f"{sub_agent.zh_name}执行出错: {str(e)}"
-                logging.exception(answer)
-
-            tool_message.append(ToolMessage(
-                tool_call_id=tool_call["id"],
-                content=json.dumps(answer, ensure_ascii=False),
-                name=tool_call["name"],
-            ))
-            if agent_state:
-                messages.extend(agent_state["messages"])
-            self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                id=id,
-                task_id=state["task_id"],
-                event=QueueEvent.AGENT_DISPATCH,
-                observation=json.dumps(answer, ensure_ascii=False),
-                tool=tool_call["name"],
-                tool_input=tool_call["args"],
-                latency=(time.perf_counter() - start_at),
+                error = e
+            # 调度事件推送为阻塞操作，放到独立的事件线程池中运行，避免阻塞共享事件循环
+            dispatch_results.append(await self._run_in_event_executor(
+                self._handle_sub_agent_result, state, tool_call, agent_state, error, start_at,
             ))
 
+        return self._build_sub_agent_node_result(state, dispatch_results)
+
+    @classmethod
+    def _build_sub_agent_args(cls, state: AgentState, tool_call: dict[str, Any]) -> dict[str, Any]:
+        """构建子智能体调度工具参数"""
+        return {
+            "task_description": tool_call["args"]["task_description"],
+            "history": state["history"],
+            "long_term_memory": state["long_term_memory"]
+        }
+
+    def _handle_sub_agent_result(
+            self,
+            state: AgentState,
+            tool_call: dict[str, Any],
+            agent_state: Optional[AgentState],
+            error: Optional[Exception],
+            start_at: float,
+    ) -> tuple[ToolMessage, list[Any]]:
+        """提交调度事件，返回工具消息与子智能体输出的消息列表"""
+        sub_agent = self.collaborative_agent.get(tool_call["name"])
+        if error is None:
+            answer = f"成功调度智能体《{sub_agent.zh_name}》"
+        else:
+            # 添加错误工具信息
+            answer = f"{sub_agent.zh_name}执行出错: {str(error)}"
+            logging.exception(answer, exc_info=error)
+
+        self.agent_queue_manager.publish(state["task_id"], AgentThought(
+            id=uuid.uuid4(),
+            task_id=state["task_id"],
+            event=QueueEvent.AGENT_DISPATCH,
+            observation=json.dumps(answer, ensure_ascii=False),
+            tool=tool_call["name"],
+            tool_input=tool_call["args"],
+            latency=(time.perf_counter() - start_at),
+        ))
+
+        tool_message = ToolMessage(
+            tool_call_id=tool_call["id"],
+            content=json.dumps(answer, ensure_ascii=False),
+            name=tool_call["name"],
+        )
+        return tool_message, agent_state["messages"] if agent_state else []
+
+    @classmethod
+    def _build_sub_agent_node_result(
+            cls,
+            state: AgentState,
+            dispatch_results: list[tuple[ToolMessage, list[Any]]],
+    ) -> AgentState:
+        """组装子智能体调度节点输出，工具消息在前，子智能体消息在后"""
+        tool_message = [tool_message for tool_message, _ in dispatch_results]
+        messages = [message for _, agent_messages in dispatch_results for message in agent_messages]
         return {"messages": tool_message + messages,
                 "iteration_count": state["iteration_count"],
                 "task_id": state["task_id"],
@@ -23,14 +23,16 @@ import logging
 import re
 import time
 import uuid
+from typing import Optional
 
-from langchain_core.messages import SystemMessage, messages_to_dict, HumanMessage, RemoveMessage, AIMessage
+from langchain_core.messages import SystemMessage, messages_to_dict, HumanMessage, RemoveMessage, AIMessage, \
+    AIMessageChunk
 from langchain_core.tools import render_text_description_and_args
 
 from internal.core.agent.entities.agent_entity import (
     AgentState,
     AGENT_SYSTEM_PROMPT_TEMPLATE,
-    REACT_AGENT_SYSTEM_PROMPT_TEMPLATE, MAX_ITERATION_RESPONSE,
+    REACT_AGENT_SYSTEM_PROMPT_TEMPLATE,
 )
 from internal.core.agent.entities.queue_entity import QueueEvent, AgentThought
 from internal.core.language_model.entities.model_entity import ModelFeature
@@ -103,114 +105,61 @@ class ReACTAgent(FunctionCallAgent):
             "iteration_count": state["iteration_count"]
         }
 
-    def _llm_node(self, state: AgentState) -> AgentState:
-        """重写工具调用智能体的LLM节点"""
-        # 判断当前LLM是否支持tool_call，如果是则使用FunctionCallAgent的_llm_node
+    def _process_llm_chunk(
+            self,
+            state: AgentState,
+            chunk: AIMessageChunk,
+            gathered: Optional[AIMessageChunk],
+            generation_type: str,
+            id: uuid.UUID,
+            start_at: float,
+    ) -> tuple[AIMessageChunk, str]:
+        """重写流式内容块处理，判断输出内容是否以"```json"为开头，用于区分工具调用和文本生成"""
+        # 判断当前LLM是否支持tool_call，如果是则使用FunctionCallAgent的处理逻辑
         if ModelFeature.TOOL_CALL in self.llm.features:
-            return super()._llm_node(state)
-
-        # 检测当前Agent迭代次数是否符合需求
-        if state["iteration_count"] > self.agent_config.max_iteration_count:
-            self.agent_queue_manager.publish(
-                state["task_id"],
-                AgentThought(
-                    id=uuid.uuid4(),
-                    task_id=state["task_id"],
-                    event=QueueEvent.AGENT_MESSAGE,
-                    thought=MAX_ITERATION_RESPONSE,
-                    message=messages_to_dict(state["messages"]),
-                    answer=MAX_ITERATION_RESPONSE,
-                    latency=0,
-                ))
-            self.agent_queue_manager.publish(
-                state["task_id"],
-                AgentThought(
-                    id=uuid.uuid4(),
-                    task_id=state["task_id"],
-                    event=QueueEvent.AGENT_END,
-                ))
-            return {"messages": [AIMessage(MAX_ITERATION_RESPONSE)],
-                    "task_id": state["task_id"],
-                    "history": state["history"],
-                    "long_term_memory": state["long_term_memory"],
-                    "iteration_count": state["iteration_count"]
-                    }
-
-        # 从智能体配置中提取大语言模型
-        id = uuid.uuid4()
-        start_at = time.perf_counter()
-        llm = self.llm
-
-        # 定义变量存储流式输出内容
-        gathered = None
-        is_first_chunk = True
-        generation_type = ""
-
-        # 流式输出调用LLM，并判断输出内容是否以"```json"为开头，用于区分工具调用和文本生成
-        for chunk in llm.stream(state["messages"]):
-            # 修复第三方api中转导致数据为None
-            if chunk.usage_metadata is not None:
-                chunk.usage_metadata['input_tokens'] = 0 if chunk.usage_metadata["input_tokens"] is None else \
-                    chunk.usage_metadata["input_tokens"]
-                chunk.usage_metadata['output_tokens'] = 0 if chunk.usage_metadata["output_tokens"] is None else \
-                    chunk.usage_metadata["output_tokens"]
-                chunk.usage_metadata['total_tokens'] = 0 if chunk.usage_metadata["total_tokens"] is None else \
-                    chunk.usage_metadata["total_tokens"]
-            # 处理流式输出内容块叠加
-            if is_first_chunk:
-                gathered = chunk
-                is_first_chunk = False
-            else:
-                gathered += chunk
-
-            # 如果生成的是消息则提交智能体消息事件
-            if generation_type == "message":
-                # 提取片段内容并校测是否开启输出审核
-                review_config = self.agent_config.review_config
-                content = chunk.content
-                if review_config["enable"] and review_config["outputs_config"]["enable"]:
-                    for keyword in review_config["keywords"]:
-                        content = re.sub(re.escape(keyword), "**", content, flags=re.IGNORECASE)
-
-                self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                    id=id,
-                    task_id=state["task_id"],
-                    event=QueueEvent.AGENT_MESSAGE,
-                    thought=content,
-                    message=messages_to_dict(state["messages"]),
-                    answer=content,
-                    latency=(time.perf_counter() - start_at),
-                ))
-
-            # 检测生成的类型是工具调用还是文本生成，同时赋值
-            if not generation_type:
-                # 当生成内容的长度大于等于7(```json)长度时才可以判断出类型是什么
-                if len(gathered.content.strip()) >= 7:
-                    if gathered.content.strip().startswith("```json"):
-                        generation_type = "thought"
-                    else:
-                        generation_type = "message"
-                        # 添加发布事件，避免前几个字符遗漏
-                        self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                            id=id,
-                            task_id=state["task_id"],
-                            event=QueueEvent.AGENT_MESSAGE,
-                            thought=gathered.content,
-                            message=messages_to_dict(state["messages"]),
-                            answer=gathered.content,
-                            latency=(time.perf_counter() - start_at),
-                        ))
-
-        # 计算输入、输出token数
-        input_token_count = self.llm.get_num_tokens_from_messages(state["messages"])
-        output_token_count = self.llm.get_num_tokens_from_messages([gathered])
-
-        # 获取输入/输出价格和单位
-        input_price, output_price, unit = self.llm.get_pricing()
+            return super()._process_llm_chunk(state, chunk, gathered, generation_type, id, start_at)
+
+        # 修复第三方api中转导致数据为None
+        if chunk.usage_metadata is not None:
+            chunk.usage_metadata['input_tokens'] = 0 if chunk.usage_metadata["input_tokens"] is None else \
+                chunk.usage_metadata["input_tokens"]
+            chunk.usage_metadata['output_tokens'] = 0 if chunk.usage_metadata["output_tokens"] is None else \
+                chunk.usage_metadata["output_tokens"]
+            chunk.usage_metadata['total_tokens'] = 0 if chunk.usage_metadata["total_tokens"] is None else \
+                chunk.usage_metadata["total_tokens"]
+        # 处理流式输出内容块叠加
+        gathered = chunk if gathered is None else gathered + chunk
+
+        # 如果生成的是消息则提交智能体消息事件
+        if generation_type == "message":
+            self._publish_agent_message(state, id, chunk.content, start_at)
+
+        # 检测生成的类型是工具调用还是文本生成，同时赋值
+        if not generation_type:
+            # 当生成内容的长度大于等于7(```json)长度时才可以判断出类型是什么
+            if len(gathered.content.strip()) >= 7:
+                if gathered.content.strip().startswith("```json"):
+                    generation_type = "thought"
+                else:
+                    generation_type = "message"
+                    # 添加发布事件，避免前几个字符遗漏
+                    self._publish_agent_message(state, id, gathered.content, start_at)
+
+        return gathered, generation_type
+
+    def _build_llm_node_result(
+            self,
+            state: AgentState,
+            gathered: AIMessageChunk,
+            generation_type: str,
+            id: uuid.UUID,
+            start_at: float,
+    ) -> AgentState:
+        """重写LLM节点输出组装，推理类型时解析json并转换成工具调用消息"""
+        if ModelFeature.TOOL_CALL in self.llm.features:
+            return super()._build_llm_node_result(state, gathered, generation_type, id, start_at)
 
-        # 计算总token+总成本
-        total_token_count = input_token_count + output_token_count
-        total_price = (input_token_count * input_price + output_token_count * output_price) * unit
+        usage = self._calculate_llm_usage(state, gathered)
 
         # 如果类型为推理则解析json，并添加智能体消息
         if generation_type == "thought":
@@ -231,16 +180,9 @@ class ReACTAgent(FunctionCallAgent):
                     event=QueueEvent.AGENT_THOUGHT,
                     thought=json.dumps(gathered.content, ensure_ascii=False),
                     message=messages_to_dict(state["messages"]),
-                    message_token_count=input_token_count,
-                    message_unit_price=input_price,
-                    message_price_unit=unit,
                     answer="",
-                    answer_token_count=output_token_count,
-                    answer_unit_price=output_price,
-                    answer_price_unit=unit,
-                    total_token_count=total_token_count,
-                    total_price=total_price,
                     latency=(time.perf_counter() - start_at),
+                    **usage,
                 ))
                 return {
                     "messages": [AIMessage(content="", tool_calls=tool_calls)],
@@ -251,40 +193,11 @@ class ReACTAgent(FunctionCallAgent):
                 }
             except Exception as _:
                 generation_type = "message"
-                self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                    id=id,
-                    task_id=state["task_id"],
-                    event=QueueEvent.AGENT_MESSAGE,
-                    thought=gathered.content,
-                    message=messages_to_dict(state["messages"]),
-                    answer=gathered.content,
-                    latency=(time.perf_counter() - start_at),
-                ))
+                self._publish_agent_message(state, id, gathered.content, start_at)
 
         # 如果LLM直接生成answer则表示已经拿到了最终答案，推送一条空消息用于计算总token+总成本并停止监听
         if generation_type == "message":
-            self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                id=id,
-                task_id=state["task_id"],
-                event=QueueEvent.AGENT_MESSAGE,
-                thought="",
-                message=messages_to_dict(state["messages"]),
-                message_token_count=input_token_count,
-                message_unit_price=input_price,
-                message_price_unit=unit,
-                answer="",
-                answer_token_count=output_token_count,
-                answer_unit_price=output_price,
-                answer_price_unit=unit,
-                total_token_count=total_token_count,
-                total_price=total_price,
-                latency=(time.perf_counter() - start_at),
-            ))
-            self.agent_queue_manager.publish(state["task_id"], AgentThought(
-                id=uuid.uuid4(),
-                task_id=state["task_id"],
-                event=QueueEvent.AGENT_END,
-            ))
+            self._publish_agent_message_end(state, id, usage, start_at)
 
         return {"messages": [gathered],
                 "iteration_count": state["iteration_count"] + 1,
@@ -296,8 +209,15 @@ class ReACTAgent(FunctionCallAgent):
     def _tools_node(self, state: AgentState) -> AgentState:
         """重写工具节点，处理工具节点的`AI工具调用参数消息`与`工具消息转人类消息`"""
         # 调用父类的工具节点执行并获取结果
-        super_agent_state = super()._tools_node(state)
+        return self._convert_tools_node_result(state, super()._tools_node(state))
+
+    async def _atools_node(self, state: AgentState) -> AgentState:
+        """重写异步工具节点，转换逻辑与同步版本一致"""
+        return self._convert_tools_node_result(state, await super()._atools_node(state))
 
+    @classmethod
+    def _convert_tools_node_result(cls, state: AgentState, super_agent_state: AgentState) -> AgentState:
+        """将父类工具节点的输出转换成ReACT格式的消息"""
         # 移除原始的AI工具调用参数消息，并创建新的ai消息
         tool_call_message = state["messages"][-1]
         remove_tool_call_message = RemoveMessage(id=tool_call_message.id)
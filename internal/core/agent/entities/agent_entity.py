@@ -117,6 +117,10 @@ class AgentConfig(BaseModel):
 
     max_iteration_count: int = 5
 
+    # 单轮多个工具调用的最大并行数量及单个工具的超时时间(秒)，超时时间为0表示不限制
+    max_tool_parallelism: int = 5
+    tool_timeout: float = 120
+
     # 智能体预设提示词
     system_prompt: str = AGENT_SYSTEM_PROMPT_TEMPLATE
     preset_prompt: str = ""  # 预设prompt，默认为空，该值由前端用户在编排的时候记录，并填充到system_prompt中
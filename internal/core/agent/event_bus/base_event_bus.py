@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 19:05
+@Author : caixiaorong01@outlook.com
+@File   : base_event_bus.py
+"""
+from abc import ABC, abstractmethod
+from typing import Optional
+from uuid import UUID
+
+from internal.core.agent.entities.queue_entity import AgentThought
+
+
+class AgentEventSubscription(ABC):
+    """智能体任务事件订阅，按发布顺序读取某个任务的事件"""
+
+    @abstractmethod
+    def read(self, timeout: float) -> list[Optional[AgentThought]]:
+        """读取事件，最多阻塞timeout秒，超时返回空列表，None表示事件流已结束"""
+        raise NotImplementedError("事件订阅读取函数未实现")
+
+    def close(self) -> None:
+        """关闭订阅并释放资源"""
+        pass
+
+
+class BaseAgentEventBus(ABC):
+    """智能体事件总线基础类"""
+
+    @abstractmethod
+    def publish(self, task_id: UUID, agent_thought: AgentThought) -> None:
+        """发布任务事件"""
+        raise NotImplementedError("事件总线发布函数未实现")
+
+    @abstractmethod
+    def close(self, task_id: UUID) -> None:
+        """结束任务事件流"""
+        raise NotImplementedError("事件总线结束函数未实现")
+
+    @abstractmethod
+    def subscribe(self, task_id: UUID) -> AgentEventSubscription:
+        """订阅任务事件流"""
+        raise NotImplementedError("事件总线订阅函数未实现")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 19:12
+@Author : caixiaorong01@outlook.com
+@File   : memory_event_bus.py
+"""
+import queue
+import threading
+from queue import Queue
+from typing import Optional
+from uuid import UUID
+
+from internal.core.agent.entities.queue_entity import AgentThought
+from .base_event_bus import AgentEventSubscription, BaseAgentEventBus
+
+
+class MemoryAgentEventSubscription(AgentEventSubscription):
+    """进程内队列事件订阅"""
+
+    def __init__(self, event_bus: "MemoryAgentEventBus", task_id: UUID):
+        self._event_bus = event_bus
+        self._task_id = task_id
+        self._queue = event_bus.queue(task_id)
+
+    def read(self, timeout: float) -> list[Optional[AgentThought]]:
+        try:
+            return [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+
+    def close(self) -> None:
+        self._event_bus.remove(self._task_id)
+
+
+class MemoryAgentEventBus(BaseAgentEventBus):
+    """进程内事件总线，每个任务对应一个队列，消费者必须与智能体线程位于同一进程"""
+
+    def __init__(self):
+        self._queues: dict[str, Queue] = {}
+        self._lock = threading.Lock()
+
+    def queue(self, task_id: UUID) -> Queue:
+        """获取任务对应的队列，不存在则创建"""
+        with self._lock:
+            q = self._queues.get(str(task_id))
+            if q is None:
+                q = Queue()
+                self._queues[str(task_id)] = q
+            return q
+
+    def remove(self, task_id: UUID) -> None:
+        """删除任务对应的队列"""
+        with self._lock:
+            self._queues.pop(str(task_id), None)
+
+    def publish(self, task_id: UUID, agent_thought: AgentThought) -> None:
+        self.queue(task_id).put(agent_thought)
+
+    def close(self, task_id: UUID) -> None:
+        self.queue(task_id).put(None)
+
+    def subscribe(self, task_id: UUID) -> AgentEventSubscription:
+        return MemoryAgentEventSubscription(self, task_id)
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 19:26
+@Author : caixiaorong01@outlook.com
+@File   : redis_event_bus.py
+"""
+import threading
+from typing import Optional
+from uuid import UUID
+
+from redis import Redis
+
+from internal.core.agent.entities.queue_entity import AgentThought
+from internal.entity.cache_entity import AGENT_TASK_EVENTS_STREAM
+from .base_event_bus import AgentEventSubscription, BaseAgentEventBus
+
+# 事件流过期时间，任务结束或消费者断开后由Redis自动清理
+AGENT_TASK_EVENTS_EXPIRE_TIME = 1800
+
+
+class RedisAgentEventSubscription(AgentEventSubscription):
+    """Redis Streams事件订阅，从事件流起始位置开始读取，任意进程均可消费"""
+
+    def __init__(self, redis_client: Redis, task_id: UUID, batch_size: int = 100):
+        self._redis_client = redis_client
+        self._stream_key = AGENT_TASK_EVENTS_STREAM.format(task_id=task_id)
+        self._last_id = "0-0"
+        self._batch_size = batch_size
+
+    def read(self, timeout: float) -> list[Optional[AgentThought]]:
+        # XREAD的阻塞时间单位为毫秒，0表示永久阻塞，所以至少阻塞1毫秒
+        response = self._redis_client.xread(
+            {self._stream_key: self._last_id},
+            count=self._batch_size,
+            block=max(int(timeout * 1000), 1),
+        )
+        if not response:
+            return []
+
+        items = []
+        for _, entries in response:
+            for entry_id, fields in entries:
+                self._last_id = entry_id
+                if fields.get(b"end"):
+                    items.append(None)
+                    return items
+                items.append(AgentThought.model_validate_json(fields[b"data"]))
+        return items
+
+
+class RedisAgentEventBus(BaseAgentEventBus):
+    """基于Redis Streams的跨进程事件总线，事件流可由任意gunicorn进程消费"""
+
+    def __init__(self, redis_client: Redis):
+        self._redis_client = redis_client
+        self._expired_streams: set[str] = set()
+        self._lock = threading.Lock()
+
+    def _add(self, task_id: UUID, fields: dict) -> None:
+        """追加事件，每个任务首次追加时同时设置事件流的过期时间"""
+        stream_key = AGENT_TASK_EVENTS_STREAM.format(task_id=task_id)
+        with self._lock:
+            need_expire = stream_key not in self._expired_streams
+            self._expired_streams.add(stream_key)
+
+        if need_expire:
+            pipeline = self._redis_client.pipeline(transaction=False)
+            pipeline.xadd(stream_key, fields)
+            pipeline.expire(stream_key, AGENT_TASK_EVENTS_EXPIRE_TIME)
+            pipeline.execute()
+        else:
+            self._redis_client.xadd(stream_key, fields)
+
+    def publish(self, task_id: UUID, agent_thought: AgentThought) -> None:
+        self._add(task_id, {"data": agent_thought.model_dump_json()})
+
+    def close(self, task_id: UUID) -> None:
+        self._add(task_id, {"end": 1})
+        with self._lock:
+            self._expired_streams.discard(AGENT_TASK_EVENTS_STREAM.format(task_id=task_id))
+
+    def subscribe(self, task_id: UUID) -> AgentEventSubscription:
+        return RedisAgentEventSubscription(self._redis_client, task_id)
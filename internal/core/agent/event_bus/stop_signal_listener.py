@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 19:41
+@Author : caixiaorong01@outlook.com
+@File   : stop_signal_listener.py
+"""
+import logging
+import os
+import threading
+import time
+from typing import Callable, Optional
+from uuid import UUID
+
+from redis import Redis
+from redis.client import PubSub
+
+from internal.entity.cache_entity import AGENT_TASK_STOP_CHANNEL
+
+
+class AgentStopSignalListener:
+    """智能体停止信号监听器，每个进程使用一个模式订阅连接接收所有任务的停止信号，并分发给本进程内正在监听的任务"""
+
+    def __init__(self):
+        self._callbacks: dict[str, Callable[[], None]] = {}
+        self._lock = threading.Lock()
+        self._pubsub: Optional[PubSub] = None
+        self._pid: Optional[int] = None
+
+    def register(self, redis_client: Redis, task_id: UUID, callback: Callable[[], None]) -> None:
+        """注册任务的停止回调，首次注册时启动订阅线程"""
+        self._ensure_started(redis_client)
+        with self._lock:
+            self._callbacks[str(task_id)] = callback
+
+    def unregister(self, task_id: UUID) -> None:
+        """取消注册任务的停止回调"""
+        with self._lock:
+            self._callbacks.pop(str(task_id), None)
+
+    @classmethod
+    def publish(cls, redis_client: Redis, task_id: UUID) -> None:
+        """推送任务的停止信号"""
+        redis_client.publish(AGENT_TASK_STOP_CHANNEL.format(task_id=task_id), 1)
+
+    def _ensure_started(self, redis_client: Redis) -> None:
+        """启动订阅线程，fork后的子进程需要重新启动"""
+        pid = os.getpid()
+        if self._pubsub is not None and self._pid == pid:
+            return
+
+        with self._lock:
+            if self._pubsub is not None and self._pid == pid:
+                return
+
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.psubscribe(**{AGENT_TASK_STOP_CHANNEL.format(task_id="*"): self._handle_message})
+            pubsub.run_in_thread(sleep_time=1, daemon=True, exception_handler=self._handle_exception)
+            self._pubsub = pubsub
+            self._pid = pid
+
+    def _handle_message(self, message: dict) -> None:
+        """分发停止信号给对应任务的回调"""
+        channel = message["channel"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        task_id = channel.rsplit(":", 1)[-1]
+
+        with self._lock:
+            callback = self._callbacks.get(task_id)
+        if callback is not None:
+            try:
+                callback()
+            except Exception as e:
+                logging.exception("智能体停止信号处理失败: %(error)s", {"error": e})
+
+    @classmethod
+    def _handle_exception(cls, error: Exception, pubsub: PubSub, thread: threading.Thread) -> None:
+        """订阅连接异常时记录日志并稍后重试，重连后会自动恢复订阅"""
+        logging.warning("智能体停止信号订阅连接异常: %(error)s", {"error": error})
+        time.sleep(1)
+
+
+# 进程内共享的停止信号监听器
+stop_signal_listener = AgentStopSignalListener()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 16:02
+@Author : caixiaorong01@outlook.com
+@File   : __init__.py.py
+"""
+from .code_executor import CodeExecutor, CodeExecutionResult, validate_code, load_function, run_function
+from .code_executor_factory import get_code_executor
+from .code_executor_server import CodeExecutorServer
+from .local_code_executor import LocalCodeExecutor
+from .remote_code_executor import RemoteCodeExecutor
+
+__all__ = [
+    "CodeExecutor",
+    "CodeExecutionResult",
+    "validate_code",
+    "load_function",
+    "run_function",
+    "get_code_executor",
+    "CodeExecutorServer",
+    "LocalCodeExecutor",
+    "RemoteCodeExecutor",
+]
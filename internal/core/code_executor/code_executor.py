@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 16:02
+@Author : caixiaorong01@outlook.com
+@File   : code_executor.py
+"""
+import ast
+import builtins
+import importlib
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import sha3_256
+from types import ModuleType, SimpleNamespace
+from typing import Any, Callable
+
+from internal.exception import FailException
+
+# 按代码哈希缓存已校验并编译的函数，相同代码片段只解析与编译一次
+_compiled_functions: OrderedDict[str, Callable] = OrderedDict()
+_compiled_functions_lock = threading.Lock()
+_COMPILED_FUNCTIONS_CACHE_SIZE = 256
+
+# 代码中允许使用的内置函数与异常，不包含open/exec/eval/getattr/globals等可用于逃逸或访问外部资源的函数
+_SAFE_BUILTIN_NAMES = (
+    "abs", "all", "any", "ascii", "bin", "bool", "bytes", "callable", "chr", "complex", "dict", "divmod",
+    "enumerate", "filter", "float", "format", "frozenset", "hash", "hex", "int", "isinstance", "issubclass",
+    "iter", "len", "list", "map", "max", "min", "next", "oct", "ord", "pow", "print", "range", "repr",
+    "reversed", "round", "set", "slice", "sorted", "str", "sum", "tuple", "zip",
+    "Exception", "ArithmeticError", "AssertionError", "AttributeError", "IndexError", "KeyError",
+    "LookupError", "NotImplementedError", "RuntimeError", "StopIteration", "TypeError", "ValueError",
+    "ZeroDivisionError",
+)
+
+# 代码中允许导入的标准库模块，导入时只暴露模块自身的公开成员，不暴露其引用的其他模块
+_ALLOWED_MODULES = (
+    "base64", "bisect", "collections", "copy", "datetime", "decimal", "functools", "hashlib", "heapq",
+    "itertools", "json", "math", "random", "re", "statistics", "time", "uuid",
+)
+
+# 不允许访问的属性，可通过帧/生成器/回溯对象拿到外部作用域的全局变量
+_FORBIDDEN_ATTRIBUTES = {
+    "f_back", "f_builtins", "f_code", "f_globals", "f_locals",
+    "gi_code", "gi_frame", "cr_code", "cr_frame", "ag_code", "ag_frame",
+    "tb_frame", "tb_next", "mro",
+}
+
+
+@dataclass
+class CodeExecutionResult:
+    """代码执行结果，与批量执行接口返回的单项结构保持一致"""
+    result: Any = None  # 函数返回值
+    error: str = ""  # 执行错误信息，为空表示执行成功
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "CodeExecutionResult":
+        return cls(result=data.get("result"), error=data.get("error") or "")
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"error": self.error} if self.error else {"result": self.result}
+
+    def unwrap(self) -> Any:
+        """获取函数返回值，执行失败则抛出异常"""
+        if self.error:
+            raise FailException(f"Python代码执行出错: {self.error}")
+        return self.result
+
+
+class CodeExecutor(ABC):
+    """代码执行器基础类"""
+
+    @abstractmethod
+    def execute_batch(self, code: str, args_list: list[list[Any]], func_name: str = "main") -> list[CodeExecutionResult]:
+        """使用多组参数批量执行同一段代码，单项失败不影响其他项"""
+        raise NotImplementedError("代码执行器批量执行函数未实现")
+
+    def execute(self, code: str, args: list[Any], func_name: str = "main") -> Any:
+        """执行代码中的指定函数并返回结果"""
+        return self.execute_batch(code, [args], func_name)[0].unwrap()
+
+
+def compute_code_hash(code: str, func_name: str = "main") -> str:
+    """计算代码片段的哈希值"""
+    return sha3_256(f"{func_name}:{code}".encode()).hexdigest()
+
+
+def validate_code(code: str, func_name: str = "main") -> None:
+    """校验代码只包含一个指定名字且参数为params的函数定义，不允许有额外的其他语句"""
+    try:
+        tree = ast.parse(code)
+    except SyntaxError as e:
+        raise FailException(f"Python代码语法错误: {e}")
+
+    # 循环遍历语法树，检测是否只包含唯一的函数定义
+    main_func = None
+    for node in tree.body:
+        if not isinstance(node, ast.FunctionDef):
+            raise FailException("代码中只能包含函数定义，不允许其他语句存在")
+        if node.name != func_name:
+            raise FailException(f"代码中不能包含其他函数，只能有{func_name}函数")
+        if main_func:
+            raise FailException(f"代码中只能有一个{func_name}函数")
+        if len(node.args.args) != 1 or node.args.args[0].arg != "params":
+            raise FailException(f"{func_name}函数必须只有一个参数，且参数为params")
+        main_func = node
+
+    if not main_func:
+        raise FailException(f"代码中必须包含名为{func_name}的函数")
+
+    # 禁止访问下划线开头的属性、双下划线名称以及帧相关属性，避免通过对象模型逃逸受限的执行环境
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and (node.attr.startswith("_") or node.attr in _FORBIDDEN_ATTRIBUTES):
+            raise FailException(f"代码中不允许访问属性: {node.attr}")
+        if isinstance(node, ast.Name) and node.id.startswith("__"):
+            raise FailException(f"代码中不允许使用名称: {node.id}")
+
+
+def _safe_import(name: str, globals=None, locals=None, fromlist=(), level=0) -> SimpleNamespace:
+    """受限的导入函数，只允许导入白名单中的标准库模块"""
+    if level != 0 or name not in _ALLOWED_MODULES:
+        raise ImportError(f"代码中不允许导入模块: {name}")
+    module = importlib.import_module(name)
+    return SimpleNamespace(**{
+        key: value for key, value in vars(module).items()
+        if not key.startswith("_") and not isinstance(value, ModuleType)
+    })
+
+
+def _build_safe_globals() -> dict[str, Any]:
+    """构建执行代码使用的受限全局变量"""
+    safe_builtins = {name: getattr(builtins, name) for name in _SAFE_BUILTIN_NAMES}
+    safe_builtins["__import__"] = _safe_import
+    return {"__builtins__": safe_builtins}
+
+
+def load_function(code: str, func_name: str = "main") -> Callable:
+    """校验并编译代码，返回可调用的函数，结果按代码哈希缓存"""
+    code_hash = compute_code_hash(code, func_name)
+    with _compiled_functions_lock:
+        func = _compiled_functions.get(code_hash)
+        if func is not None:
+            _compiled_functions.move_to_end(code_hash)
+            return func
+
+    # 代码通过AST校验后再在受限的全局变量中编译执行函数定义
+    validate_code(code, func_name)
+    namespace = _build_safe_globals()
+    exec(compile(code, f"<code:{code_hash[:8]}>", "exec"), namespace)
+    func = namespace.get(func_name)
+    if not callable(func):
+        raise FailException(f"{func_name}函数必须是一个可调用的函数")
+
+    with _compiled_functions_lock:
+        _compiled_functions[code_hash] = func
+        _compiled_functions.move_to_end(code_hash)
+        while len(_compiled_functions) > _COMPILED_FUNCTIONS_CACHE_SIZE:
+            _compiled_functions.popitem(last=False)
+
+    return func
+
+
+def format_error(error: Exception) -> str:
+    """将异常转换为错误信息，自定义异常优先使用message"""
+    return getattr(error, "message", "") or str(error) or error.__class__.__name__
+
+
+def run_function(code: str, func_name: str, args: list[Any]) -> CodeExecutionResult:
+    """在当前进程中执行代码函数，异常转换为执行结果中的错误信息"""
+    try:
+        return CodeExecutionResult(result=load_function(code, func_name)(*args))
+    except Exception as e:
+        return CodeExecutionResult(error=format_error(e))
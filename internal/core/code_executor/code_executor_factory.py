@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 17:48
+@Author : caixiaorong01@outlook.com
+@File   : code_executor_factory.py
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from typing import Optional
+
+from .code_executor import CodeExecutor
+from .local_code_executor import LocalCodeExecutor
+from .remote_code_executor import RemoteCodeExecutor
+
+# 进程内共享的代码执行器，按进程id区分，避免fork后子进程复用父进程的进程池
+_code_executor: Optional[CodeExecutor] = None
+_code_executor_pid: Optional[int] = None
+_code_executor_lock = threading.Lock()
+
+
+def _create_code_executor() -> CodeExecutor:
+    """根据CODE_EXECUTOR_BACKEND配置创建代码执行器，remote为云函数(默认)，local为本地沙箱进程池
+    local并不是完整的隔离层，仅用于本地开发与测试，生产环境请使用remote
+    """
+    timeout = float(os.getenv("CODE_EXECUTOR_TIMEOUT", 30))
+    if os.getenv("CODE_EXECUTOR_BACKEND", "remote") == "local":
+        if multiprocessing.current_process().daemon:
+            # 守护进程(如Celery prefork子进程)中无法创建沙箱进程池，不在当前进程内执行代码，使用云函数执行
+            logging.warning("守护进程中无法使用本地代码沙箱，代码执行器降级为远程云函数")
+        else:
+            return LocalCodeExecutor(
+                max_workers=int(os.getenv("CODE_EXECUTOR_LOCAL_WORKERS", 4)),
+                timeout=timeout,
+                memory_limit_mb=int(os.getenv("CODE_EXECUTOR_LOCAL_MEMORY_LIMIT_MB", 1024)),
+            )
+
+    return RemoteCodeExecutor(
+        url=os.getenv("FUNCTION_CALL_URL"),
+        batch_url=os.getenv("FUNCTION_CALL_BATCH_URL") or None,
+        timeout=timeout,
+        batch_window=float(os.getenv("FUNCTION_CALL_BATCH_WINDOW", 0.005)),
+        batch_max_size=int(os.getenv("FUNCTION_CALL_BATCH_MAX_SIZE", 50)),
+    )
+
+
+def get_code_executor() -> CodeExecutor:
+    """获取当前进程共享的代码执行器"""
+    global _code_executor, _code_executor_pid
+
+    pid = os.getpid()
+    if _code_executor is None or _code_executor_pid != pid:
+        with _code_executor_lock:
+            if _code_executor is None or _code_executor_pid != pid:
+                _code_executor = _create_code_executor()
+                _code_executor_pid = pid
+
+    return _code_executor
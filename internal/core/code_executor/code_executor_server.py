@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 18:20
+@Author : caixiaorong01@outlook.com
+@File   : code_executor_server.py
+"""
+import json
+import logging
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .code_executor import CodeExecutor
+
+
+class CodeExecutorServer(ThreadingHTTPServer):
+    """本地云函数替身服务，接口协议与云函数保持一致，便于离线开发与测试
+    POST /       请求: {"code", "func_name", "args"}        响应: {"result"}
+    POST /batch  请求: {"code", "func_name", "batch_args"}  响应: {"results": [{"result"} | {"error"}]}
+    """
+    daemon_threads = True
+
+    def __init__(self, server_address: tuple[str, int], code_executor: CodeExecutor):
+        super().__init__(server_address, _CodeExecutorRequestHandler)
+        self.code_executor = code_executor
+
+
+class _CodeExecutorRequestHandler(BaseHTTPRequestHandler):
+    """本地云函数替身服务请求处理器"""
+    server: CodeExecutorServer
+
+    def do_POST(self) -> None:
+        try:
+            content_length = int(self.headers.get("Content-Length", 0))
+            data = json.loads(self.rfile.read(content_length) or b"{}")
+            code = data.get("code", "")
+            func_name = data.get("func_name", "main")
+
+            if self.path.rstrip("/") == "/batch":
+                results = self.server.code_executor.execute_batch(code, data.get("batch_args", []), func_name)
+                self._send_json(200, {"results": [result.to_dict() for result in results]})
+            else:
+                result = self.server.code_executor.execute_batch(code, [data.get("args", [])], func_name)[0]
+                if result.error:
+                    self._send_json(500, {"error": result.error})
+                else:
+                    self._send_json(200, {"result": result.result})
+        except Exception as e:
+            logging.exception("本地云函数执行出错: %(error)s", {"error": e})
+            self._send_json(500, {"error": str(e)})
+
+    def _send_json(self, status_code: int, data: dict) -> None:
+        body = json.dumps(data, ensure_ascii=False).encode("utf-8")
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 16:40
+@Author : caixiaorong01@outlook.com
+@File   : local_code_executor.py
+"""
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any
+
+from internal.exception import FailException
+from .code_executor import CodeExecutor, CodeExecutionResult, format_error, run_function
+
+# 沙箱子进程中保留的环境变量，其余变量(API密钥、数据库连接、JWT密钥等)全部清除
+_SANDBOX_ENV_ALLOWLIST = ("PATH", "LANG", "LC_ALL", "TZ")
+
+
+def _init_sandbox_worker(memory_limit_mb: int) -> None:
+    """沙箱子进程初始化函数，清除继承自父进程的环境变量并限制子进程可使用的最大内存"""
+    sandbox_env = {key: os.environ[key] for key in _SANDBOX_ENV_ALLOWLIST if key in os.environ}
+    os.environ.clear()
+    os.environ.update(sandbox_env)
+
+    if memory_limit_mb <= 0:
+        return
+    try:
+        import resource
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ImportError, ValueError, OSError) as e:
+        logging.warning("代码沙箱进程内存限制设置失败: %(error)s", {"error": e})
+
+
+def _noop() -> None:
+    """预热子进程使用的空函数"""
+    return None
+
+
+class LocalCodeExecutor(CodeExecutor):
+    """本地沙箱代码执行器，使用预先启动的独立进程池执行代码，每个子进程按代码哈希缓存编译结果
+    子进程只做了环境变量清理、受限内置函数/模块导入与内存限制，并不是完整的隔离层，仅用于本地开发与测试
+    """
+
+    def __init__(self, max_workers: int = 4, timeout: float = 30, memory_limit_mb: int = 1024):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.memory_limit_mb = memory_limit_mb
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        """创建执行进程池，守护进程(如Celery prefork子进程)中不允许再创建子进程，直接抛出异常，不在当前进程内执行代码"""
+        if multiprocessing.current_process().daemon:
+            raise FailException("守护进程中无法创建本地代码沙箱进程池，请使用远程代码执行器")
+
+        # 使用spawn启动干净的子进程，避免继承父进程加载的大量模块与内存占用，内存限制才有意义
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_sandbox_worker,
+            initargs=(self.memory_limit_mb,),
+        )
+
+        # 预先启动所有子进程，避免首次执行时承担进程启动耗时
+        for future in [executor.submit(_noop) for _ in range(self.max_workers)]:
+            future.result()
+
+        return executor
+
+    def _reset_executor(self, executor: ProcessPoolExecutor) -> None:
+        """执行超时的子进程无法单独中断，终止整个进程池并重新创建"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = self._create_executor()
+
+        processes = getattr(executor, "_processes", None) or {}
+        for process in list(processes.values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def execute_batch(self, code: str, args_list: list[list[Any]], func_name: str = "main") -> list[CodeExecutionResult]:
+        """将多组参数提交到进程池并发执行，结果与参数顺序保持一致"""
+        executor = self._executor
+        futures = [executor.submit(run_function, code, func_name, args) for args in args_list]
+
+        results = []
+        timed_out = False
+        for future in futures:
+            try:
+                results.append(future.result(timeout=self.timeout))
+            except FutureTimeoutError:
+                timed_out = True
+                results.append(CodeExecutionResult(error=f"代码执行超时({self.timeout}s)"))
+            except Exception as e:
+                results.append(CodeExecutionResult(error=format_error(e)))
+
+        if timed_out:
+            self._reset_executor(executor)
+
+        return results
@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 17:15
+@Author : caixiaorong01@outlook.com
+@File   : remote_code_executor.py
+"""
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Optional
+
+from internal.exception import FailException
+from pkg.http_client import send_request
+from .code_executor import CodeExecutor, CodeExecutionResult, compute_code_hash
+
+
+class RemoteCodeExecutor(CodeExecutor):
+    """远程云函数代码执行器，复用连接池发起请求，配置批量接口后会将并发的相同代码调用合并为一次批量请求"""
+
+    def __init__(
+            self,
+            url: str,
+            batch_url: Optional[str] = None,
+            timeout: float = 30,
+            batch_window: float = 0.005,
+            batch_max_size: int = 50,
+    ):
+        self.url = url
+        self.batch_url = batch_url
+        self.timeout = timeout
+        self.batch_window = batch_window
+        self.batch_max_size = batch_max_size
+        self._lock = threading.Lock()
+        self._pending: dict[tuple[str, str], list[tuple[list[Any], Future]]] = {}
+
+    def execute(self, code: str, args: list[Any], func_name: str = "main") -> Any:
+        """执行代码，未配置批量接口时直接调用云函数，否则在合并窗口内与其他调用一起批量提交"""
+        if not self.batch_url:
+            return self._execute_single(code, func_name, args).unwrap()
+
+        key = (code, func_name)
+        future = Future()
+        batch = None
+        with self._lock:
+            pending = self._pending.setdefault(key, [])
+            pending.append((args, future))
+            if len(pending) >= self.batch_max_size:
+                # 达到单批最大数量，由当前线程立即提交
+                batch = self._pending.pop(key)
+            elif len(pending) == 1:
+                # 窗口内的首个调用负责启动定时提交
+                timer = threading.Timer(self.batch_window, self._flush, args=(key,))
+                timer.daemon = True
+                timer.start()
+
+        if batch is not None:
+            self._submit_batch(code, func_name, batch)
+
+        return future.result(timeout=self.timeout + self.batch_window).unwrap()
+
+    def execute_batch(self, code: str, args_list: list[list[Any]], func_name: str = "main") -> list[CodeExecutionResult]:
+        """批量执行代码，未配置批量接口时逐项调用云函数"""
+        if not self.batch_url:
+            return [self._execute_single(code, func_name, args) for args in args_list]
+
+        results = []
+        for start in range(0, len(args_list), self.batch_max_size):
+            results.extend(self._post_batch(code, func_name, args_list[start:start + self.batch_max_size]))
+        return results
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        """合并窗口结束，提交窗口内累积的调用"""
+        with self._lock:
+            batch = self._pending.pop(key, None)
+        if batch:
+            self._submit_batch(key[0], key[1], batch)
+
+    def _submit_batch(self, code: str, func_name: str, batch: list[tuple[list[Any], Future]]) -> None:
+        """提交一批调用并将结果分发给各自的Future"""
+        try:
+            results = self._post_batch(code, func_name, [args for args, _ in batch])
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _execute_single(self, code: str, func_name: str, args: list[Any]) -> CodeExecutionResult:
+        """调用云函数执行单次代码"""
+        response = send_request(
+            "post",
+            self.url,
+            json={"code": code, "func_name": func_name, "args": args},
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            logging.error("云函数返回异常: %(reason)s", {"reason": response.reason})
+            raise FailException("云函数返回异常")
+
+        return CodeExecutionResult(result=response.json()["result"])
+
+    def _post_batch(self, code: str, func_name: str, args_list: list[list[Any]]) -> list[CodeExecutionResult]:
+        """调用云函数批量接口，一次请求执行多组参数"""
+        response = send_request(
+            "post",
+            self.batch_url,
+            json={
+                "code": code,
+                "code_hash": compute_code_hash(code, func_name),
+                "func_name": func_name,
+                "batch_args": args_list,
+            },
+            timeout=self.timeout,
+        )
+        if response.status_code != 200:
+            logging.error("云函数批量接口返回异常: %(reason)s", {"reason": response.reason})
+            raise FailException("云函数返回异常")
+
+        results = response.json().get("results", [])
+        if len(results) != len(args_list):
+            raise FailException("云函数批量接口返回结果数量不匹配")
+
+        return [CodeExecutionResult.from_dict(result) for result in results]
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 11:02
+@Author : caixiaorong01@outlook.com
+@File   : hash_cache_embeddings.py
+"""
+from array import array
+from typing import Optional
+
+from langchain_core.embeddings import Embeddings
+from redis import Redis
+
+from internal.entity.cache_entity import (
+    EMBEDDINGS_CACHE_KEY,
+    EMBEDDINGS_CACHE_HIT_COUNT,
+    EMBEDDINGS_CACHE_MISS_COUNT,
+)
+from internal.lib.helper import generate_text_hash
+
+
+class HashCacheEmbeddings(Embeddings):
+    """以 模型名称+文本哈希 为键的向量缓存，相同内容的片段在重复上传、跨知识库时直接复用向量。
+    缓存键带有过期时间，配合Redis的volatile-lru淘汰策略即可实现TTL/LRU淘汰。
+    """
+
+    def __init__(self, embeddings: Embeddings, redis_client: Redis, model: str, ttl: Optional[int] = None):
+        self.embeddings = embeddings
+        self.redis_client = redis_client
+        self.model = model
+        self.ttl = ttl
+
+    def _cache_key(self, text: str) -> str:
+        return EMBEDDINGS_CACHE_KEY.format(model=self.model, text_hash=generate_text_hash(text))
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """优先从缓存中获取向量，未命中的文本去重后通过一次请求完成向量化并回写缓存"""
+        if len(texts) == 0:
+            return []
+
+        # 1.批量读取缓存
+        keys = [self._cache_key(text) for text in texts]
+        cached_vectors = self.redis_client.mget(keys)
+        vectors: list[Optional[list[float]]] = [
+            array("f", cached_vector).tolist() if cached_vector is not None else None
+            for cached_vector in cached_vectors
+        ]
+
+        # 2.对未命中的文本按缓存键去重，相同内容只请求一次
+        missing_keys = {}
+        for index, vector in enumerate(vectors):
+            if vector is None:
+                missing_keys.setdefault(keys[index], texts[index])
+
+        # 3.向量化未命中的文本并回写缓存
+        if missing_keys:
+            missing_vectors = dict(zip(
+                missing_keys.keys(),
+                self.embeddings.embed_documents(list(missing_keys.values())),
+            ))
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for key, vector in missing_vectors.items():
+                pipeline.set(key, array("f", vector).tobytes(), ex=self.ttl)
+            pipeline.execute()
+            vectors = [vector if vector is not None else missing_vectors[key] for key, vector in zip(keys, vectors)]
+
+        # 4.记录命中统计
+        miss_count = sum(1 for cached_vector in cached_vectors if cached_vector is None)
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.incrby(EMBEDDINGS_CACHE_HIT_COUNT.format(model=self.model), len(texts) - miss_count)
+        pipeline.incrby(EMBEDDINGS_CACHE_MISS_COUNT.format(model=self.model), miss_count)
+        pipeline.execute()
+
+        return vectors
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+    def get_metrics(self) -> dict:
+        """获取缓存命中统计数据"""
+        hit_count, miss_count = [
+            int(count or 0) for count in self.redis_client.mget([
+                EMBEDDINGS_CACHE_HIT_COUNT.format(model=self.model),
+                EMBEDDINGS_CACHE_MISS_COUNT.format(model=self.model),
+            ])
+        ]
+        total_count = hit_count + miss_count
+        return {
+            "model": self.model,
+            "hit_count": hit_count,
+            "miss_count": miss_count,
+            "hit_rate": hit_count / total_count if total_count > 0 else 0,
+        }
@@ -59,15 +59,18 @@ class FileExtractor:
         """加载传入的upload_file记录，返回LangChain文档列表或者字符串"""
         # 创建一个临时的文件夹
         with tempfile.TemporaryDirectory() as temp_dir:
-            # 构建一个临时文件路径
-            file_path = os.path.join(temp_dir, os.path.basename(upload_file.key))
-
             # 将对象存储中的文件下载到本地
-            self.cos_service.download_file(upload_file.key, file_path)
+            file_path = self.download(upload_file, temp_dir)
 
             # 从指定的路径中去加载文件
             return self.load_from_file(file_path, return_text, is_unstructured)
 
+    def download(self, upload_file: UploadFile, target_dir: str) -> str:
+        """将upload_file记录对应的对象存储文件下载到指定文件夹，并返回本地文件路径"""
+        file_path = os.path.join(target_dir, os.path.basename(upload_file.key))
+        self.cos_service.download_file(upload_file.key, file_path)
+        return file_path
+
     @classmethod
     def load_from_url(cls, url: str, return_text: bool = False) -> Union[list[LCDocument], str]:
         """从传入的URL中去加载数据，返回LangChain文档列表或者字符串"""
@@ -18,9 +18,14 @@
 @Author : caixiaorong01@outlook.com
 @File   : token_buffer_memory.py
 """
+import os
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
+from typing import Optional
+from uuid import UUID
 
-from langchain_core.messages import AnyMessage, AIMessage, trim_messages, get_buffer_string
+from langchain_core.messages import AnyMessage, AIMessage, HumanMessage, get_buffer_string
 from sqlalchemy import desc
 
 from internal.core.language_model.entities.model_entity import BaseLanguageModel
@@ -29,6 +34,54 @@ from internal.model import Conversation, Message
 from pkg.sqlalchemy import SQLAlchemy
 
 
+@dataclass
+class _HistoryMessage:
+    """缓存的单轮历史消息，包含转换后的人类/AI消息及预先计算的token数"""
+    human_message: HumanMessage
+    ai_message: AIMessage
+    token_count: int
+
+
+class HistoryMessageCache:
+    """历史消息进程级LRU缓存，键为模型+是否多模态+消息id，已完成的消息内容不会再变化，每条消息只需转换与计算token一次"""
+
+    def __init__(self, max_size: int):
+        self._max_size = max_size
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, bool, str], _HistoryMessage] = OrderedDict()
+
+    def get_many(self, model_key: str, multimodal: bool, message_ids: list[UUID]) -> dict[str, _HistoryMessage]:
+        """批量获取已缓存的历史消息"""
+        entries = {}
+        with self._lock:
+            for message_id in message_ids:
+                key = (model_key, multimodal, str(message_id))
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._entries.move_to_end(key)
+                    entries[str(message_id)] = entry
+        return entries
+
+    def set_many(self, model_key: str, multimodal: bool, entries: dict[str, _HistoryMessage]) -> None:
+        """批量写入历史消息并淘汰最久未使用的记录"""
+        with self._lock:
+            for message_id, entry in entries.items():
+                key = (model_key, multimodal, message_id)
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+
+# 进程级历史消息缓存
+history_message_cache = HistoryMessageCache(max_size=int(os.getenv("TOKEN_BUFFER_MEMORY_CACHE_SIZE", 10000)))
+
+
 @dataclass
 class TokenBufferMemory:
     """缓存记忆组件"""
@@ -47,28 +100,59 @@ class TokenBufferMemory:
         # 判断会话是否存在
         if self.conversation is None:
             return []
-        messages = self.db.session.query(Message).filter(
+
+        # 只查询最近消息的id，已缓存的消息无需重新加载与计算token，新的对话轮次增量加载
+        message_ids = [row.id for row in self.db.session.query(Message.id).filter(
             Message.conversation_id == self.conversation.id,
             Message.answer != "",
             Message.is_deleted == False,
             Message.status.in_([MessageStatus.STOP, MessageStatus.NORMAL, MessageStatus.TIMEOUT]),
-        ).order_by(desc("created_at")).limit(message_limit).all()
-        messages = list(reversed(messages))
+        ).order_by(desc("created_at")).limit(message_limit).all()]
+        if not message_ids:
+            return []
+
+        model_key = self._get_model_key()
+        history_messages = history_message_cache.get_many(model_key, multimodal, message_ids)
+        missing_ids = [message_id for message_id in message_ids if str(message_id) not in history_messages]
+        if missing_ids:
+            loaded_messages = {
+                str(message.id): self._build_history_message(message, multimodal)
+                for message in self.db.session.query(Message).filter(Message.id.in_(missing_ids)).all()
+            }
+            history_messages.update(loaded_messages)
+            history_message_cache.set_many(model_key, multimodal, loaded_messages)
 
+        # 从最新的一轮对话开始向前滑动，累加预先计算的token数，超过限制则停止，结果以人类消息开始、AI消息结束
         prompt_messages = []
-        for message in messages:
-            prompt_messages.extend([
-                self.model_instance.convert_to_human_message(message.query, message.image_urls, multimodal),
-                AIMessage(content=message.answer),
-            ])
-        return trim_messages(
-            messages=prompt_messages,
-            max_tokens=max_token_limit,
-            token_counter=self.model_instance,
-            strategy="last",
-            start_on="human",
-            end_on="ai"
+        token_count = 0
+        for message_id in message_ids:
+            history_message = history_messages.get(str(message_id))
+            if history_message is None:
+                continue
+            token_count += history_message.token_count
+            if token_count > max_token_limit:
+                break
+            # 图执行时会为消息写入id，返回副本避免修改缓存中的消息
+            prompt_messages[:0] = [history_message.human_message.model_copy(), history_message.ai_message.model_copy()]
+
+        return prompt_messages
+
+    def _build_history_message(self, message: Message, multimodal: bool) -> _HistoryMessage:
+        """将消息记录转换成人类/AI消息并计算token数"""
+        human_message = self.model_instance.convert_to_human_message(message.query, message.image_urls, multimodal)
+        ai_message = AIMessage(content=message.answer)
+        return _HistoryMessage(
+            human_message=human_message,
+            ai_message=ai_message,
+            token_count=self.model_instance.get_num_tokens_from_messages([human_message, ai_message]),
+        )
+
+    def _get_model_key(self) -> str:
+        """不同模型的分词方式不同，token数需要按模型区分缓存"""
+        model_name: Optional[str] = getattr(self.model_instance, "model_name", None) or getattr(
+            self.model_instance, "model", None,
         )
+        return f"{self.model_instance.__class__.__name__}:{model_name or ''}"
 
     def get_history_prompt_text(
             self,
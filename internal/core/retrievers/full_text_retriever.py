@@ -18,7 +18,6 @@
 @Author : caixiaorong01@outlook.com
 @File   : full_text_retriever.py
 """
-from collections import Counter
 from typing import List
 from uuid import UUID
 
@@ -26,8 +25,9 @@ from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document as LCDocument
 from langchain_core.retrievers import BaseRetriever
 from pydantic import Field
+from sqlalchemy import func, desc
 
-from internal.model import KeywordTable, Segment
+from internal.model import SegmentKeyword, Segment
 from internal.service import JiebaService
 from pkg.sqlalchemy import SQLAlchemy
 
@@ -43,22 +43,15 @@ class FullTextRetriever(BaseRetriever):
     def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[LCDocument]:
         # 查询query转化成的关键词
         keywords = self.jieba_service.extract_keywords(query, 10)
-        # 查询指定知识库的关键词表
-        keyword_tables = [keyword_table for keyword_table, in
-                          self.db.session.query(KeywordTable).with_entities(KeywordTable.keyword_table).filter(
-                              KeywordTable.dataset_id.in_(self.dataset_ids)
-                          ).all()]
-        # 便利所有的知识库关键词表，找到匹配query关键词的id列表
-        all_ids = []
-        for keyword_table in keyword_tables:
-            for keyword, segment_ids in keyword_table.items():
-                if keyword in keywords:
-                    all_ids.extend(segment_ids)
-        # 统计segment_id出现的频率
-        id_counter = Counter(all_ids)
-        # 获取前k条数据
+        # 在倒排表中只查找命中query关键词的记录，按片段命中的关键词数量降序获取前k条数据
         k = self.search_kwargs.get('k', 4)
-        top_k_ids = id_counter.most_common(k)
+        top_k_ids = self.db.session.query(
+            SegmentKeyword.segment_id,
+            func.count(SegmentKeyword.id).label("freq"),
+        ).filter(
+            SegmentKeyword.dataset_id.in_(self.dataset_ids),
+            SegmentKeyword.keyword.in_(keywords),
+        ).group_by(SegmentKeyword.segment_id).order_by(desc("freq")).limit(k).all()
         segments = self.db.session.query(Segment).filter(
             Segment.id.in_([id for id, _ in top_k_ids])
         ).all()
@@ -66,7 +59,7 @@ class FullTextRetriever(BaseRetriever):
             str(segment.id): segment for segment in segments
         }
         # 根据频率排序
-        sorted_segments = [segment_dict[str(id)] for id, freq in top_k_ids if id in segment_dict]
+        sorted_segments = [segment_dict[str(id)] for id, freq in top_k_ids if str(id) in segment_dict]
         # 构建langchain文档列表
         lc_documents = [LCDocument(
             page_content=segment.content,
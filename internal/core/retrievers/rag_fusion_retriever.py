@@ -18,33 +18,89 @@
 @Author : caixiaorong01@outlook.com
 @File   : rag_fusion_retriever.py
 """
+import json
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 from typing import List
 
-from langchain.load import dumps, loads
 from langchain.retrievers import MultiQueryRetriever
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
 from langchain_core.documents import Document
+from langchain_core.language_models import BaseLanguageModel
+from langchain_core.prompts import BasePromptTemplate
+
+from internal.lib.helper import generate_text_hash
+
+# 进程内缓存LLM针对相同问题生成的子查询，键包含LLM链配置的哈希，避免不同配置间串用
+_generated_queries_cache: OrderedDict[str, List[str]] = OrderedDict()
+_generated_queries_cache_lock = threading.Lock()
+_GENERATED_QUERIES_CACHE_SIZE = 1024
 
 
 class RAGFusionRetriever(MultiQueryRetriever):
     """RAG多查询结果融合检索器"""
     k: int = 4
+    max_concurrency: int = 4
+    query_timeout: float = 10
 
     def __init__(self, k: int = 4, **kwargs):
         super().__init__(**kwargs)
         self.k = k
 
+    def generate_queries(
+            self, question: str, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[str]:
+        """生成子查询，相同问题直接复用缓存结果"""
+        cache_key = generate_text_hash(f"{self._get_llm_chain_key()}:{question}")
+        with _generated_queries_cache_lock:
+            if cache_key in _generated_queries_cache:
+                _generated_queries_cache.move_to_end(cache_key)
+                return list(_generated_queries_cache[cache_key])
+
+        queries = super().generate_queries(question, run_manager)
+        with _generated_queries_cache_lock:
+            _generated_queries_cache[cache_key] = list(queries)
+            if len(_generated_queries_cache) > _GENERATED_QUERIES_CACHE_SIZE:
+                _generated_queries_cache.popitem(last=False)
+        return queries
+
+    def _get_llm_chain_key(self) -> str:
+        """获取LLM链的稳定标识，只包含提示模板与模型参数(模型名、温度等)，不包含客户端对象等每次新建都会变化的内容"""
+        parts = []
+        for step in getattr(self.llm_chain, "steps", [self.llm_chain]):
+            if isinstance(step, (BasePromptTemplate, BaseLanguageModel)):
+                parts.append(json.dumps(step.dict(), sort_keys=True, ensure_ascii=False, default=str))
+            else:
+                parts.append(step.__class__.__name__)
+        return "|".join(parts)
+
     def retrieve_documents(
             self, queries: List[str], run_manager: CallbackManagerForRetrieverRun
     ) -> List[List]:
-        """重写检索文档，返回二层嵌套的列表"""
-        documents = []
-        for query in queries:
-            docs = self.retriever.invoke(
-                query, config={"callbacks": run_manager.get_child()}
-            )
-            documents.append(docs)
-        return documents
+        """重写检索文档，并发执行所有子查询，返回二层嵌套的列表，超时或失败的子查询返回空列表"""
+        executor = ThreadPoolExecutor(max_workers=max(1, min(self.max_concurrency, len(queries))))
+        try:
+            futures = [
+                executor.submit(self.retriever.invoke, query, config={"callbacks": run_manager.get_child()})
+                for query in queries
+            ]
+            documents = []
+            for query, future in zip(queries, futures):
+                try:
+                    documents.append(future.result(timeout=self.query_timeout))
+                except FutureTimeoutError:
+                    logging.warning("RAG融合子查询超时, query: %(query)s", {"query": query})
+                    future.cancel()
+                    documents.append([])
+                except Exception as e:
+                    logging.warning("RAG融合子查询失败, query: %(query)s, 错误信息: %(error)s", {"query": query, "error": e})
+                    documents.append([])
+            return documents
+        finally:
+            # 不等待超时的子查询结束，避免拖慢整体响应
+            executor.shutdown(wait=False, cancel_futures=True)
 
     def unique_union(self, documents: List[List]) -> List[Document]:
         """使用RRF算法对文档列表进行排序&合并"""
@@ -55,16 +111,16 @@ class RAGFusionRetriever(MultiQueryRetriever):
         for docs in documents:
             # 内层遍历文档列表得到每一个文档
             for rank, doc in enumerate(docs):
-                # 将文档使用langchain提供的dump工具转换成字符串
-                doc_str = dumps(doc)
-                # 检测该字符串是否存在得分，如果不存在则赋值为0
-                if doc_str not in fused_scores:
-                    fused_scores[doc_str] = {
+                # 使用片段id作为文档的唯一标识，缺失时使用内容哈希
+                doc_key = self._get_document_key(doc)
+                # 检测该文档是否存在得分，如果不存在则赋值为0
+                if doc_key not in fused_scores:
+                    fused_scores[doc_key] = {
                         "score": 0,
                         "doc": doc,
                     }
                 # 计算多结果得分，排名越小越靠前，k为控制权重的参数
-                fused_scores[doc_str]['score'] += 1 / (rank + 60)
+                fused_scores[doc_key]['score'] += 1 / (rank + 60)
 
         # 提取得分并进行排序
         reranked_results = []
@@ -77,3 +133,10 @@ class RAGFusionRetriever(MultiQueryRetriever):
             reranked_results.append(doc)
 
         return reranked_results
+
+    @classmethod
+    def _get_document_key(cls, doc: Document) -> str:
+        for key in ("segment_id", "node_id"):
+            if doc.metadata.get(key):
+                return str(doc.metadata[key])
+        return generate_text_hash(doc.page_content)
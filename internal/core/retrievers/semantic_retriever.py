@@ -18,7 +18,7 @@
 @Author : caixiaorong01@outlook.com
 @File   : semantic_retriever.py
 """
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 
 from langchain_core.callbacks import CallbackManagerForRetrieverRun
@@ -26,33 +26,54 @@ from langchain_core.documents import Document as LCDocument
 from langchain_core.retrievers import BaseRetriever
 from langchain_weaviate import WeaviateVectorStore
 from pydantic import Field
-from weaviate.classes.query import Filter
+from weaviate.classes.query import Filter, MetadataQuery
+from weaviate.collections import Collection
+
+from internal.service import AnnIndexService
 
 
 class SemanticRetriever(BaseRetriever):
     """相似性检索器"""
     dataset_ids: list[UUID]
     vector_store: WeaviateVectorStore
+    collection: Collection
+    ann_index_service: Optional[AnnIndexService] = None
     search_kwargs: dict = Field(default_factory=dict)
 
     def _get_relevant_documents(self, query: str, *, run_manager: CallbackManagerForRetrieverRun) -> List[LCDocument]:
         k = self.search_kwargs.pop("k", 4)
-        search_result = self.vector_store.similarity_search_with_relevance_scores(
-            query=query,
-            k=k,
-            **{
-                "filters": Filter.all_of([
-                    Filter.by_property("dataset_id").contains_any([str(dataset_id) for dataset_id in self.dataset_ids]),
-                    Filter.by_property("document_enabled").equal(True),
-                    Filter.by_property("segment_enabled").equal(True),
-                ]),
-                **self.search_kwargs,
-            }
+        # 优先使用进程内的本地索引副本，不可用时回退到weaviate
+        if self.ann_index_service is not None:
+            lc_documents = self.ann_index_service.search(
+                dataset_ids=self.dataset_ids,
+                query=query,
+                k=k,
+                score_threshold=self.search_kwargs.get("score_threshold", 0),
+            )
+            if lc_documents is not None:
+                return lc_documents
+
+        # 回退路径使用纯向量检索获取余弦距离，与本地索引使用相同的相关性得分换算
+        score_threshold = self.search_kwargs.get("score_threshold", 0)
+        response = self.collection.query.near_vector(
+            near_vector=self.vector_store.embeddings.embed_query(query),
+            limit=k,
+            filters=Filter.all_of([
+                Filter.by_property("dataset_id").contains_any([str(dataset_id) for dataset_id in self.dataset_ids]),
+                Filter.by_property("document_enabled").equal(True),
+                Filter.by_property("segment_enabled").equal(True),
+            ]),
+            return_metadata=MetadataQuery(distance=True),
         )
-        if search_result is None or len(search_result) == 0:
-            return []
-        lc_documents, scores = zip(*search_result)
-        for lc_document, score in zip(lc_documents, scores):
-            lc_document.metadata["score"] = score
+        lc_documents = []
+        for weaviate_object in response.objects:
+            # weaviate的余弦距离为1-余弦相似度
+            score = AnnIndexService.to_relevance_score(1 - weaviate_object.metadata.distance)
+            if score < score_threshold:
+                continue
+            metadata = dict(weaviate_object.properties)
+            page_content = metadata.pop("text", "")
+            metadata["score"] = score
+            lc_documents.append(LCDocument(page_content=page_content, metadata=metadata))
 
-        return list(lc_documents)
+        return lc_documents
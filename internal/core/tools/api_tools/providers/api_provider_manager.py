@@ -19,49 +19,62 @@
 @File   : api_provider_manager.py
 """
 from dataclasses import dataclass
-from typing import Type, Optional, Callable
+from typing import Type, Optional, Callable, Any
 
-import requests
 from injector import inject
 from langchain_core.tools import BaseTool, StructuredTool
 from pydantic import BaseModel, create_model, Field
 
 from internal.core.tools.api_tools.entites import ToolEntity, ParameterTypeMap, ParameterIn
 from internal.lib.helper import generate_random_string
+from pkg.http_client import send_request, async_send_request
 
 
 @inject
 @dataclass
 class ApiProviderManager(BaseModel):
 
+    @classmethod
+    def _build_request_kwargs(cls, tool_entity: ToolEntity, **kwargs) -> dict[str, Any]:
+        """根据工具实体及调用参数构建请求参数"""
+        parameters = {
+            ParameterIn.PATH: {},
+            ParameterIn.HEADER: {},
+            ParameterIn.QUERY: {},
+            ParameterIn.COOKIE: {},
+            ParameterIn.REQUEST_BODY: {},
+        }
+        parameter_map = {parameter.get("name"): parameter for parameter in tool_entity.parameters}
+        header_map = {header.get("key"): header.get("value") for header in tool_entity.headers}
+        for key, value in kwargs.items():
+            parameter = parameter_map.get(key)
+            if parameter is None:
+                continue
+            parameters[parameter.get("in", ParameterIn.QUERY)][key] = value
+        return {
+            "method": tool_entity.method,
+            "url": tool_entity.url.format(**parameters[ParameterIn.PATH]),
+            "params": parameters[ParameterIn.QUERY],
+            "json": parameters[ParameterIn.REQUEST_BODY],
+            "headers": {**header_map, **parameters[ParameterIn.HEADER]},
+            "cookies": parameters[ParameterIn.COOKIE],
+        }
+
     @classmethod
     def _create_tool_func_from_tool_entity(cls, tool_entity: ToolEntity) -> Callable:
         def tool_func(**kwargs) -> str:
-            parameters = {
-                ParameterIn.PATH: {},
-                ParameterIn.HEADER: {},
-                ParameterIn.QUERY: {},
-                ParameterIn.COOKIE: {},
-                ParameterIn.REQUEST_BODY: {},
-            }
-            parameter_map = {parameter.get("name"): parameter for parameter in tool_entity.parameters}
-            header_map = {header.get("key"): header.get("value") for header in tool_entity.headers}
-            for key, value in kwargs.items():
-                parameter = parameter_map.get(key)
-                if parameter is None:
-                    continue
-                parameters[parameter.get("in", ParameterIn.QUERY)][key] = value
-            return requests.request(
-                method=tool_entity.method,
-                url=tool_entity.url.format(**parameters[ParameterIn.PATH]),
-                params=parameters[ParameterIn.QUERY],
-                json=parameters[ParameterIn.REQUEST_BODY],
-                headers={**header_map, **parameters[ParameterIn.HEADER]},
-                cookies=parameters[ParameterIn.COOKIE],
-            ).text
+            return send_request(**cls._build_request_kwargs(tool_entity, **kwargs)).text
 
         return tool_func
 
+    @classmethod
+    def _create_tool_coroutine_from_tool_entity(cls, tool_entity: ToolEntity) -> Callable:
+        async def tool_coroutine(**kwargs) -> str:
+            response = await async_send_request(**cls._build_request_kwargs(tool_entity, **kwargs))
+            return response.text
+
+        return tool_coroutine
+
     @classmethod
     def _create_model_from_parameters(cls, parameters: list[dict]) -> Type[BaseModel]:
         """根据传递的parameters参数创建BaseModel子类"""
@@ -82,6 +95,7 @@ class ApiProviderManager(BaseModel):
     def get_tool(self, tool_entity: ToolEntity) -> BaseTool:
         return StructuredTool.from_function(
             func=self._create_tool_func_from_tool_entity(tool_entity),
+            coroutine=self._create_tool_coroutine_from_tool_entity(tool_entity),
             name=f"{tool_entity.name}_{generate_random_string(6)}",
             description=tool_entity.description,
             args_schema=self._create_model_from_parameters(tool_entity.parameters),
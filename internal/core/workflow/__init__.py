@@ -19,5 +19,6 @@
 @File   : __init__.py.py
 """
 from .workflow import Workflow
+from .workflow_cache import CompiledWorkflowCache, compiled_workflow_cache
 
-__all__ = ["Workflow"]
+__all__ = ["Workflow", "CompiledWorkflowCache", "compiled_workflow_cache"]
@@ -74,4 +74,5 @@ class NodeResult(BaseModel):
     inputs: dict[str, Any] = Field(default_factory=dict)  # 节点的输入数据
     outputs: dict[str, Any] = Field(default_factory=dict)  # 节点的输出数据
     latency: float = 0  # 节点响应耗时
+    render_latency: float = 0  # 模板渲染耗时，仅包含模板的节点有值
     error: str = ""  # 节点运行错误信息
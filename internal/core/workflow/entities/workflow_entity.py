@@ -21,7 +21,7 @@
 
 import re
 from collections import defaultdict, deque
-from typing import Any, TypedDict, Annotated
+from typing import Any, TypedDict, Annotated, Iterable, Optional
 from uuid import UUID
 
 from pydantic import BaseModel, Field, model_validator
@@ -46,14 +46,38 @@ def _process_dict(left: dict[str, Any], right: dict[str, Any]) -> dict[str, Any]
     return {**left, **right}
 
 
-def _process_node_results(left: list[NodeResult], right: list[NodeResult]) -> list[NodeResult]:
+class NodeResults(list):
+    """按节点id建立索引的节点结果列表，只支持追加，变量引用可以直接通过节点id查找结果"""
+
+    def __init__(self, node_results: Iterable[NodeResult] = ()):
+        super().__init__()
+        self._index: dict[UUID, NodeResult] = {}
+        self.extend(node_results)
+
+    def append(self, node_result: NodeResult) -> None:
+        """追加节点结果并更新索引，同一节点出现多次时以最后一次结果为准"""
+        super().append(node_result)
+        self._index[node_result.node_data.id] = node_result
+
+    def extend(self, node_results: Iterable[NodeResult]) -> None:
+        """批量追加节点结果"""
+        for node_result in node_results:
+            self.append(node_result)
+
+    def get_by_node_id(self, node_id: UUID) -> Optional[NodeResult]:
+        """根据节点id获取节点结果"""
+        return self._index.get(node_id)
+
+
+def _process_node_results(left: list[NodeResult], right: list[NodeResult]) -> NodeResults:
     """工作流状态节点结果列表归纳函数"""
-    # 处理left和right出现空的情况
-    left = left or []
-    right = right or []
+    # 处理left出现空或者非索引列表的情况(例如从检查点恢复)，只需要转换一次
+    if not isinstance(left, NodeResults):
+        left = NodeResults(left or [])
 
-    # 合并列表更新后返回
-    return left + right
+    # 原地追加，避免每一步合并都复制整个列表
+    left.extend(right or [])
+    return left
 
 
 class WorkflowConfig(BaseModel):
@@ -383,4 +407,4 @@ class WorkflowState(TypedDict):
     """工作流图程序状态字典"""
     inputs: Annotated[dict[str, Any], _process_dict]  # 工作流的最初始输入，也就是工具输入
     outputs: Annotated[dict[str, Any], _process_dict]  # 工作流的最终输出结果，也就是工具输出
-    node_results: Annotated[list[NodeResult], _process_node_results]  # 各节点的运行结果
+    node_results: Annotated[NodeResults, _process_node_results]  # 各节点的运行结果
@@ -18,64 +18,90 @@
 @Author : caixiaorong01@outlook.com
 @File   : condition_selector_node.py
 """
-from typing import Optional
+import logging
+from typing import Optional, Any
 
 import rule_engine
 from langchain_core.runnables import RunnableConfig
+from pydantic import PrivateAttr
 
 from internal.core.workflow.entities.variable_entity import ConditionType
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
 from internal.core.workflow.nodes.condition import ConditionSelectNodeData
 from internal.core.workflow.utils.helper import extract_variables_from_state
+from .condition_selector_entity import ClassConfig, ClassConfigGroup
 
 
 class ConditionSelectorNode(BaseNode):
     node_data: ConditionSelectNodeData
+    _rules: list[tuple[rule_engine.Rule, list[str], str]] = PrivateAttr(default_factory=list)
+    _default_source_handle_id: str = PrivateAttr("")
+    _rule_error: Optional[rule_engine.RuleSyntaxError] = PrivateAttr(None)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """构造函数，构建节点时按照优先级排序并完成所有条件规则的编译"""
+        super().__init__(*args, **kwargs)
+
+        # 按照优先级排序，最后一个分类为兜底分支，不需要编译规则
+        classes = sorted(self.node_data.classes, key=lambda x: x.priority)
+        self._default_source_handle_id = classes[-1].source_handle_id if classes else ""
+
+        # 规则存在语法错误时记录日志并保留错误，由节点运行时抛出，避免整个工作流构建失败
+        try:
+            self._rules = [
+                (
+                    rule_engine.Rule(self._build_rule(class_config_group)),
+                    list(dict.fromkeys(condition.variable for condition in class_config_group.condition_group)),
+                    class_config_group.source_handle_id,
+                )
+                for class_config_group in classes[:-1]
+            ]
+        except rule_engine.RuleSyntaxError as e:
+            logging.warning(
+                "工作流节点条件规则编译失败, 节点: %(title)s, 错误信息: %(error)s",
+                {"title": self.node_data.title, "error": e},
+            )
+            self._rule_error = e
+
+    @classmethod
+    def _escape_parameter(cls, parameter: Any) -> str:
+        """转义条件参数中的反斜杠与引号，避免参数破坏规则中的字符串字面量"""
+        return str(parameter).replace("\\", "\\\\").replace('"', '\\"').replace("'", "\\'")
+
+    @classmethod
+    def _build_rule_expression(cls, condition: ClassConfig) -> str:
+        """将单个条件转换成rule_engine表达式"""
+        if (
+                condition.condition_type == ConditionType.STARTS_WITH.value
+                or condition.condition_type == ConditionType.ENDS_WITH.value
+        ):
+            return f'{condition.variable}.{condition.condition_type}("{cls._escape_parameter(condition.parameter)}")'
+        elif condition.condition_type == ConditionType.EMPTY.value:
+            return f"({condition.variable} == null or {condition.variable} == '')"
+        elif condition.condition_type == ConditionType.NOT_EMPTY.value:
+            return f"({condition.variable} != null and {condition.variable} != '')"
+        return f"{condition.variable} {condition.condition_type} '{cls._escape_parameter(condition.parameter)}'"
+
+    @classmethod
+    def _build_rule(cls, class_config_group: ClassConfigGroup) -> str:
+        """将条件组按照逻辑类型拼接成完整的规则"""
+        rules = [f" {cls._build_rule_expression(condition)} " for condition in class_config_group.condition_group]
+        return class_config_group.logical_type.join(rules)
 
     def invoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> str:
+        if self._rule_error is not None:
+            raise self._rule_error
+
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
-        # 按照优先级排序
-        self.node_data.classes.sort(key=lambda x: x.priority)
-        node_flag = None
-        for class_config_group in self.node_data.classes[:-1]:
-            condition_group = class_config_group.condition_group
-            if len(condition_group) == 1:
-                condition = condition_group[0]
-                rule = f"{condition.variable} {condition.condition_type} '{condition.parameter}'"
-                match_dict = {
-                    condition.variable: inputs_dict[condition.variable],
-                }
-                if rule_engine.Rule(rule).matches(match_dict):
-                    node_flag = class_config_group.source_handle_id
-                    break
-            else:
-                rules = []
-                match_dict = {}
-                for condition in condition_group:
-                    if (
-                            condition.condition_type == ConditionType.STARTS_WITH.value
-                            or condition.condition_type == ConditionType.ENDS_WITH.value
-                    ):
-                        rule_exper = f'{condition.variable}.{condition.condition_type}("{condition.parameter}")'
-                    elif condition.condition_type == ConditionType.EMPTY.value:
-                        rule_exper = f"({condition.variable} == null or {condition.variable} == '')"
-                    elif condition.condition_type == ConditionType.NOT_EMPTY.value:
-                        rule_exper = f"({condition.variable} != null or {condition.variable != ''})"
-                    else:
-                        rule_exper = f"{condition.variable} {condition.condition_type} '{condition.parameter}'"
-
-                    rules.append(" " + rule_exper + " ")
-                    match_dict[condition.variable] = inputs_dict[condition.variable]
-
-                rule = class_config_group.logical_type.join(rules)
-                if rule_engine.Rule(rule).matches(match_dict):
-                    node_flag = class_config_group.source_handle_id
-                    break
-
-        if node_flag is not None:
-            return f"cn_source_handle_{node_flag}"
-        return f"cn_source_handle_{self.node_data.classes[- 1].source_handle_id}"
+
+        # 按照优先级依次匹配预编译的规则，全部未命中则走兜底分支
+        for rule, variables, source_handle_id in self._rules:
+            match_dict = {variable: inputs_dict[variable] for variable in variables}
+            if rule.matches(match_dict):
+                return f"cn_source_handle_{source_handle_id}"
+
+        return f"cn_source_handle_{self._default_source_handle_id}"
 
 
 if __name__ == '__main__':
@@ -19,15 +19,15 @@
 @File   : http_request_node.py.py
 """
 import time
-from typing import Optional
+from typing import Optional, Any
 
-import requests
 from langchain_core.runnables import RunnableConfig
 
 from internal.core.workflow.entities.node_entity import NodeResult, NodeStatus
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
 from internal.core.workflow.utils.helper import extract_variables_from_state
+from pkg.http_client import send_request, async_send_request
 from .http_request_entity import (
     HttpRequestInputType,
     HttpRequestMethod,
@@ -39,10 +39,9 @@ class HttpRequestNode(BaseNode):
     """HTTP请求节点"""
     node_data: HttpRequestNodeData
 
-    def invoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
-        """HTTP请求节点调用函数，像指定的URL发起请求并获取相应"""
+    def _build_request(self, state: WorkflowState) -> tuple[dict[str, Any], dict[str, Any]]:
+        """根据状态构建节点输入数据及请求参数"""
         # 提取节点输入变量字典
-        start_at = time.perf_counter()
         _inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
 
         # 提取数据，涵盖params、headers、body的数据
@@ -54,38 +53,26 @@ class HttpRequestNode(BaseNode):
         for input in self.node_data.inputs:
             inputs_dict[input.meta.get("type")][input.name] = _inputs_dict.get(input.name)
 
-        # 请求方法映射
-        request_methods = {
-            HttpRequestMethod.GET: requests.get,
-            HttpRequestMethod.POST: requests.post,
-            HttpRequestMethod.PUT: requests.put,
-            HttpRequestMethod.PATCH: requests.patch,
-            HttpRequestMethod.DELETE: requests.delete,
-            HttpRequestMethod.HEAD: requests.head,
-            HttpRequestMethod.OPTIONS: requests.options,
+        # 根据传递的method+url构建请求参数，GET以外的请求方法需携带body参数
+        request_kwargs = {
+            "method": self.node_data.method.value,
+            "url": str(self.node_data.url),
+            "headers": inputs_dict[HttpRequestInputType.HEADERS],
+            "params": inputs_dict[HttpRequestInputType.PARAMS],
         }
+        if self.node_data.method != HttpRequestMethod.GET:
+            request_kwargs["data"] = inputs_dict[HttpRequestInputType.BODY]
 
-        # 根据传递的method+url发起请求
-        request_method = request_methods[self.node_data.method]
-        if self.node_data.method == HttpRequestMethod.GET:
-            response = request_method(
-                self.node_data.url,
-                headers=inputs_dict[HttpRequestInputType.HEADERS],
-                params=inputs_dict[HttpRequestInputType.PARAMS],
-            )
-        else:
-            # 其他请求方法需携带body参数
-            response = request_method(
-                self.node_data.url,
-                headers=inputs_dict[HttpRequestInputType.HEADERS],
-                params=inputs_dict[HttpRequestInputType.PARAMS],
-                data=inputs_dict[HttpRequestInputType.BODY],
-            )
-
-        # 获取响应文本和状态码
-        text = response.text
-        status_code = response.status_code
+        return inputs_dict, request_kwargs
 
+    def _build_result(
+            self,
+            inputs_dict: dict[str, Any],
+            text: str,
+            status_code: int,
+            start_at: float,
+    ) -> WorkflowState:
+        """根据响应文本和状态码构建节点运行结果"""
         # 提取并构建输出数据结构
         outputs = {"text": text, "status_code": status_code}
 
@@ -101,3 +88,26 @@ class HttpRequestNode(BaseNode):
                 )
             ]
         }
+
+    def invoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
+        """HTTP请求节点调用函数，使用共享连接池向指定的URL发起请求并获取响应"""
+        start_at = time.perf_counter()
+        inputs_dict, request_kwargs = self._build_request(state)
+
+        response = send_request(**request_kwargs)
+
+        return self._build_result(inputs_dict, response.text, response.status_code, start_at)
+
+    async def ainvoke(
+            self,
+            state: WorkflowState,
+            config: Optional[RunnableConfig] = None,
+            **kwargs: Any,
+    ) -> WorkflowState:
+        """HTTP请求节点异步调用函数，并行分支在同一事件循环中并发发起请求"""
+        start_at = time.perf_counter()
+        inputs_dict, request_kwargs = self._build_request(state)
+
+        response = await async_send_request(**request_kwargs)
+
+        return self._build_result(inputs_dict, response.text, response.status_code, start_at)
@@ -26,6 +26,9 @@ from internal.core.workflow.entities.node_entity import BaseNodeData
 from internal.core.workflow.entities.variable_entity import VariableEntity, VariableType, VariableValueType
 from internal.exception import FailException
 
+# 迭代节点允许的最大并行数量
+ITERATION_MAX_PARALLELISM = 20
+
 
 class IterationNodeData(BaseNodeData):
     """迭代节点数据"""
@@ -38,6 +41,8 @@ class IterationNodeData(BaseNodeData):
         )
     ])  # 输入变量列表
     outputs: list[VariableEntity] = Field(default_factory=list)
+    parallelism: int = 1  # 最大并行执行数量，1表示串行执行
+    item_timeout: float = 0  # 单项迭代的超时时间(秒)，0表示不限制
 
     @field_validator("workflow_ids")
     def validate_workflow_ids(cls, value: list[UUID]):
@@ -46,6 +51,20 @@ class IterationNodeData(BaseNodeData):
             raise FailException("迭代节点只能绑定一个工作流")
         return value
 
+    @field_validator("parallelism")
+    def validate_parallelism(cls, value: int):
+        """校验最大并行数量是否在允许范围内"""
+        if value < 1 or value > ITERATION_MAX_PARALLELISM:
+            raise FailException(f"迭代节点并行数量范围为1-{ITERATION_MAX_PARALLELISM}")
+        return value
+
+    @field_validator("item_timeout")
+    def validate_item_timeout(cls, value: float):
+        """校验单项超时时间不能为负数"""
+        if value < 0:
+            raise FailException("迭代节点单项超时时间不能小于0")
+        return value
+
     @field_validator("inputs")
     def validate_inputs(cls, value: list[VariableEntity]):
         """校验输入变量是否正确"""
@@ -21,29 +21,37 @@
 import json
 import logging
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from typing import Optional, Any
 
+from flask import Flask, current_app
 from langchain_core.runnables import RunnableConfig
+from pydantic import PrivateAttr
 
 from internal.core.workflow.entities.node_entity import NodeResult, NodeStatus
-from internal.core.workflow.entities.workflow_entity import WorkflowState, WorkflowConfig
+from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
 from internal.core.workflow.utils.helper import extract_variables_from_state
 from internal.entity.workflow_entity import WorkflowStatus
 from internal.model import Workflow
 from .iteration_entity import IterationNodeData
 
+# 并行迭代时检测单项是否超时的间隔(秒)
+ITEM_TIMEOUT_CHECK_INTERVAL = 0.5
+
 
 class IterationNode(BaseNode):
     """迭代节点"""
     node_data: IterationNodeData
     workflow: Any = None
+    _flask_app: Flask = PrivateAttr(None)
 
     def __init__(self, *args: Any, **kwargs: Any):
         """构造函数，完成数据的初始化"""
         try:
             # 调用父类构造函数完成数据初始化
             super().__init__(*args, **kwargs)
+            self._flask_app = current_app._get_current_object()
 
             # 判断是否传递的工作流id
             if len(self.node_data.workflow_ids) != 1:
@@ -60,16 +68,14 @@ class IterationNode(BaseNode):
                 if not workflow_record or workflow_record.status != WorkflowStatus.PUBLISHED:
                     self.workflow = None
                 else:
-                    # 已发布且存在，则构建工作流并存储
-                    from internal.core.workflow import Workflow as WorkflowTool
-                    self.workflow = WorkflowTool(
-                        workflow_config=WorkflowConfig(
-                            account_id=workflow_record.account_id,
-                            name="iteration_workflow",
-                            description=self.node_data.description,
-                            nodes=workflow_record.graph.get("nodes", []),
-                            edges=workflow_record.graph.get("edges", [])
-                        ),
+                    # 已发布且存在，则从已编译工作流缓存中获取工作流并存储
+                    from internal.core.workflow import compiled_workflow_cache
+                    self.workflow = compiled_workflow_cache.get_or_create(
+                        workflow_id=workflow_record.id,
+                        account_id=workflow_record.account_id,
+                        name="iteration_workflow",
+                        description=self.node_data.description,
+                        graph=workflow_record.graph,
                     )
         except Exception as error:
             # 出现异常则将工作流重置为空，使用相对宽松的校验范式
@@ -105,24 +111,89 @@ class IterationNode(BaseNode):
         # 获取工作流的输入字段结构
         param_key = list(self.workflow.args.keys())[0]
 
-        # 工作流+数据均存在，则循环遍历输入数据调用迭代工作流获取结果
-        outputs = []
-        for item in inputs:
-            # 构建输入字典信息
-            data = {param_key: item}
+        # 工作流+数据均存在，则按节点配置的并行数量迭代调用工作流，结果按输入顺序收集并转换成字符串
+        if self.node_data.parallelism > 1 or self.node_data.item_timeout > 0:
+            iteration_results = self._invoke_parallel(param_key, inputs)
+        else:
+            iteration_results = [self._invoke_item(param_key, item) for item in inputs]
 
-            # 调用工作流获取结果，这里可以修改为并行执行提升效率，得到的结构转换成字符串
-            iteration_result = self.workflow.invoke(data)
-            outputs.append(json.dumps(iteration_result, ensure_ascii=False))
+        outputs = []
+        errors = []
+        for index, (iteration_result, error) in enumerate(iteration_results):
+            if error:
+                errors.append(f"第{index + 1}项: {error}")
+                outputs.append(json.dumps({"error": error}, ensure_ascii=False))
+            else:
+                outputs.append(json.dumps(iteration_result, ensure_ascii=False))
 
         return {
             "node_results": [
                 NodeResult(
                     node_data=self.node_data,
-                    status=NodeStatus.SUCCEEDED,
+                    status=NodeStatus.FAILED if len(errors) == len(inputs) else NodeStatus.SUCCEEDED,
                     inputs=inputs_dict,
                     outputs={"outputs": outputs},
                     latency=(time.perf_counter() - start_at),
+                    error="; ".join(errors),
                 )
             ]
         }
+
+    def _invoke_item(self, param_key: str, item: Any) -> tuple[Any, str]:
+        """调用迭代工作流处理单项数据，单项失败不影响其他项，返回(结果, 错误信息)"""
+        try:
+            return self.workflow.invoke({param_key: item}), ""
+        except Exception as error:
+            logging.exception("迭代节点子工作流执行失败: %(error)s", {"error": error})
+            return None, str(error) or error.__class__.__name__
+
+    def _invoke_item_with_app_context(self, flask_app: Flask, param_key: str, item: Any) -> tuple[Any, str]:
+        """在子线程中携带应用上下文调用迭代工作流"""
+        with flask_app.app_context():
+            return self._invoke_item(param_key, item)
+
+    def _invoke_parallel(self, param_key: str, inputs: list[Any]) -> list[tuple[Any, str]]:
+        """使用有界线程池调用迭代工作流，结果与输入顺序保持一致，超时按每一项实际开始执行的时间计算"""
+        parallelism = min(self.node_data.parallelism, len(inputs))
+        item_timeout = self.node_data.item_timeout
+        started_at: dict[int, float] = {}
+
+        def _invoke(index: int, item: Any) -> tuple[Any, str]:
+            started_at[index] = time.monotonic()
+            return self._invoke_item_with_app_context(self._flask_app, param_key, item)
+
+        # 每个节点调用独立创建线程池，避免嵌套迭代时共享线程池出现相互等待
+        executor = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="iteration")
+        try:
+            futures = [executor.submit(_invoke, index, item) for index, item in enumerate(inputs)]
+            results: dict[int, tuple[Any, str]] = {}
+            pending = set(range(len(futures)))
+            timed_out = set()
+            while pending:
+                wait(
+                    [futures[index] for index in pending],
+                    timeout=ITEM_TIMEOUT_CHECK_INTERVAL if item_timeout > 0 else None,
+                    return_when=FIRST_COMPLETED,
+                )
+
+                # 1.收集已完成的项，已开始执行且运行时间超过单项超时时间的项标记为超时
+                now = time.monotonic()
+                for index in list(pending):
+                    if futures[index].done():
+                        results[index] = futures[index].result()
+                        pending.discard(index)
+                    elif item_timeout > 0 and index in started_at and now - started_at[index] > item_timeout:
+                        results[index] = (None, f"执行超时({item_timeout}s)")
+                        pending.discard(index)
+                        timed_out.add(index)
+
+                # 2.运行中的线程无法中断，所有线程都被超时的项占用时，剩余的项无法再开始执行，单独标记为未开始
+                if pending and sum(1 for index in timed_out if not futures[index].done()) >= parallelism:
+                    for index in list(pending):
+                        if futures[index].cancel():
+                            results[index] = (None, "未开始执行，并行线程均被超时的项占用")
+                            pending.discard(index)
+
+            return [results[index] for index in range(len(futures))]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
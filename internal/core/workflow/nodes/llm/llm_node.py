@@ -19,28 +19,37 @@
 @File   : llm_node.py
 """
 import time
-from typing import Optional
+from typing import Optional, Any
 
 from jinja2 import Template
 from langchain_core.runnables import RunnableConfig
+from pydantic import PrivateAttr
 
 from internal.core.workflow.entities.node_entity import NodeStatus, NodeResult
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
-from internal.core.workflow.utils.helper import extract_variables_from_state
+from internal.core.workflow.utils.helper import extract_variables_from_state, compile_template, precompile_template
 from .llm_entity import LLMNodeData
 
 
 class LLMNode(BaseNode):
     node_data: LLMNodeData
+    _template: Template = PrivateAttr(None)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """构造函数，构建节点时完成提示词模板的编译"""
+        super().__init__(*args, **kwargs)
+        self._template = precompile_template(self.node_data.prompt, self.node_data.title)
 
     def invoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
         start_at = time.perf_counter()
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
 
-        # 使用jinja2格式模板信息
-        template = Template(self.node_data.prompt)
+        # 使用构建节点时预编译的jinja2模板渲染信息，预编译失败时在此处重新编译并抛出语法错误
+        render_start_at = time.perf_counter()
+        template = self._template or compile_template(self.node_data.prompt)
         prompt_value = template.render(**inputs_dict)
+        render_latency = time.perf_counter() - render_start_at
 
         from app.http.module import injector
         from internal.service import LanguageModelService
@@ -76,6 +85,7 @@ class LLMNode(BaseNode):
                     inputs=inputs_dict,
                     outputs=outputs,
                     latency=(time.perf_counter() - start_at),
+                    render_latency=render_latency,
                 )
             ]
         }
@@ -19,11 +19,12 @@
 @File   : template_transform_node.py.py
 """
 import time
-from typing import Optional
+from typing import Optional, Any
 
-from internal.core.workflow.utils.helper import extract_variables_from_state
+from internal.core.workflow.utils.helper import extract_variables_from_state, compile_template, precompile_template
 from jinja2 import Template
 from langchain_core.runnables import RunnableConfig
+from pydantic import PrivateAttr
 
 from internal.core.workflow.entities.node_entity import NodeResult, NodeStatus
 from internal.core.workflow.entities.workflow_entity import WorkflowState
@@ -34,6 +35,12 @@ from .template_transform_entity import TemplateTransformNodeData
 class TemplateTransformNode(BaseNode):
     """模板转换节点，将多个变量信息合并成一个"""
     node_data: TemplateTransformNodeData
+    _template: Template = PrivateAttr(None)
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        """构造函数，构建节点时完成模板的编译"""
+        super().__init__(*args, **kwargs)
+        self._template = precompile_template(self.node_data.template, self.node_data.title)
 
     def invoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
         """模板转换节点执行函数，将传递的多个变量合并成字符串后返回"""
@@ -41,9 +48,11 @@ class TemplateTransformNode(BaseNode):
         start_at = time.perf_counter()
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
 
-        # 使用jinja2格式模板信息
-        template = Template(self.node_data.template)
+        # 使用构建节点时预编译的jinja2模板渲染信息，预编译失败时在此处重新编译并抛出语法错误
+        render_start_at = time.perf_counter()
+        template = self._template or compile_template(self.node_data.template)
         template_value = template.render(**inputs_dict)
+        render_latency = time.perf_counter() - render_start_at
 
         # 提取并构建输出数据结构
         outputs = {"output": template_value}
@@ -57,6 +66,7 @@ class TemplateTransformNode(BaseNode):
                     inputs=inputs_dict,
                     outputs=outputs,
                     latency=(time.perf_counter() - start_at),
+                    render_latency=render_latency,
                 )
             ]
         }
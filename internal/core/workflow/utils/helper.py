@@ -18,7 +18,13 @@
 @Author : caixiaorong01@outlook.com
 @File   : helper.py
 """
-from typing import Any
+import logging
+import os
+import threading
+from typing import Any, Optional
+
+from jinja2 import BaseLoader, Template, TemplateSyntaxError
+from jinja2.sandbox import SandboxedEnvironment
 
 from internal.core.workflow.entities.variable_entity import (
     VariableEntity,
@@ -26,7 +32,55 @@ from internal.core.workflow.entities.variable_entity import (
     VARIABLE_TYPE_MAP,
     VARIABLE_TYPE_DEFAULT_VALUE_MAP,
 )
-from internal.core.workflow.entities.workflow_entity import WorkflowState
+from internal.core.workflow.entities.workflow_entity import WorkflowState, NodeResults
+
+
+class _SourceLoader(BaseLoader):
+    """以模板源码作为模板名的加载器，使字符串模板也能复用环境的编译缓存"""
+
+    def get_source(self, environment: SandboxedEnvironment, template: str) -> tuple[str, None, Any]:
+        return template, None, lambda: True
+
+
+def _create_template_environment() -> SandboxedEnvironment:
+    """创建工作流节点共享的沙箱模板环境，已编译的模板保存在容量有限的内存LRU缓存中"""
+    return SandboxedEnvironment(
+        loader=_SourceLoader(),
+        cache_size=int(os.getenv("JINJA_TEMPLATE_CACHE_SIZE", 1000)),
+        auto_reload=False,
+    )
+
+
+# 工作流节点共享的沙箱模板环境，相同源码的模板只编译一次，首次编译模板时才创建
+_template_environment: Optional[SandboxedEnvironment] = None
+_template_environment_lock = threading.Lock()
+
+
+def _get_template_environment() -> SandboxedEnvironment:
+    """获取工作流节点共享的沙箱模板环境"""
+    global _template_environment
+    if _template_environment is None:
+        with _template_environment_lock:
+            if _template_environment is None:
+                _template_environment = _create_template_environment()
+    return _template_environment
+
+
+def compile_template(source: str) -> Template:
+    """将模板源码编译为jinja2模板，相同源码直接复用已编译的模板"""
+    return _get_template_environment().get_template(source)
+
+
+def precompile_template(source: str, node_title: str) -> Optional[Template]:
+    """构建节点时预编译模板，语法错误时记录日志并返回None，由节点运行时重新编译并抛出错误，避免整个工作流构建失败"""
+    try:
+        return compile_template(source)
+    except TemplateSyntaxError as e:
+        logging.warning(
+            "工作流节点模板编译失败, 节点: %(title)s, 错误信息: %(error)s",
+            {"title": node_title, "error": e},
+        )
+        return None
 
 
 def extract_variables_from_state(variables: list[VariableEntity], state: WorkflowState) -> dict[str, Any]:
@@ -34,6 +88,11 @@ def extract_variables_from_state(variables: list[VariableEntity], state: Workflo
     # 构建变量字典信息
     variables_dict = {}
 
+    # 获取按节点id索引的节点结果，未建立索引时只构建一次
+    node_results = state.get("node_results") or []
+    if not isinstance(node_results, NodeResults):
+        node_results = NodeResults(node_results)
+
     # 循环遍历输入变量实体
     for variable in variables:
         # 获取数据变量类型
@@ -43,12 +102,12 @@ def extract_variables_from_state(variables: list[VariableEntity], state: Workflo
         if variable.value.type == VariableValueType.LITERAL:
             variables_dict[variable.name] = variable_type_cls(variable.value.content)
         else:
-            # 引用or生成数据类型，遍历节点获取数据
-            for node_result in state["node_results"]:
-                if node_result.node_data.id == variable.value.content.ref_node_id:
-                    # 提取数据并完成数据强制转换
-                    variables_dict[variable.name] = variable_type_cls(node_result.outputs.get(
-                        variable.value.content.ref_var_name,
-                        VARIABLE_TYPE_DEFAULT_VALUE_MAP.get(variable.type)
-                    ))
+            # 引用or生成数据类型，根据节点id直接获取数据
+            node_result = node_results.get_by_node_id(variable.value.content.ref_node_id)
+            if node_result is not None:
+                # 提取数据并完成数据强制转换
+                variables_dict[variable.name] = variable_type_cls(node_result.outputs.get(
+                    variable.value.content.ref_var_name,
+                    VARIABLE_TYPE_DEFAULT_VALUE_MAP.get(variable.type)
+                ))
     return variables_dict
@@ -259,6 +259,11 @@ class Workflow(BaseTool):
         result = self._workflow.invoke({"inputs": kwargs})
         return result.get("outputs", {})
 
+    async def _arun(self, *args: Any, **kwargs: Any) -> Any:
+        # 异步调用工作流，并行分支中的HTTP请求等节点在同一事件循环中并发执行，其余节点在线程池中执行同步逻辑
+        result = await self._workflow.ainvoke({"inputs": kwargs})
+        return result.get("outputs", {})
+
     def stream(
             self,
             input: Input,
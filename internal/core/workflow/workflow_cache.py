@@ -0,0 +1,165 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2025/5/6 10:18
+@Author : caixiaorong01@outlook.com
+@File   : workflow_cache.py
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+from uuid import UUID
+
+from internal.lib.helper import generate_text_hash
+from .entities.node_entity import NodeType
+from .entities.workflow_entity import WorkflowConfig
+from .workflow import Workflow
+
+
+@dataclass
+class _CachedWorkflow:
+    """缓存的已编译工作流记录"""
+    workflow: Workflow  # 已完成校验与编译的工作流工具
+    expires_at: float  # 过期时间(单调时钟)
+    dependencies: set[str] = field(default_factory=set)  # 迭代节点引用的子工作流id
+
+
+class CompiledWorkflowCache:
+    """已编译工作流进程级LRU缓存，键为工作流id+图配置哈希，避免每次对话都重新校验与编译工作流"""
+
+    def __init__(self, max_size: int, ttl: float):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[tuple[str, str], _CachedWorkflow] = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @classmethod
+    def compute_graph_hash(cls, account_id: UUID, name: str, description: str, graph: dict[str, Any]) -> str:
+        """计算工作流配置的内容哈希，图配置/名称/描述任一变化都会得到新的缓存键"""
+        return generate_text_hash(json.dumps(
+            {
+                "account_id": str(account_id),
+                "name": name,
+                "description": description,
+                "graph": graph,
+            },
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        ))
+
+    def get_or_create(
+            self,
+            workflow_id: UUID,
+            account_id: UUID,
+            name: str,
+            description: str,
+            graph: dict[str, Any],
+    ) -> Workflow:
+        """根据工作流id+图配置获取已编译的工作流，未命中时构建并写入缓存"""
+        key = (str(workflow_id), self.compute_graph_hash(account_id, name, description, graph))
+
+        # 1.命中且未过期则直接返回
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.workflow
+            if entry is not None:
+                del self._entries[key]
+            self._misses += 1
+
+        # 2.在锁外构建工作流，迭代节点构建子工作流时会重入缓存，构建失败的异常直接抛出不写入缓存
+        workflow = Workflow(workflow_config=WorkflowConfig(
+            account_id=account_id,
+            name=name,
+            description=description,
+            nodes=graph.get("nodes", []),
+            edges=graph.get("edges", []),
+        ))
+
+        # 3.写入缓存并淘汰最久未使用的记录
+        with self._lock:
+            self._entries[key] = _CachedWorkflow(
+                workflow=workflow,
+                expires_at=time.monotonic() + self._ttl,
+                dependencies=self._extract_dependencies(graph),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+        return workflow
+
+    def invalidate(self, workflow_id: UUID) -> None:
+        """失效指定工作流的所有缓存，并级联失效通过迭代节点引用了该工作流的缓存"""
+        with self._lock:
+            pending = {str(workflow_id)}
+            invalidated = set()
+            while pending:
+                target_id = pending.pop()
+                invalidated.add(target_id)
+                for key in [
+                    key for key, entry in self._entries.items()
+                    if key[0] == target_id or target_id in entry.dependencies
+                ]:
+                    del self._entries[key]
+                    if key[0] not in invalidated:
+                        pending.add(key[0])
+
+    def clear(self) -> None:
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def get_metrics(self) -> dict:
+        """获取缓存指标，数据为当前进程内的统计"""
+        with self._lock:
+            total = self._hits + self._misses
+            return {
+                "size": len(self._entries),
+                "max_size": self._max_size,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": self._hits / total if total > 0 else 0,
+            }
+
+    @classmethod
+    def _extract_dependencies(cls, graph: dict[str, Any]) -> set[str]:
+        """提取图配置中迭代节点引用的子工作流id"""
+        return {
+            str(workflow_id)
+            for node in graph.get("nodes", [])
+            if node.get("node_type") == NodeType.ITERATION.value
+            for workflow_id in node.get("workflow_ids", [])
+        }
+
+
+# 进程级已编译工作流缓存，图配置变化会产生新的缓存键，TTL用于兜底其他进程中发布/取消发布以及插件、知识库等外部配置的变更
+compiled_workflow_cache = CompiledWorkflowCache(
+    max_size=int(os.getenv("WORKFLOW_CACHE_MAX_SIZE", 256)),
+    ttl=float(os.getenv("WORKFLOW_CACHE_TTL", 600)),
+)
@@ -26,3 +26,25 @@ LOCK_DOCUMENT_UPDATE_ENABLED = "lock:document:update:enabled_{document_id}"
 LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE = "lock:keyword_table:update:keyword_table_{dataset_id}"
 
 LOCK_SEGMENT_UPDATE_ENABLED = "lock:segment:update:enabled_{segment_id}"
+
+# 向量缓存，以模型名称+文本哈希为键
+EMBEDDINGS_CACHE_KEY = "embeddings:{model}:{text_hash}"
+# 向量缓存命中/未命中次数统计
+EMBEDDINGS_CACHE_HIT_COUNT = "embeddings:metrics:{model}:hit"
+EMBEDDINGS_CACHE_MISS_COUNT = "embeddings:metrics:{model}:miss"
+
+# 知识库本地向量索引副本，version为最新构建版本，ready为已构建完成的版本
+ANN_INDEX_VERSION = "ann_index:version:{dataset_id}"
+ANN_INDEX_READY_VERSION = "ann_index:ready:{dataset_id}"
+# 索引构建后被禁用/删除、被启用/新增的节点集合，以及向量发生变更的过期标识
+ANN_INDEX_REMOVED_NODES = "ann_index:removed:{dataset_id}"
+ANN_INDEX_ADDED_NODES = "ann_index:added:{dataset_id}"
+ANN_INDEX_STALE = "ann_index:stale:{dataset_id}"
+# 索引重建任务防抖标识
+ANN_INDEX_REBUILD_SCHEDULED = "ann_index:rebuild_scheduled:{dataset_id}"
+# 重建本地向量索引锁
+LOCK_ANN_INDEX_REBUILD = "lock:ann_index:rebuild_{dataset_id}"
+
+# 智能体任务事件流(Redis Streams)，以及推送停止信号的发布订阅频道
+AGENT_TASK_EVENTS_STREAM = "agent_task:events:{task_id}"
+AGENT_TASK_STOP_CHANNEL = "agent_task:stop:{task_id}"
@@ -76,6 +76,11 @@ class RetrievalStrategy(str, Enum):
     RAG_FUSION = "rag_fusion"
 
 
+class HybridFusionMode(str, Enum):
+    RRF = "rrf"
+    WEIGHTED = "weighted"
+
+
 class RetrievalSource(str, Enum):
     HIT_TESTING = "hit_testing"
     APP = "app"
@@ -101,3 +101,8 @@ class ConversationHandler:
         self.conversation_service.update_conversation(conversation_id, current_user, is_pinned=req.is_pinned.data)
 
         return success_message("修改会话置顶状态成功")
+
+    @login_required
+    def get_background_queue_metrics(self):
+        """获取当前进程会话后台写入及后处理队列的指标"""
+        return success_json(self.conversation_service.get_background_queue_metrics())
@@ -117,3 +117,8 @@ class DatasetHandler:
         """根据传递的知识库id删除知识库"""
         self.dataset_service.delete_dataset(dataset_id, account=current_user)
         return success_message("删除知识库成功")
+
+    @login_required
+    def get_embeddings_cache_metrics(self):
+        """获取向量缓存的命中指标，统计数据保存在redis中，为所有进程的汇总"""
+        return success_json(self.embeddings_service.get_cache_metrics())
@@ -129,3 +129,8 @@ class WorkflowHandler:
         """根据传递的工作流id取消发布指定的工作流"""
         self.workflow_service.cancel_publish_workflow(workflow_id, current_user)
         return success_message("取消发布工作流成功")
+
+    @login_required
+    def get_compiled_workflow_cache_metrics(self):
+        """获取当前进程已编译工作流缓存的指标"""
+        return success_json(self.workflow_service.get_compiled_workflow_cache_metrics())
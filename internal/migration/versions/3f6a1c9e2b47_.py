@@ -0,0 +1,74 @@
+"""empty message
+
+Revision ID: 3f6a1c9e2b47
+Revises: 51a5e3c32a50
+Create Date: 2026-10-18 10:12:31.204518
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '3f6a1c9e2b47'
+down_revision = '51a5e3c32a50'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('segment_keyword',
+    sa.Column('id', sa.UUID(), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+    sa.Column('dataset_id', sa.UUID(), nullable=False),
+    sa.Column('keyword', sa.String(length=255), server_default=sa.text("''::character varying"), nullable=False),
+    sa.Column('segment_id', sa.UUID(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='pk_segment_keyword_id'),
+    sa.UniqueConstraint('dataset_id', 'keyword', 'segment_id', name='uk_segment_keyword_dataset_id_keyword_segment_id')
+    )
+    with op.batch_alter_table('segment_keyword', schema=None) as batch_op:
+        batch_op.create_index('segment_keyword_segment_id_idx', ['segment_id'], unique=False)
+
+    # 将原有按知识库存储的JSON关键词表展开为倒排记录
+    op.execute("""
+        INSERT INTO segment_keyword (dataset_id, keyword, segment_id)
+        SELECT kt.dataset_id, kv.key, CAST(sid.value AS uuid)
+        FROM keyword_table AS kt
+        CROSS JOIN LATERAL jsonb_each(kt.keyword_table) AS kv
+        CROSS JOIN LATERAL jsonb_array_elements_text(kv.value) AS sid
+        ON CONFLICT DO NOTHING
+    """)
+
+    with op.batch_alter_table('keyword_table', schema=None) as batch_op:
+        batch_op.drop_index('keyword_table_dataset_id_idx')
+
+    op.drop_table('keyword_table')
+
+
+def downgrade():
+    op.create_table('keyword_table',
+    sa.Column('id', sa.UUID(), server_default=sa.text('uuid_generate_v4()'), autoincrement=False, nullable=False),
+    sa.Column('dataset_id', sa.UUID(), autoincrement=False, nullable=False),
+    sa.Column('keyword_table', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), autoincrement=False, nullable=False),
+    sa.Column('updated_at', postgresql.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), autoincrement=False, nullable=False),
+    sa.Column('created_at', postgresql.TIMESTAMP(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), autoincrement=False, nullable=False),
+    sa.PrimaryKeyConstraint('id', name='pk_keyword_table_id')
+    )
+    with op.batch_alter_table('keyword_table', schema=None) as batch_op:
+        batch_op.create_index('keyword_table_dataset_id_idx', ['dataset_id'], unique=False)
+
+    op.execute("""
+        INSERT INTO keyword_table (dataset_id, keyword_table)
+        SELECT dataset_id, jsonb_object_agg(keyword, segment_ids)
+        FROM (
+            SELECT dataset_id, keyword, jsonb_agg(CAST(segment_id AS text)) AS segment_ids
+            FROM segment_keyword
+            GROUP BY dataset_id, keyword
+        ) AS postings
+        GROUP BY dataset_id
+    """)
+
+    with op.batch_alter_table('segment_keyword', schema=None) as batch_op:
+        batch_op.drop_index('segment_keyword_segment_id_idx')
+
+    op.drop_table('segment_keyword')
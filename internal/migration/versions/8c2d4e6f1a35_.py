@@ -0,0 +1,43 @@
+"""empty message
+
+Revision ID: 8c2d4e6f1a35
+Revises: 3f6a1c9e2b47
+Create Date: 2026-10-18 21:08:47.362915
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c2d4e6f1a35'
+down_revision = '3f6a1c9e2b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('app_daily_stat',
+    sa.Column('id', sa.UUID(), server_default=sa.text('uuid_generate_v4()'), nullable=False),
+    sa.Column('app_id', sa.UUID(), nullable=False),
+    sa.Column('stat_date', sa.Date(), nullable=False),
+    sa.Column('message_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('active_account_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('conversation_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('total_token_count', sa.Integer(), server_default=sa.text('0'), nullable=False),
+    sa.Column('latency_sum', sa.Float(), server_default=sa.text('0.0'), nullable=False),
+    sa.Column('total_price', sa.Numeric(precision=20, scale=7), server_default=sa.text('0.0'), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), nullable=False),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('CURRENT_TIMESTAMP(0)'), nullable=False),
+    sa.PrimaryKeyConstraint('id', name='pk_app_daily_stat_id'),
+    sa.UniqueConstraint('app_id', 'stat_date', name='uk_app_daily_stat_app_id_stat_date')
+    )
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.create_index('message_app_id_created_at_idx', ['app_id', 'created_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('message', schema=None) as batch_op:
+        batch_op.drop_index('message_app_id_created_at_idx')
+
+    op.drop_table('app_daily_stat')
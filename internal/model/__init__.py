@@ -19,11 +19,12 @@
 @File   : __init__.py.py
 """
 from .account import Account, AccountOAuth
+from .analysis import AppDailyStat
 from .api_key import ApiKey
 from .api_tool import ApiTool, ApiToolProvider
 from .app import App, AppDatasetJoin, AppConfig, AppConfigVersion
 from .conversation import Conversation, Message, MessageAgentThought
-from .dataset import Dataset, Document, Segment, KeywordTable, DatasetQuery, ProcessRule
+from .dataset import Dataset, Document, Segment, SegmentKeyword, DatasetQuery, ProcessRule
 from .end_user import EndUser
 from .platform import WechatConfig, WechatEndUser, WechatMessage
 from .upload_file import UploadFile
@@ -33,8 +34,8 @@ __all__ = [
     "App", "AppDatasetJoin", "AppConfig", "AppConfigVersion",
     "ApiTool", "ApiToolProvider",
     "UploadFile",
-    "Dataset", "Document", "Segment", "KeywordTable", "DatasetQuery", "ProcessRule",
-    "Conversation", "Message", "MessageAgentThought",
+    "Dataset", "Document", "Segment", "SegmentKeyword", "DatasetQuery", "ProcessRule",
+    "Conversation", "Message", "MessageAgentThought", "AppDailyStat",
     "Account", "AccountOAuth",
     "ApiKey", "EndUser",
     "Workflow", "WorkflowResult",
@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 21:05
+@Author : caixiaorong01@outlook.com
+@File   : analysis.py
+"""
+from datetime import datetime
+
+from sqlalchemy import (
+    Column,
+    UUID,
+    Integer,
+    Date,
+    DateTime,
+    Float,
+    Numeric,
+    text,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+)
+
+from internal.extension.database_extension import db
+
+
+class AppDailyStat(db.Model):
+    """应用每日统计汇总模型，按应用+日期预先聚合消息指标，统计分析面板只读取汇总数据"""
+    __tablename__ = "app_daily_stat"
+    __table_args__ = (
+        PrimaryKeyConstraint("id", name="pk_app_daily_stat_id"),
+        UniqueConstraint("app_id", "stat_date", name="uk_app_daily_stat_app_id_stat_date"),
+    )
+
+    id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
+    app_id = Column(UUID, nullable=False)  # 关联应用id
+    stat_date = Column(Date, nullable=False)  # 统计日期
+    message_count = Column(Integer, nullable=False, server_default=text("0"))  # 消息总数
+    active_account_count = Column(Integer, nullable=False, server_default=text("0"))  # 当日去重的用户数
+    conversation_count = Column(Integer, nullable=False, server_default=text("0"))  # 当日去重的会话数
+    total_token_count = Column(Integer, nullable=False, server_default=text("0"))  # 消耗的总token数
+    latency_sum = Column(Float, nullable=False, server_default=text("0.0"))  # 消息总耗时
+    total_price = Column(Numeric(20, 7), nullable=False, server_default=text("0.0"))  # 消耗的总价格
+    updated_at = Column(
+        DateTime,
+        nullable=False,
+        server_default=text('CURRENT_TIMESTAMP(0)'),
+        onupdate=datetime.now,
+    )
+    created_at = Column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP(0)'))
@@ -38,6 +38,7 @@ from internal.entity.conversation_entity import InvokeFrom
 from internal.entity.platform_entity import WechatConfigStatus
 from internal.extension.database_extension import db
 from internal.lib.helper import generate_random_string
+from pkg.sqlalchemy import get_preloaded, set_preloaded
 from .conversation import Conversation
 from .platform import WechatConfig
 
@@ -76,16 +77,16 @@ class App(db.Model):
         """只读属性，返回当前应用的运行配置"""
         if not self.app_config_id:
             return None
-        return db.session.query(AppConfig).get(self.app_config_id)
+        return get_preloaded(self, "app_config", lambda: db.session.query(AppConfig).get(self.app_config_id))
 
     @property
     def draft_app_config(self) -> "AppConfigVersion":
         """只读属性，返回当前应用的草稿配置"""
         # 获取当前应用的草稿配置
-        app_config_version = db.session.query(AppConfigVersion).filter(
+        app_config_version = get_preloaded(self, "draft_app_config", lambda: db.session.query(AppConfigVersion).filter(
             AppConfigVersion.app_id == self.id,
             AppConfigVersion.config_type == AppConfigType.DRAFT,
-        ).one_or_none()
+        ).one_or_none())
 
         # 检测配置是否存在，如果不存在则创建一个默认值
         if not app_config_version:
@@ -100,6 +101,35 @@ class App(db.Model):
 
         return app_config_version
 
+    @classmethod
+    def preload_configs(cls, apps: list["App"]) -> None:
+        """批量预加载应用列表的运行配置与草稿配置，避免列表接口逐条查询"""
+        if not apps:
+            return
+
+        # 1.一次查询所有已发布应用的运行配置
+        app_config_ids = {app.app_config_id for app in apps if app.app_config_id}
+        app_configs = {
+            app_config.id: app_config
+            for app_config in db.session.query(AppConfig).filter(AppConfig.id.in_(list(app_config_ids))).all()
+        } if app_config_ids else {}
+
+        # 2.一次查询所有应用的草稿配置
+        draft_app_configs = {
+            app_config_version.app_id: app_config_version
+            for app_config_version in db.session.query(AppConfigVersion).filter(
+                AppConfigVersion.app_id.in_([app.id for app in apps]),
+                AppConfigVersion.config_type == AppConfigType.DRAFT,
+            ).all()
+        }
+
+        # 3.设置预加载数据，草稿配置不存在的应用不设置，由属性按原逻辑创建默认草稿
+        for app in apps:
+            if app.app_config_id in app_configs:
+                set_preloaded(app, "app_config", app_configs[app.app_config_id])
+            if app.id in draft_app_configs:
+                set_preloaded(app, "draft_app_config", draft_app_configs[app.id])
+
     @property
     def debug_conversation(self) -> "Conversation":
         """获取应用的调试会话记录"""
@@ -31,7 +31,6 @@ from sqlalchemy import (
     Numeric,
     Float,
     text,
-    func,
     PrimaryKeyConstraint,
     Index,
 )
@@ -71,10 +70,11 @@ class Conversation(db.Model):
 
     @property
     def is_new(self) -> bool:
-        message_count = db.session.query(func.count(Message.id)).filter(
+        # 只需判断是否存在超过1条消息，最多读取2条记录，避免统计整个会话的消息数
+        message_ids = db.session.query(Message.id).filter(
             Message.conversation_id == self.id,
-        ).scalar()
-        return False if message_count > 1 else True
+        ).limit(2).all()
+        return len(message_ids) <= 1
 
 
 class Message(db.Model):
@@ -84,6 +84,7 @@ class Message(db.Model):
         PrimaryKeyConstraint("id", name="pk_message_id"),
         Index("message_conversation_id_idx", "conversation_id"),
         Index("message_created_by_idx", "created_by"),
+        Index("message_app_id_created_at_idx", "app_id", "created_at"),
     )
 
     id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
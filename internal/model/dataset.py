@@ -32,10 +32,12 @@ from sqlalchemy import (
     func,
     PrimaryKeyConstraint,
     Index,
+    UniqueConstraint,
 )
 from sqlalchemy.dialects.postgresql import JSONB
 
 from internal.extension.database_extension import db
+from pkg.sqlalchemy import get_preloaded, set_preloaded
 from .app import AppDatasetJoin
 from .upload_file import UploadFile
 
@@ -64,42 +66,70 @@ class Dataset(db.Model):
     @property
     def document_count(self) -> int:
         """只读属性，获取知识库下的文档数"""
-        return (
+        return get_preloaded(self, "document_count", lambda: (
             db.session.
             query(func.count(Document.id)).
             filter(Document.dataset_id == self.id).
             scalar()
-        )
+        ))
 
     @property
     def hit_count(self) -> int:
         """只读属性，获取该知识库的命中次数"""
-        return (
+        return get_preloaded(self, "hit_count", lambda: (
             db.session.
             query(func.coalesce(func.sum(Segment.hit_count), 0)).
             filter(Segment.dataset_id == self.id).
             scalar()
-        )
+        ))
 
     @property
     def related_app_count(self) -> int:
         """只读属性，获取该知识库关联的应用数"""
-        return (
+        return get_preloaded(self, "related_app_count", lambda: (
             db.session.
             query(func.count(AppDatasetJoin.id)).
             filter(AppDatasetJoin.dataset_id == self.id).
             scalar()
-        )
+        ))
 
     @property
     def character_count(self) -> int:
         """只读属性，获取该知识库下的字符总数"""
-        return (
+        return get_preloaded(self, "character_count", lambda: (
             db.session.
             query(func.coalesce(func.sum(Document.character_count), 0)).
             filter(Document.dataset_id == self.id).
             scalar()
-        )
+        ))
+
+    @classmethod
+    def preload_stats(cls, datasets: list["Dataset"]) -> None:
+        """使用分组查询批量预加载知识库列表的文档数、字符总数与关联应用数，避免列表接口逐条查询"""
+        dataset_ids = [dataset.id for dataset in datasets]
+        if not dataset_ids:
+            return
+
+        # 1.按知识库分组统计文档数、字符总数、关联应用数
+        document_stats = {
+            dataset_id: (document_count, character_count)
+            for dataset_id, document_count, character_count in db.session.query(
+                Document.dataset_id,
+                func.count(Document.id),
+                func.coalesce(func.sum(Document.character_count), 0),
+            ).filter(Document.dataset_id.in_(dataset_ids)).group_by(Document.dataset_id).all()
+        }
+        related_app_counts = dict(db.session.query(
+            AppDatasetJoin.dataset_id,
+            func.count(AppDatasetJoin.id),
+        ).filter(AppDatasetJoin.dataset_id.in_(dataset_ids)).group_by(AppDatasetJoin.dataset_id).all())
+
+        # 2.将统计结果设置到各个知识库实例上，没有记录的知识库统计值为0
+        for dataset in datasets:
+            document_count, character_count = document_stats.get(dataset.id, (0, 0))
+            set_preloaded(dataset, "document_count", document_count)
+            set_preloaded(dataset, "character_count", character_count)
+            set_preloaded(dataset, "related_app_count", related_app_counts.get(dataset.id, 0))
 
 
 class Document(db.Model):
@@ -142,9 +172,9 @@ class Document(db.Model):
 
     @property
     def upload_file(self) -> "UploadFile":
-        return db.session.query(UploadFile).filter(
+        return get_preloaded(self, "upload_file", lambda: db.session.query(UploadFile).filter(
             UploadFile.id == self.upload_file_id,
-        ).one_or_none()
+        ).one_or_none())
 
     @property
     def process_rule(self) -> "ProcessRule":
@@ -154,15 +184,51 @@ class Document(db.Model):
 
     @property
     def segment_count(self) -> int:
-        return db.session.query(func.count(Segment.id)).filter(
+        return get_preloaded(self, "segment_count", lambda: db.session.query(func.count(Segment.id)).filter(
             Segment.document_id == self.id,
-        ).scalar()
+        ).scalar())
 
     @property
     def hit_count(self) -> int:
-        return db.session.query(func.coalesce(func.sum(Segment.hit_count), 0)).filter(
+        return get_preloaded(self, "hit_count", lambda: db.session.query(
+            func.coalesce(func.sum(Segment.hit_count), 0),
+        ).filter(
             Segment.document_id == self.id,
-        ).scalar()
+        ).scalar())
+
+    @classmethod
+    def preload_stats(cls, documents: list["Document"]) -> None:
+        """使用分组查询批量预加载文档列表的片段数与命中次数，避免列表接口逐条查询"""
+        document_ids = [document.id for document in documents]
+        if not document_ids:
+            return
+
+        segment_stats = {
+            document_id: (segment_count, hit_count)
+            for document_id, segment_count, hit_count in db.session.query(
+                Segment.document_id,
+                func.count(Segment.id),
+                func.coalesce(func.sum(Segment.hit_count), 0),
+            ).filter(Segment.document_id.in_(document_ids)).group_by(Segment.document_id).all()
+        }
+        for document in documents:
+            segment_count, hit_count = segment_stats.get(document.id, (0, 0))
+            set_preloaded(document, "segment_count", segment_count)
+            set_preloaded(document, "hit_count", hit_count)
+
+    @classmethod
+    def preload_upload_files(cls, documents: list["Document"]) -> None:
+        """一次查询批量预加载文档列表关联的上传文件"""
+        upload_file_ids = list({document.upload_file_id for document in documents})
+        if not upload_file_ids:
+            return
+
+        upload_files = {
+            upload_file.id: upload_file
+            for upload_file in db.session.query(UploadFile).filter(UploadFile.id.in_(upload_file_ids)).all()
+        }
+        for document in documents:
+            set_preloaded(document, "upload_file", upload_files.get(document.upload_file_id))
 
 
 class Segment(db.Model):
@@ -208,23 +274,19 @@ class Segment(db.Model):
         return db.session.query(Document).get(self.document_id)
 
 
-class KeywordTable(db.Model):
-    """关键词表模型"""
-    __tablename__ = "keyword_table"
+class SegmentKeyword(db.Model):
+    """片段关键词倒排表模型，每个关键词与片段的对应关系为一行"""
+    __tablename__ = "segment_keyword"
     __table_args__ = (
-        PrimaryKeyConstraint("id", name="pk_keyword_table_id"),
-        Index("keyword_table_dataset_id_idx", "dataset_id"),
+        PrimaryKeyConstraint("id", name="pk_segment_keyword_id"),
+        UniqueConstraint("dataset_id", "keyword", "segment_id", name="uk_segment_keyword_dataset_id_keyword_segment_id"),
+        Index("segment_keyword_segment_id_idx", "segment_id"),
     )
 
     id = Column(UUID, nullable=False, server_default=text("uuid_generate_v4()"))
     dataset_id = Column(UUID, nullable=False)
-    keyword_table = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
-    updated_at = Column(
-        DateTime,
-        nullable=False,
-        server_default=text('CURRENT_TIMESTAMP(0)'),
-        onupdate=datetime.now,
-    )
+    keyword = Column(String(255), nullable=False, server_default=text("''::character varying"))
+    segment_id = Column(UUID, nullable=False)
     created_at = Column(DateTime, nullable=False, server_default=text('CURRENT_TIMESTAMP(0)'))
 
 
@@ -175,6 +175,10 @@ class Router:
         # 知识库模块
         bp.add_url_rule("/datasets", view_func=self.dataset_handler.get_datasets_with_page)
         bp.add_url_rule("/datasets", methods=["POST"], view_func=self.dataset_handler.create_dataset)
+        bp.add_url_rule(
+            "/datasets/embeddings-cache/metrics",
+            view_func=self.dataset_handler.get_embeddings_cache_metrics,
+        )
         bp.add_url_rule("/datasets/<uuid:dataset_id>", view_func=self.dataset_handler.get_dataset)
         bp.add_url_rule("/datasets/<uuid:dataset_id>", methods=["POST"], view_func=self.dataset_handler.update_dataset)
         bp.add_url_rule("/datasets/<uuid:dataset_id>/queries", view_func=self.dataset_handler.get_dataset_queries)
@@ -289,6 +293,10 @@ class Router:
         # 工作流模块
         bp.add_url_rule("/workflows", view_func=self.workflow_handler.get_workflows_with_page)
         bp.add_url_rule("/workflows", methods=["POST"], view_func=self.workflow_handler.create_workflow)
+        bp.add_url_rule(
+            "/workflows/compiled-cache/metrics",
+            view_func=self.workflow_handler.get_compiled_workflow_cache_metrics,
+        )
         bp.add_url_rule("/workflows/<uuid:workflow_id>", view_func=self.workflow_handler.get_workflow)
         bp.add_url_rule(
             "/workflows/<uuid:workflow_id>",
@@ -378,6 +386,10 @@ class Router:
         bp.add_url_rule("/web-apps/<string:token>/conversations", view_func=self.web_app_handler.get_conversations)
 
         # 会话模块
+        bp.add_url_rule(
+            "/conversations/background-queue/metrics",
+            view_func=self.conversation_handler.get_background_queue_metrics,
+        )
         bp.add_url_rule(
             "/conversations/<uuid:conversation_id>/messages",
             view_func=self.conversation_handler.get_conversation_messages_with_page,
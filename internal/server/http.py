@@ -28,6 +28,7 @@ from flask_migrate import Migrate
 from flask_weaviate import FlaskWeaviate
 
 from config import Config
+from internal.command import rebuild_ann_index_command, code_executor_server_command
 from internal.exception import CustomException
 from internal.extension import logging_extension, redis_extension, celery_extension
 from internal.middleware import Middleware
@@ -79,6 +80,10 @@ class Http(Flask):
         # 注册应用路由
         router.register_router(self)
 
+        # 注册命令行指令
+        self.cli.add_command(rebuild_ann_index_command)
+        self.cli.add_command(code_executor_server_command)
+
     def _register_error_handler(self, error: Exception):
         # 日志记录异常信息
         logging.error("An error occurred: %(error)s", {"error": error}, exc_info=True)
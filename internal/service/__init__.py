@@ -22,6 +22,7 @@ from .account_service import AccountService
 from .agent_service import AgentService
 from .ai_service import AIService
 from .analysis_service import AnalysisService
+from .ann_index_service import AnnIndexService
 from .api_key_service import ApiKeyService
 from .api_tool_service import ApiToolService
 from .app_service import AppService
@@ -89,5 +90,6 @@ __all__ = [
     "PlatformService",
     "WechatService",
     "SmsService",
-    "AgentService"
+    "AgentService",
+    "AnnIndexService",
 ]
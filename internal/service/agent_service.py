@@ -18,7 +18,6 @@
 @Author : caixiaorong01@outlook.com
 @File   : agent_service.py
 """
-import asyncio
 from dataclasses import dataclass
 from typing import Any
 
@@ -47,6 +46,7 @@ from internal.exception import ValidateException
 from internal.lib.helper import generate_random_string
 from internal.model import AppConfig, AppConfigVersion, App, Conversation
 from internal.service.app_config_service import AppConfigService
+from pkg.event_loop import run_coroutine_sync
 from pkg.sqlalchemy import SQLAlchemy
 from .language_model_service import LanguageModelService
 from .retrieval_service import RetrievalService
@@ -98,7 +98,7 @@ class AgentService:
 
         if config["mcp_server"]:
             client = MultiServerMCPClient(config["mcp_server"]["mcpServers"])
-            mcp_tools = asyncio.run(client.get_tools())
+            mcp_tools = run_coroutine_sync(client.get_tools())
             tools.extend(mcp_tools)
 
         return tools
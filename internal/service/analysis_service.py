@@ -20,14 +20,16 @@
 """
 import json
 from dataclasses import dataclass
-from datetime import datetime, timedelta
-from typing import Any
+from datetime import date, datetime, timedelta
+from typing import Any, Optional
 from uuid import UUID
 
 from injector import inject
 from redis import Redis
+from sqlalchemy import Date, cast, distinct, func
+from sqlalchemy.dialects.postgresql import insert
 
-from internal.model import Account, App, Message
+from internal.model import Account, AppDailyStat, Message
 from pkg.sqlalchemy import SQLAlchemy
 from .app_service import AppService
 from .base_service import BaseService
@@ -41,6 +43,9 @@ class AnalysisService(BaseService):
     redis_client: Redis
     app_service: AppService
 
+    # 每日汇总数据单条upsert语句最多写入的记录数
+    ROLLUP_BATCH_SIZE = 500
+
     def get_app_analysis(self, app_id: UUID, account: Account) -> dict[str, Any]:
         """根据传递的应用id+账号获取指定应用的分析信息"""
         # 根据传递的应用id获取应用信息并校验权限
@@ -65,19 +70,28 @@ class AnalysisService(BaseService):
             # 如果出错则什么都不处理，重新计算数据并更新缓存
             pass
 
-        # 查询消息表最近7天，以及最近14-7天的数据（数据要求答案非空、并且只要需要计算的数据）
-        seven_days_messages = self.get_messages_by_time_range(app, seven_days_ago, today_midnight)
-        fourteen_days_messages = self.get_messages_by_time_range(app, fourteen_days_ago, seven_days_ago)
+        # 读取最近14天的每日汇总数据，缺失的日期使用GROUP BY从消息表回填
+        daily_stats = self.get_daily_stats(app.id, fourteen_days_ago.date(), today_midnight.date())
+        seven_days_stats = [stat for stat in daily_stats if stat.stat_date >= seven_days_ago.date()]
+        fourteen_days_stats = [stat for stat in daily_stats if stat.stat_date < seven_days_ago.date()]
+
+        # 激活用户数与会话数需要跨天去重，无法由每日汇总累加得到，直接在数据库中聚合
+        seven_days_distinct = self.count_distinct_by_time_range(app.id, seven_days_ago, today_midnight)
+        fourteen_days_distinct = self.count_distinct_by_time_range(app.id, fourteen_days_ago, seven_days_ago)
 
         # 计算5个概念指标，涵盖：全部会话数、激活用户数、平均会话互动数、Token输出速度、费用消耗
-        seven_overview_indicators = self.calculate_overview_indicators_by_messages(seven_days_messages)
-        fourteen_overview_indicators = self.calculate_overview_indicators_by_messages(fourteen_days_messages)
+        seven_overview_indicators = self.calculate_overview_indicators_by_daily_stats(
+            seven_days_stats, *seven_days_distinct,
+        )
+        fourteen_overview_indicators = self.calculate_overview_indicators_by_daily_stats(
+            fourteen_days_stats, *fourteen_days_distinct,
+        )
 
         # 统计环比数据
         pop = self.calculate_pop_by_overview_indicators(seven_overview_indicators, fourteen_overview_indicators)
 
         # 计算4个指标对应的趋势
-        trend = self.calculate_trend_by_messages(today_midnight, 7, seven_days_messages)
+        trend = self.calculate_trend_by_daily_stats(today_midnight, 7, seven_days_stats)
 
         # 定义5个指标字段名称
         fields = [
@@ -101,42 +115,126 @@ class AnalysisService(BaseService):
 
         return app_analysis
 
-    def get_messages_by_time_range(self, app: App, start_at: datetime, end_at: datetime) -> list[Message]:
-        """根据传递的时间段获取指定应用的消息会话数据"""
-        return self.db.session.query(Message).with_entities(
-            Message.id, Message.conversation_id, Message.created_by,
-            Message.latency, Message.total_token_count, Message.total_price,
-            Message.created_at,
+    def get_daily_stats(self, app_id: UUID, start_date: date, end_date: date) -> list[AppDailyStat]:
+        """获取应用在[start_date, end_date)范围内的每日汇总数据，缺失的日期先从消息表回填"""
+        daily_stats = self._query_daily_stats(app_id, start_date, end_date)
+        if len(daily_stats) < (end_date - start_date).days:
+            self.rollup_daily_stats(start_date, end_date, app_id)
+            daily_stats = self._query_daily_stats(app_id, start_date, end_date)
+        return daily_stats
+
+    def _query_daily_stats(self, app_id: UUID, start_date: date, end_date: date) -> list[AppDailyStat]:
+        return self.db.session.query(AppDailyStat).filter(
+            AppDailyStat.app_id == app_id,
+            AppDailyStat.stat_date >= start_date,
+            AppDailyStat.stat_date < end_date,
+        ).order_by(AppDailyStat.stat_date).all()
+
+    def rollup_daily_stats(self, start_date: date, end_date: date, app_id: Optional[UUID] = None) -> int:
+        """使用GROUP BY date_trunc按天聚合消息表并写入每日汇总，未传递应用id时汇总所有应用，返回写入的记录数"""
+        stat_date = cast(func.date_trunc("day", Message.created_at), Date).label("stat_date")
+        query = self.db.session.query(
+            Message.app_id,
+            stat_date,
+            func.count(Message.id),
+            func.count(distinct(Message.created_by)),
+            func.count(distinct(Message.conversation_id)),
+            func.coalesce(func.sum(Message.total_token_count), 0),
+            func.coalesce(func.sum(Message.latency), 0),
+            func.coalesce(func.sum(Message.total_price), 0),
+        ).filter(
+            Message.created_at >= datetime.combine(start_date, datetime.min.time()),
+            Message.created_at < datetime.combine(end_date, datetime.min.time()),
+            Message.answer != "",
+        )
+        if app_id is not None:
+            query = query.filter(Message.app_id == app_id)
+
+        rows = {
+            (str(row[0]), row[1]): {
+                "app_id": row[0],
+                "stat_date": row[1],
+                "message_count": row[2],
+                "active_account_count": row[3],
+                "conversation_count": row[4],
+                "total_token_count": row[5],
+                "latency_sum": row[6],
+                "total_price": row[7],
+            }
+            for row in query.group_by(Message.app_id, stat_date).all()
+        }
+
+        # 指定应用时没有消息的日期同样写入空记录，避免每次读取都重新回填
+        if app_id is not None:
+            for day in range((end_date - start_date).days):
+                current_date = start_date + timedelta(days=day)
+                rows.setdefault((str(app_id), current_date), {
+                    "app_id": app_id,
+                    "stat_date": current_date,
+                    "message_count": 0,
+                    "active_account_count": 0,
+                    "conversation_count": 0,
+                    "total_token_count": 0,
+                    "latency_sum": 0,
+                    "total_price": 0,
+                })
+
+        if not rows:
+            return 0
+
+        values = list(rows.values())
+        with self.db.auto_commit():
+            for i in range(0, len(values), self.ROLLUP_BATCH_SIZE):
+                stmt = insert(AppDailyStat).values(values[i:i + self.ROLLUP_BATCH_SIZE])
+                self.db.session.execute(stmt.on_conflict_do_update(
+                    constraint="uk_app_daily_stat_app_id_stat_date",
+                    set_={
+                        "message_count": stmt.excluded.message_count,
+                        "active_account_count": stmt.excluded.active_account_count,
+                        "conversation_count": stmt.excluded.conversation_count,
+                        "total_token_count": stmt.excluded.total_token_count,
+                        "latency_sum": stmt.excluded.latency_sum,
+                        "total_price": stmt.excluded.total_price,
+                        "updated_at": datetime.now(),
+                    },
+                ))
+
+        return len(values)
+
+    def count_distinct_by_time_range(self, app_id: UUID, start_at: datetime, end_at: datetime) -> tuple[int, int]:
+        """统计时间段内去重的用户数及会话数"""
+        active_accounts, conversation_count = self.db.session.query(
+            func.count(distinct(Message.created_by)),
+            func.count(distinct(Message.conversation_id)),
         ).filter(
-            Message.app_id == app.id,
+            Message.app_id == app_id,
             Message.created_at >= start_at,
             Message.created_at < end_at,
             Message.answer != "",
-        ).all()
+        ).one()
+        return active_accounts, conversation_count
 
     @classmethod
-    def calculate_overview_indicators_by_messages(cls, messages: list[Message]) -> dict[str, Any]:
-        """根据传递的消息列表计算概览指标，涵盖全部会话数、激活用户数、平均会话互动数、Token输出速度、费用消耗"""
+    def calculate_overview_indicators_by_daily_stats(
+            cls, daily_stats: list[AppDailyStat], active_accounts: int, conversation_count: int,
+    ) -> dict[str, Any]:
+        """根据每日汇总数据计算概览指标，涵盖全部会话数、激活用户数、平均会话互动数、Token输出速度、费用消耗"""
         # 计算全部会话数，使用消息总数来计算
-        total_messages = len(messages)
-
-        # 计算激活用户数，使用唯一用户数判断
-        active_accounts = len({message.created_by for message in messages})
+        total_messages = sum(stat.message_count for stat in daily_stats)
 
         # 平均会话互动数，使用消息总数/会话总数，涉及除法要做/0判断
         avg_of_conversation_messages = 0
-        conversation_count = len({message.conversation_id for message in messages})
         if conversation_count != 0:
             avg_of_conversation_messages = total_messages / conversation_count
 
         # Token输出速度，使用总token数/总耗时，涉及除法要做/0判断
         token_output_rate = 0
-        latency_sum = sum(message.latency for message in messages)
+        latency_sum = sum(stat.latency_sum for stat in daily_stats)
         if latency_sum != 0:
-            token_output_rate = sum(message.total_token_count for message in messages) / latency_sum
+            token_output_rate = sum(stat.total_token_count for stat in daily_stats) / latency_sum
 
         # 计算费用消耗，使用总花费进行求和
-        cost_consumption = sum(message.total_price for message in messages)
+        cost_consumption = sum(stat.total_price for stat in daily_stats)
 
         # 返回数据，并且对于小数型数据，如果数值过小，需要转换成float，避免Python使用科学计数法进行展示
         return {
@@ -176,12 +274,13 @@ class AnalysisService(BaseService):
         return pop
 
     @classmethod
-    def calculate_trend_by_messages(
-            cls, end_at: datetime, days_ago: int, messages: list[Message],
+    def calculate_trend_by_daily_stats(
+            cls, end_at: datetime, days_ago: int, daily_stats: list[AppDailyStat],
     ) -> dict[str, Any]:
-        """根据传递的结束时间、回退天数、消息列表计算对应指标的趋势数据"""
+        """根据传递的结束时间、回退天数、每日汇总数据计算对应指标的趋势数据"""
         # 重新计算end_at为午夜时间
         end_at = datetime.combine(end_at, datetime.min.time())
+        stats_by_date = {stat.stat_date: stat for stat in daily_stats}
 
         # 定义初始数据
         total_messages_trend = {"x_axis": [], "y_axis": []}
@@ -189,46 +288,31 @@ class AnalysisService(BaseService):
         avg_of_conversation_messages_trend = {"x_axis": [], "y_axis": []}
         cost_consumption_trend = {"x_axis": [], "y_axis": []}
 
-        # 循环遍历计算并提取数据
+        # 循环遍历每一天提取数据，没有汇总记录的日期按0处理
         for day in range(days_ago):
-            # 计算起点和终点时间
             trend_start_at = end_at - timedelta(days_ago - day)
-            trend_end_at = end_at - timedelta(days_ago - day - 1)
-
-            # 计算全部会话趋势
-            total_messages_trend_y_axis = len([
-                message for message in messages
-                if trend_start_at <= message.created_at < trend_end_at
-            ])
-            total_messages_trend["x_axis"].append(int(trend_start_at.timestamp()))
-            total_messages_trend["y_axis"].append(total_messages_trend_y_axis)
-
-            # 计算激活用户趋势数据
-            active_accounts_trend_y_axis = len({
-                message.created_by for message in messages
-                if trend_start_at <= message.created_at < trend_end_at
-            })
-            active_accounts_trend["x_axis"].append(int(trend_start_at.timestamp()))
-            active_accounts_trend["y_axis"].append(active_accounts_trend_y_axis)
+            x_axis = int(trend_start_at.timestamp())
+            stat = stats_by_date.get(trend_start_at.date())
+
+            message_count = stat.message_count if stat else 0
+            active_account_count = stat.active_account_count if stat else 0
+            conversation_count = stat.conversation_count if stat else 0
+            total_price = stat.total_price if stat else 0
+
+            total_messages_trend["x_axis"].append(x_axis)
+            total_messages_trend["y_axis"].append(message_count)
+
+            active_accounts_trend["x_axis"].append(x_axis)
+            active_accounts_trend["y_axis"].append(active_account_count)
 
             # 计算平均会话互动趋势
-            avg_of_conversation_messages_trend_y_axis = 0
-            conversation_count = len({
-                message.conversation_id for message in messages
-                if trend_start_at <= message.created_at < trend_end_at
-            })
-            if conversation_count != 0:
-                avg_of_conversation_messages_trend_y_axis = total_messages_trend_y_axis / conversation_count
-            avg_of_conversation_messages_trend["x_axis"].append(int(trend_start_at.timestamp()))
-            avg_of_conversation_messages_trend["y_axis"].append(float(avg_of_conversation_messages_trend_y_axis))
-
-            # 计算费用消耗趋势
-            cost_consumption_trend_y_axis = sum(
-                float(message.total_price) for message in messages
-                if trend_start_at <= message.created_at < trend_end_at
+            avg_of_conversation_messages_trend["x_axis"].append(x_axis)
+            avg_of_conversation_messages_trend["y_axis"].append(
+                float(message_count / conversation_count) if conversation_count != 0 else 0.0
             )
-            cost_consumption_trend["x_axis"].append(int(trend_start_at.timestamp()))
-            cost_consumption_trend["y_axis"].append(float(cost_consumption_trend_y_axis))
+
+            cost_consumption_trend["x_axis"].append(x_axis)
+            cost_consumption_trend["y_axis"].append(float(total_price))
 
         return {
             "total_messages_trend": total_messages_trend,
@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 13:40
+@Author : caixiaorong01@outlook.com
+@File   : ann_index_service.py
+"""
+import json
+import logging
+import os
+import shutil
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+import faiss
+import numpy as np
+from injector import inject
+from langchain_core.documents import Document as LCDocument
+from redis import Redis
+from weaviate.classes.query import Filter
+
+from internal.entity.cache_entity import (
+    ANN_INDEX_VERSION,
+    ANN_INDEX_READY_VERSION,
+    ANN_INDEX_REMOVED_NODES,
+    ANN_INDEX_ADDED_NODES,
+    ANN_INDEX_STALE,
+    ANN_INDEX_REBUILD_SCHEDULED,
+    LOCK_ANN_INDEX_REBUILD,
+    LOCK_EXPIRE_TIME,
+)
+from internal.entity.dataset_entity import SegmentStatus
+from internal.model import Document, Segment
+from internal.task.dataset_task import rebuild_ann_index
+from pkg.sqlalchemy import SQLAlchemy
+from .base_service import BaseService
+from .embeddings_service import EmbeddingsService
+from .vector_database_service import VectorDatabaseService
+
+
+@dataclass
+class LocalAnnIndex:
+    """进程内加载的知识库向量索引，index中的位置与node_ids一一对应"""
+    version: int
+    index: Optional[faiss.Index]
+    node_ids: list[str]
+    node_id_set: set[str]
+
+
+# 进程内常驻的知识库索引副本，多个请求共享
+_local_ann_indexes: dict[str, LocalAnnIndex] = {}
+_local_ann_indexes_lock = threading.Lock()
+
+
+@inject
+@dataclass
+class AnnIndexService(BaseService):
+    """知识库本地向量索引副本服务。
+    索引由weaviate中的向量构建并持久化到共享存储，各进程以内存映射的方式加载，weaviate仍是唯一数据源。
+    索引构建后发生的禁用/删除通过移除集合在查询时过滤，重新启用的节点直接恢复，
+    只有新增向量或向量变更时才视为过期，过期期间回退到weaviate检索并异步重建。
+    """
+    db: SQLAlchemy
+    redis_client: Redis
+    embeddings_service: EmbeddingsService
+    vector_database_service: VectorDatabaseService
+
+    @classmethod
+    def is_enabled(cls) -> bool:
+        return os.getenv("ANN_INDEX_ENABLED", "False").lower() == "true"
+
+    @classmethod
+    def _get_index_dir(cls, dataset_id: UUID | str) -> str:
+        base_dir = os.getenv("ANN_INDEX_DIR", os.path.join(os.getcwd(), "storage", "ann_index"))
+        return os.path.join(base_dir, str(dataset_id))
+
+    def mark_nodes_added(self, dataset_id: UUID, node_ids: list[UUID | str]) -> None:
+        """记录索引构建后被新增或重新启用的节点"""
+        if not node_ids or not self._has_index(dataset_id):
+            return
+        node_ids = [str(node_id) for node_id in node_ids]
+        pipeline = self.redis_client.pipeline()
+        pipeline.srem(ANN_INDEX_REMOVED_NODES.format(dataset_id=dataset_id), *node_ids)
+        pipeline.sadd(ANN_INDEX_ADDED_NODES.format(dataset_id=dataset_id), *node_ids)
+        pipeline.execute()
+
+    def mark_nodes_removed(self, dataset_id: UUID, node_ids: list[UUID | str]) -> None:
+        """记录索引构建后被禁用或删除的节点，查询时直接过滤"""
+        if not node_ids or not self._has_index(dataset_id):
+            return
+        node_ids = [str(node_id) for node_id in node_ids]
+        pipeline = self.redis_client.pipeline()
+        pipeline.sadd(ANN_INDEX_REMOVED_NODES.format(dataset_id=dataset_id), *node_ids)
+        pipeline.srem(ANN_INDEX_ADDED_NODES.format(dataset_id=dataset_id), *node_ids)
+        pipeline.execute()
+
+    def mark_stale(self, dataset_id: UUID) -> None:
+        """已索引节点的向量发生变更，索引需要重建"""
+        if self._has_index(dataset_id):
+            self.redis_client.set(ANN_INDEX_STALE.format(dataset_id=dataset_id), 1)
+
+    def delete_index(self, dataset_id: UUID) -> None:
+        """删除知识库的索引文件及状态记录"""
+        self.redis_client.delete(
+            ANN_INDEX_VERSION.format(dataset_id=dataset_id),
+            ANN_INDEX_READY_VERSION.format(dataset_id=dataset_id),
+            ANN_INDEX_REMOVED_NODES.format(dataset_id=dataset_id),
+            ANN_INDEX_ADDED_NODES.format(dataset_id=dataset_id),
+            ANN_INDEX_STALE.format(dataset_id=dataset_id),
+        )
+        shutil.rmtree(self._get_index_dir(dataset_id), ignore_errors=True)
+
+    def get_index_status(self, dataset_id: UUID) -> dict:
+        """获取知识库索引的版本及过期状态"""
+        version, ready_version, stale, removed_count, added_count = self._get_index_state(dataset_id, True)
+        return {
+            "version": version,
+            "ready_version": ready_version,
+            "removed_count": removed_count,
+            "added_count": added_count,
+            "stale": stale or ready_version is None or ready_version != version or added_count > 0,
+        }
+
+    def rebuild(self, dataset_id: UUID) -> None:
+        """从数据库+weaviate全量重建知识库索引"""
+        cache_key = LOCK_ANN_INDEX_REBUILD.format(dataset_id=dataset_id)
+        with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
+            # 1.递增版本号使旧索引立即失效，并清空增量记录，之后发生的变更会重新记录
+            version = self.redis_client.incr(ANN_INDEX_VERSION.format(dataset_id=dataset_id))
+            self.redis_client.delete(
+                ANN_INDEX_REMOVED_NODES.format(dataset_id=dataset_id),
+                ANN_INDEX_ADDED_NODES.format(dataset_id=dataset_id),
+                ANN_INDEX_STALE.format(dataset_id=dataset_id),
+            )
+
+            # 2.获取知识库下所有可检索的节点
+            node_ids = [
+                str(node_id) for node_id, in self.db.session.query(Segment).with_entities(Segment.node_id).join(
+                    Document, Document.id == Segment.document_id,
+                ).filter(
+                    Segment.dataset_id == dataset_id,
+                    Segment.enabled.is_(True),
+                    Segment.status == SegmentStatus.COMPLETED,
+                    Document.enabled.is_(True),
+                ).all()
+            ]
+
+            # 3.分批从weaviate中读取向量
+            vectors = {}
+            collection = self.vector_database_service.collection
+            for i in range(0, len(node_ids), 500):
+                response = collection.query.fetch_objects(
+                    filters=Filter.by_id().contains_any(node_ids[i:i + 500]),
+                    include_vector=True,
+                    limit=500,
+                )
+                for obj in response.objects:
+                    vectors[str(obj.uuid)] = obj.vector["default"]
+            indexed_node_ids = [node_id for node_id in node_ids if node_id in vectors]
+
+            # 4.构建索引并写入共享存储
+            index_dir = self._get_index_dir(dataset_id)
+            os.makedirs(index_dir, exist_ok=True)
+            if indexed_node_ids:
+                matrix = np.array([vectors[node_id] for node_id in indexed_node_ids], dtype="float32")
+                faiss.normalize_L2(matrix)
+                index = self._create_index(matrix.shape[1], matrix.shape[0])
+                index.add(matrix)
+                faiss.write_index(index, os.path.join(index_dir, f"{version}.faiss"))
+            with open(os.path.join(index_dir, f"{version}.json"), "w") as file:
+                json.dump({"node_ids": indexed_node_ids, "built_at": datetime.now().isoformat()}, file)
+
+            # 5.标记版本构建完成，并清除旧版本文件
+            self.redis_client.set(ANN_INDEX_READY_VERSION.format(dataset_id=dataset_id), version)
+            for filename in os.listdir(index_dir):
+                if filename.split(".")[0] != str(version):
+                    os.remove(os.path.join(index_dir, filename))
+
+    def search(
+            self,
+            dataset_ids: list[UUID],
+            query: str,
+            k: int = 4,
+            score_threshold: float = 0,
+    ) -> Optional[list[LCDocument]]:
+        """在本地索引中执行相似性检索，任一知识库索引不可用时返回None，由调用方回退到weaviate"""
+        if not self.is_enabled():
+            return None
+
+        # 1.获取所有知识库的最新本地索引
+        local_indexes = []
+        for dataset_id in dataset_ids:
+            local_index, removed_node_ids = self._get_fresh_local_index(dataset_id)
+            if local_index is None:
+                return None
+            local_indexes.append((local_index, removed_node_ids))
+
+        # 2.在各个索引中检索，需要多取被移除的数量，保证过滤后仍有k条数据
+        query_vector = np.array([self.embeddings_service.cache_backed_embeddings.embed_query(query)], dtype="float32")
+        faiss.normalize_L2(query_vector)
+        candidates = []
+        for local_index, removed_node_ids in local_indexes:
+            if local_index.index is None:
+                continue
+            fetch_k = min(k + len(removed_node_ids), len(local_index.node_ids))
+            scores, positions = local_index.index.search(query_vector, fetch_k)
+            for score, position in zip(scores[0], positions[0]):
+                if position < 0:
+                    continue
+                node_id = local_index.node_ids[position]
+                relevance_score = self.to_relevance_score(float(score))
+                if node_id in removed_node_ids or relevance_score < score_threshold:
+                    continue
+                candidates.append((relevance_score, node_id))
+        candidates = sorted(candidates, reverse=True)[:k]
+
+        # 3.从数据库获取片段内容，构建与weaviate检索结果一致的文档
+        segments = {
+            str(segment.node_id): segment for segment in self.db.session.query(Segment).filter(
+                Segment.node_id.in_([node_id for _, node_id in candidates])
+            ).all()
+        }
+        return [
+            LCDocument(
+                page_content=segments[node_id].content,
+                metadata={
+                    "account_id": str(segments[node_id].account_id),
+                    "dataset_id": str(segments[node_id].dataset_id),
+                    "document_id": str(segments[node_id].document_id),
+                    "segment_id": str(segments[node_id].id),
+                    "node_id": node_id,
+                    "document_enabled": True,
+                    "segment_enabled": True,
+                    "score": score,
+                }
+            ) for score, node_id in candidates if node_id in segments
+        ]
+
+    @classmethod
+    def to_relevance_score(cls, cosine_similarity: float) -> float:
+        """将余弦相似度[-1,1]线性映射为相关性得分[0,1]，本地索引与weaviate回退路径统一使用该得分，
+        保证score_threshold过滤及展示的score在两条检索路径下含义相同
+        """
+        return min(max((1 + cosine_similarity) / 2, 0.0), 1.0)
+
+    def _get_fresh_local_index(self, dataset_id: UUID) -> tuple[Optional[LocalAnnIndex], set[str]]:
+        """获取与共享存储一致且未过期的本地索引，不可用时调度重建"""
+        version, ready_version, stale, removed_node_ids, added_node_ids = self._get_index_state(dataset_id)
+        if ready_version is None or ready_version != version or stale:
+            self._schedule_rebuild(dataset_id)
+            return None, set()
+
+        local_index = _local_ann_indexes.get(str(dataset_id))
+        if local_index is None or local_index.version != ready_version:
+            local_index = self._load_local_index(dataset_id, ready_version)
+            if local_index is None:
+                return None, set()
+
+        # 存在索引中没有的新增节点，说明索引已过期
+        if not added_node_ids.issubset(local_index.node_id_set):
+            self._schedule_rebuild(dataset_id)
+            return None, set()
+
+        return local_index, removed_node_ids
+
+    def _get_index_state(self, dataset_id: UUID, count_only: bool = False) -> tuple:
+        pipeline = self.redis_client.pipeline(transaction=False)
+        pipeline.get(ANN_INDEX_VERSION.format(dataset_id=dataset_id))
+        pipeline.get(ANN_INDEX_READY_VERSION.format(dataset_id=dataset_id))
+        pipeline.exists(ANN_INDEX_STALE.format(dataset_id=dataset_id))
+        if count_only:
+            pipeline.scard(ANN_INDEX_REMOVED_NODES.format(dataset_id=dataset_id))
+            pipeline.scard(ANN_INDEX_ADDED_NODES.format(dataset_id=dataset_id))
+        else:
+            pipeline.smembers(ANN_INDEX_REMOVED_NODES.format(dataset_id=dataset_id))
+            pipeline.smembers(ANN_INDEX_ADDED_NODES.format(dataset_id=dataset_id))
+        version, ready_version, stale, removed, added = pipeline.execute()
+
+        if not count_only:
+            removed = {node_id.decode() for node_id in removed}
+            added = {node_id.decode() for node_id in added}
+        return (
+            int(version) if version is not None else None,
+            int(ready_version) if ready_version is not None else None,
+            bool(stale),
+            removed,
+            added,
+        )
+
+    def _has_index(self, dataset_id: UUID) -> bool:
+        return bool(self.redis_client.exists(ANN_INDEX_VERSION.format(dataset_id=dataset_id)))
+
+    def _schedule_rebuild(self, dataset_id: UUID) -> None:
+        """调度异步重建，一段时间内只调度一次"""
+        if self.is_enabled() and self.redis_client.set(
+                ANN_INDEX_REBUILD_SCHEDULED.format(dataset_id=dataset_id), 1, nx=True, ex=60,
+        ):
+            rebuild_ann_index.delay(dataset_id)
+
+    def _load_local_index(self, dataset_id: UUID, version: int) -> Optional[LocalAnnIndex]:
+        """以内存映射的方式加载指定版本的索引到进程内"""
+        index_dir = self._get_index_dir(dataset_id)
+        try:
+            with open(os.path.join(index_dir, f"{version}.json")) as file:
+                node_ids = json.load(file)["node_ids"]
+            index = self._read_index(os.path.join(index_dir, f"{version}.faiss")) if node_ids else None
+        except (OSError, RuntimeError) as e:
+            logging.warning(
+                "加载知识库本地向量索引失败, dataset_id: %(dataset_id)s, 错误信息: %(error)s",
+                {"dataset_id": dataset_id, "error": e},
+            )
+            return None
+
+        local_index = LocalAnnIndex(version=version, index=index, node_ids=node_ids, node_id_set=set(node_ids))
+        with _local_ann_indexes_lock:
+            _local_ann_indexes[str(dataset_id)] = local_index
+        return local_index
+
+    @classmethod
+    def _create_index(cls, dimension: int, count: int) -> faiss.Index:
+        """小规模数据使用精确检索，数据量较大时使用HNSW"""
+        if count >= int(os.getenv("ANN_INDEX_HNSW_THRESHOLD", 20000)):
+            return faiss.IndexHNSWFlat(dimension, 32, faiss.METRIC_INNER_PRODUCT)
+        return faiss.IndexFlatIP(dimension)
+
+    @classmethod
+    def _read_index(cls, path: str) -> faiss.Index:
+        mmap_flag = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+        try:
+            return faiss.read_index(path, mmap_flag | faiss.IO_FLAG_READ_ONLY)
+        except RuntimeError:
+            # 当前索引类型不支持内存映射时，退化为完整读取
+            return faiss.read_index(path)
@@ -18,6 +18,7 @@
 @Author  : caixiaorong01@outlook.com
 @File    : app_config_service.py
 """
+import logging
 import os
 from dataclasses import dataclass
 from typing import Any, Union
@@ -31,8 +32,7 @@ from internal.core.language_model.entities.model_entity import ModelParameterTyp
 from internal.core.tools.api_tools.entites import ToolEntity
 from internal.core.tools.api_tools.providers import ApiProviderManager
 from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
-from internal.core.workflow import Workflow as WorkflowTool
-from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+from internal.core.workflow import compiled_workflow_cache
 from internal.entity.app_entity import DEFAULT_APP_CONFIG, AppStatus
 from internal.entity.workflow_entity import WorkflowStatus
 from internal.lib.helper import datetime_to_timestamp, get_value_type
@@ -187,16 +187,20 @@ class AppConfigService(BaseService):
         workflows = []
         for workflow_record in workflow_records:
             try:
-                # 创建工作流工具
-                workflow_tool = WorkflowTool(workflow_config=WorkflowConfig(
+                # 从已编译工作流缓存中获取工作流工具，图配置未变化时跳过校验与编译
+                workflow_tool = compiled_workflow_cache.get_or_create(
+                    workflow_id=workflow_record.id,
                     account_id=workflow_record.account_id,
                     name=f"wf_{workflow_record.tool_call_name}",
                     description=workflow_record.description,
-                    nodes=workflow_record.graph.get("nodes", []),
-                    edges=workflow_record.graph.get("edges", []),
-                ))
+                    graph=workflow_record.graph,
+                )
                 workflows.append(workflow_tool)
-            except Exception:
+            except Exception as e:
+                logging.exception(
+                    "工作流工具构建失败, 工作流id: %(workflow_id)s, 错误信息: %(error)s",
+                    {"workflow_id": workflow_record.id, "error": e},
+                )
                 continue
 
         return workflows
@@ -276,6 +276,7 @@ class AppService(BaseService):
         apps = paginator.paginate(
             self.db.session.query(App).filter(*filters).order_by(desc("created_at"))
         )
+        App.preload_configs(apps)
 
         return apps, paginator
 
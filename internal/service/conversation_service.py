@@ -19,9 +19,10 @@
 @File   : conversation_service.py
 """
 import logging
+import os
 from dataclasses import dataclass
 from datetime import datetime
-from threading import Thread
+from threading import Lock, Thread
 from typing import Any
 from uuid import UUID
 
@@ -30,7 +31,7 @@ from injector import inject
 from langchain_core.output_parsers import StrOutputParser
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_openai import ChatOpenAI
-from sqlalchemy import desc
+from sqlalchemy import desc, insert
 from sqlalchemy.orm import joinedload
 
 from internal.core.agent.entities.queue_entity import AgentThought, QueueEvent
@@ -44,10 +45,34 @@ from internal.entity.conversation_entity import (
 from internal.exception import NotFoundException
 from internal.model import Conversation, Message, MessageAgentThought, Account
 from internal.schema.conversation_schema import GetConversationMessagesWithPageReq
+from pkg.background_queue import BackgroundQueue
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
 
+# 智能体推理步骤后台写入队列，队列容量限制了写入的最大积压
+agent_thought_writer = BackgroundQueue(
+    name="agent-thought-writer",
+    max_size=int(os.getenv("AGENT_THOUGHT_WRITER_QUEUE_SIZE", 1000)),
+    workers=int(os.getenv("AGENT_THOUGHT_WRITER_WORKERS", 2)),
+    drain_timeout=float(os.getenv("AGENT_THOUGHT_WRITER_DRAIN_TIMEOUT", 10)),
+)
+
+# 会话后处理队列，用于生成会话摘要与会话名称，队列已满时立即返回不阻塞响应
+conversation_post_processor = BackgroundQueue(
+    name="conversation-post-processor",
+    max_size=int(os.getenv("CONVERSATION_POST_PROCESS_QUEUE_SIZE", 1000)),
+    workers=int(os.getenv("CONVERSATION_POST_PROCESS_WORKERS", 4)),
+    put_timeout=0,
+    drain_timeout=float(os.getenv("CONVERSATION_POST_PROCESS_DRAIN_TIMEOUT", 5)),
+)
+
+# 待生成摘要的对话轮次及已提交后处理任务的会话id，用于合并同一会话快速连续的多轮对话
+_pending_summary_turns: dict[str, list[tuple[str, str]]] = {}
+_scheduled_summary_ids: set[str] = set()
+_scheduled_name_ids: set[str] = set()
+_pending_lock = Lock()
+
 
 @inject
 @dataclass
@@ -137,13 +162,18 @@ class ConversationService(BaseService):
     @classmethod
     def summary(cls, human_message: str, ai_message: str, old_summary: str = "") -> str:
         """总结生成新摘要"""
+        return cls.summary_turns([(human_message, ai_message)], old_summary)
+
+    @classmethod
+    def summary_turns(cls, turns: list[tuple[str, str]], old_summary: str = "") -> str:
+        """将多轮对话合并到一次调用中总结生成新摘要"""
         prompt = ChatPromptTemplate.from_template(SUMMARIZER_TEMPLATE)
         # 构建llm设置温度降低幻觉概率
         llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.5)
         summary_chain = prompt | llm | StrOutputParser()
         new_summary = summary_chain.invoke({
             "summary": old_summary,
-            "new_lines": f"Human: {human_message}\nAI: {ai_message}",
+            "new_lines": "\n".join(f"Human: {human_message}\nAI: {ai_message}" for human_message, ai_message in turns),
         })
 
         return new_summary
@@ -213,7 +243,40 @@ class ConversationService(BaseService):
             message_id: UUID,
             agent_thoughts: list[AgentThought],
     ):
-        """存储智能体推理步骤消息"""
+        """存储智能体推理步骤消息，AGENT_THOUGHT_WRITE_MODE为background时提交到后台写入队列，流式输出结束无需等待数据库"""
+        flask_app = current_app._get_current_object()
+        kwargs = {
+            "flask_app": flask_app,
+            "account_id": account_id,
+            "app_id": app_id,
+            "app_config": app_config,
+            "conversation_id": conversation_id,
+            "message_id": message_id,
+            "agent_thoughts": agent_thoughts,
+        }
+        if os.getenv("AGENT_THOUGHT_WRITE_MODE", "sync") == "background":
+            # 队列已满说明写入积压，降级为同步写入，避免积压延迟无限增长
+            if agent_thought_writer.submit(self._save_agent_thoughts_with_app_context, **kwargs):
+                return
+
+        self._save_agent_thoughts(**kwargs)
+
+    def _save_agent_thoughts_with_app_context(self, flask_app: Flask, **kwargs: Any) -> None:
+        """在后台写入线程中存储智能体推理步骤消息"""
+        with flask_app.app_context():
+            self._save_agent_thoughts(flask_app=flask_app, **kwargs)
+
+    def _save_agent_thoughts(
+            self,
+            flask_app: Flask,
+            account_id: UUID,
+            app_id: UUID,
+            app_config: dict[str, Any],
+            conversation_id: UUID,
+            message_id: UUID,
+            agent_thoughts: list[AgentThought],
+    ):
+        """在同一个事务中批量插入推理步骤并更新消息，只提交一次"""
         # 定义变量存储推理位置及总耗时
         position = 0
         latency = 0
@@ -222,7 +285,10 @@ class ConversationService(BaseService):
         conversation = self.get(Conversation, conversation_id)
         message = self.get(Message, message_id)
 
-        # 循环遍历所有的智能体推理过程执行存储操作
+        # 循环遍历所有的智能体推理过程，组装批量插入的数据及消息需要更新的字段
+        agent_thought_rows = []
+        message_updates = {}
+        answer = None
         for agent_thought in agent_thoughts:
             # 存储长期记忆召回、推理、消息、动作、知识库检索等步骤
             if agent_thought.event in [
@@ -238,40 +304,38 @@ class ConversationService(BaseService):
                 latency += agent_thought.latency
 
                 # 创建智能体消息推理步骤
-                self.create(
-                    MessageAgentThought,
-                    app_id=app_id,
-                    conversation_id=conversation.id,
-                    message_id=message.id,
-                    invoke_from=InvokeFrom.DEBUGGER,
-                    created_by=account_id,
-                    position=position,
-                    event=agent_thought.event,
-                    thought=agent_thought.thought,
-                    observation=agent_thought.observation,
-                    tool=agent_thought.tool,
-                    tool_input=agent_thought.tool_input,
+                agent_thought_rows.append({
+                    "app_id": app_id,
+                    "conversation_id": conversation.id,
+                    "message_id": message.id,
+                    "invoke_from": InvokeFrom.DEBUGGER,
+                    "created_by": account_id,
+                    "position": position,
+                    "event": agent_thought.event,
+                    "thought": agent_thought.thought,
+                    "observation": agent_thought.observation,
+                    "tool": agent_thought.tool,
+                    "tool_input": agent_thought.tool_input,
                     # 消息相关数据
-                    message=agent_thought.message,
-                    message_token_count=agent_thought.message_token_count,
-                    message_unit_price=agent_thought.message_unit_price,
-                    message_price_unit=agent_thought.message_price_unit,
+                    "message": agent_thought.message,
+                    "message_token_count": agent_thought.message_token_count,
+                    "message_unit_price": agent_thought.message_unit_price,
+                    "message_price_unit": agent_thought.message_price_unit,
                     # 答案相关字段
-                    answer=agent_thought.answer,
-                    answer_token_count=agent_thought.answer_token_count,
-                    answer_unit_price=agent_thought.answer_unit_price,
-                    answer_price_unit=agent_thought.answer_price_unit,
+                    "answer": agent_thought.answer,
+                    "answer_token_count": agent_thought.answer_token_count,
+                    "answer_unit_price": agent_thought.answer_unit_price,
+                    "answer_price_unit": agent_thought.answer_price_unit,
                     # Agent推理统计相关
-                    total_token_count=agent_thought.total_token_count,
-                    total_price=agent_thought.total_price,
-                    latency=agent_thought.latency,
-                )
+                    "total_token_count": agent_thought.total_token_count,
+                    "total_price": agent_thought.total_price,
+                    "latency": agent_thought.latency,
+                })
 
             # 检测事件是否为Agent_message
             if agent_thought.event == QueueEvent.AGENT_MESSAGE:
-                # 更新消息信息
-                self.update(
-                    message,
+                answer = agent_thought.answer
+                message_updates.update(
                     # 消息相关字段
                     message=agent_thought.message,
                     message_token_count=agent_thought.message_token_count,
@@ -288,55 +352,79 @@ class ConversationService(BaseService):
                     latency=latency,
                 )
 
-                # 检测是否开启长期记忆
-                if app_config["long_term_memory"]["enable"]:
-                    Thread(
-                        target=self._generate_summary_and_update,
-                        kwargs={
-                            "flask_app": current_app._get_current_object(),
-                            "conversation_id": conversation.id,
-                            "query": message.query,
-                            "answer": agent_thought.answer,
-                        },
-                    ).start()
-
-                # 处理生成新会话名称
-                if conversation.is_new:
-                    self._generate_conversation_name_and_update(flask_app=current_app._get_current_object(),
-                                                                conversation_id=conversation.id, query=message.query)
-
             # 判断是否为停止或者错误，如果是则需要更新消息状态
             if agent_thought.event in [QueueEvent.TIMEOUT, QueueEvent.STOP, QueueEvent.ERROR]:
-                self.update(
-                    message,
-                    status=agent_thought.event,
-                    error=agent_thought.observation,
-                )
+                message_updates.update(status=agent_thought.event, error=agent_thought.observation)
                 break
 
-    def _generate_summary_and_update(
-            self,
-            flask_app: Flask,
-            conversation_id: UUID,
-            query: str,
-            answer: str,
-    ):
-        with flask_app.app_context():
-            # 根据id获取会话
-            conversation = self.get(Conversation, conversation_id)
-
-            # 计算会话新摘要信息
-            new_summary = self.summary(
-                query,
-                answer,
-                conversation.summary
-            )
-
-            # 更新会话的摘要信息
-            self.update(
-                conversation,
-                summary=new_summary,
-            )
+        # 推理步骤批量插入与消息更新在同一个事务中提交
+        with self.db.auto_commit():
+            if agent_thought_rows:
+                self.db.session.execute(insert(MessageAgentThought), agent_thought_rows)
+            for field, value in message_updates.items():
+                setattr(message, field, value)
+
+        if answer is not None:
+            # 摘要与会话名称均提交到后处理队列中生成，不阻塞响应
+            if app_config["long_term_memory"]["enable"]:
+                self.schedule_summary_update(flask_app, conversation.id, message.query, answer)
+            if conversation.is_new:
+                self.schedule_conversation_name_update(flask_app, conversation.id, message.query)
+
+    def schedule_summary_update(self, flask_app: Flask, conversation_id: UUID, query: str, answer: str) -> None:
+        """提交会话摘要更新，同一会话同时最多只有一个摘要任务，任务执行期间新增的对话轮次会被合并处理"""
+        key = str(conversation_id)
+        with _pending_lock:
+            _pending_summary_turns.setdefault(key, []).append((query, answer))
+            if key in _scheduled_summary_ids:
+                return
+            _scheduled_summary_ids.add(key)
+
+        if not conversation_post_processor.submit(self._generate_summary_and_update, flask_app, conversation_id):
+            # 队列已满时使用独立线程兜底，保证长期记忆不丢失
+            Thread(target=self._generate_summary_and_update, args=(flask_app, conversation_id)).start()
+
+    def schedule_conversation_name_update(self, flask_app: Flask, conversation_id: UUID, query: str) -> None:
+        """提交会话名称生成，同一会话重复提交只生成一次"""
+        key = str(conversation_id)
+        with _pending_lock:
+            if key in _scheduled_name_ids:
+                return
+            _scheduled_name_ids.add(key)
+
+        if not conversation_post_processor.submit(
+                self._generate_conversation_name_and_update, flask_app, conversation_id, query,
+        ):
+            Thread(target=self._generate_conversation_name_and_update, args=(flask_app, conversation_id, query)).start()
+
+    def _generate_summary_and_update(self, flask_app: Flask, conversation_id: UUID) -> None:
+        """循环取出会话待总结的对话轮次，一次LLM调用合并生成新摘要，直到没有新的对话轮次"""
+        key = str(conversation_id)
+        try:
+            while True:
+                with _pending_lock:
+                    turns = _pending_summary_turns.pop(key, [])
+                    if not turns:
+                        _scheduled_summary_ids.discard(key)
+                        return
+
+                with flask_app.app_context():
+                    # 根据id获取会话
+                    conversation = self.get(Conversation, conversation_id)
+
+                    # 计算会话新摘要信息
+                    new_summary = self.summary_turns(turns, conversation.summary)
+
+                    # 更新会话的摘要信息
+                    self.update(
+                        conversation,
+                        summary=new_summary,
+                    )
+        except Exception:
+            with _pending_lock:
+                _pending_summary_turns.pop(key, None)
+                _scheduled_summary_ids.discard(key)
+            raise
 
     def _generate_conversation_name_and_update(
             self,
@@ -345,15 +433,32 @@ class ConversationService(BaseService):
             query: str
     ) -> None:
         """生成会话名字并更新"""
-        with flask_app.app_context():
-            # 根据会话id获取会话
-            conversation = self.get(Conversation, conversation_id)
+        try:
+            with flask_app.app_context():
+                # 根据会话id获取会话
+                conversation = self.get(Conversation, conversation_id)
 
-            # 计算获取新会话名字
-            new_conversation_name = self.generate_conversation_name(query)
+                # 计算获取新会话名字
+                new_conversation_name = self.generate_conversation_name(query)
 
-            # 调用更新服务更新会话名称
-            self.update(
-                conversation,
-                name=new_conversation_name,
-            )
+                # 调用更新服务更新会话名称
+                self.update(
+                    conversation,
+                    name=new_conversation_name,
+                )
+        finally:
+            with _pending_lock:
+                _scheduled_name_ids.discard(str(conversation_id))
+
+    @classmethod
+    def get_background_queue_metrics(cls) -> dict:
+        """获取当前进程会话后台队列的指标"""
+        with _pending_lock:
+            pending_summary_conversations = len(_scheduled_summary_ids)
+        return {
+            "agent_thought_writer": agent_thought_writer.get_metrics(),
+            "post_processor": {
+                **conversation_post_processor.get_metrics(),
+                "pending_summary_conversations": pending_summary_conversations,
+            },
+        }
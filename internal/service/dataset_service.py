@@ -106,6 +106,7 @@ class DatasetService(BaseService):
         datasets = paginator.paginate(
             self.db.session.query(Dataset).filter(*filters).order_by(desc("created_at"))
         )
+        Dataset.preload_stats(datasets)
 
         return datasets, paginator
 
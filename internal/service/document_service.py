@@ -115,16 +115,23 @@ class DocumentService(BaseService):
         ).order_by(asc("position")).all()
         if documents is None or len(documents) == 0:
             raise NotFoundException("该处理批次为发现文档，请重试")
+
+        # 按文档分组一次统计片段总数与已完成片段数，并批量加载关联的上传文件
+        segment_stats = {
+            document_id: (segment_count, completed_segment_count)
+            for document_id, segment_count, completed_segment_count in self.db.session.query(
+                Segment.document_id,
+                func.count(Segment.id),
+                func.count(Segment.id).filter(Segment.status == SegmentStatus.COMPLETED),
+            ).filter(
+                Segment.document_id.in_([document.id for document in documents]),
+            ).group_by(Segment.document_id).all()
+        }
+        Document.preload_upload_files(documents)
+
         documents_status = []
         for document in documents:
-            segment_count = self.db.session.query(func.count(Segment.id)).filter(
-                Segment.document_id == document.id,
-            ).scalar()
-            completed_segment_count = self.db.session.query(func.count(Segment.id)).filter(
-                Segment.document_id == document.id,
-                Segment.status == SegmentStatus.COMPLETED
-            ).scalar()
-
+            segment_count, completed_segment_count = segment_stats.get(document.id, (0, 0))
             upload_file = document.upload_file
             documents_status.append({
                 "id": document.id,
@@ -181,6 +188,8 @@ class DocumentService(BaseService):
         documents = paginator.paginate(
             self.db.session.query(Document).filter(*filters).order_by(desc("created_at"))
         )
+        Document.preload_stats(documents)
+
         return documents, paginator
 
     def update_document_enabled(self, dataset_id: UUID, document_id: UUID, enabled: bool, account: Account) -> Document:
@@ -18,26 +18,40 @@
 @Author : caixiaorong01@outlook.com
 @File   : embeddings_service.py
 """
+import os
 from dataclasses import dataclass
+from functools import lru_cache
 
 import tiktoken
 from injector import inject
-from langchain.embeddings import CacheBackedEmbeddings
-from langchain_community.storage import RedisStore
 from langchain_core.embeddings import Embeddings
 from langchain_openai import OpenAIEmbeddings
 from redis import Redis
 
+from internal.core.embeddings import HashCacheEmbeddings
+
+EMBEDDINGS_MODEL = "text-embedding-3-small"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> tiktoken.Encoding:
+    """进程内共享的tiktoken编码器，只在首次调用时加载"""
+    return tiktoken.encoding_for_model("gpt-3.5")
+
+
+@lru_cache(maxsize=20000)
+def _calculate_token_count(text: str) -> int:
+    """带缓存的token计算，文本分割器会对相同的分隔符及片段反复计算长度"""
+    return len(_get_encoding().encode(text))
+
 
 @inject
 @dataclass
 class EmbeddingsService:
-    _store: RedisStore
     _embeddings: Embeddings
-    _cache_backed_embeddings: CacheBackedEmbeddings
+    _cache_backed_embeddings: HashCacheEmbeddings
 
     def __init__(self, redis: Redis):
-        self._store = RedisStore(client=redis)
         # self._embeddings = HuggingFaceEmbeddings(
         #     model_name="Alibaba-NLP/gte-multilingual-base",
         #     cache_folder=os.path.join(os.getcwd(), "internal", "core", "embeddings"),
@@ -45,26 +59,32 @@ class EmbeddingsService:
         #         "trust_remote_code": True,
         #     }
         # )
-        self._embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        self._cache_backed_embeddings = CacheBackedEmbeddings.from_bytes_store(
-            self._embeddings,
-            self._store,
-            namespace="embeddings",
+        self._embeddings = OpenAIEmbeddings(model=EMBEDDINGS_MODEL)
+        self._cache_backed_embeddings = HashCacheEmbeddings(
+            embeddings=self._embeddings,
+            redis_client=redis,
+            model=EMBEDDINGS_MODEL,
+            ttl=int(os.getenv("EMBEDDINGS_CACHE_TTL", 7 * 24 * 3600)),
         )
 
     @classmethod
     def calculate_token_count(cls, query: str) -> int:
-        encoding = tiktoken.encoding_for_model("gpt-3.5")
-        return len(encoding.encode(query))
+        return _calculate_token_count(query)
 
-    @property
-    def store(self) -> RedisStore:
-        return self._store
+    @classmethod
+    def calculate_token_counts(cls, texts: list[str]) -> list[int]:
+        """批量计算文本列表的token数，使用encode_batch多线程编码"""
+        return [len(tokens) for tokens in _get_encoding().encode_batch(texts)]
 
     @property
     def embeddings(self) -> Embeddings:
         return self._embeddings
 
     @property
-    def cache_backed_embeddings(self) -> CacheBackedEmbeddings:
+    def cache_backed_embeddings(self) -> HashCacheEmbeddings:
+        """所有向量化调用都应通过该缓存进行，以复用相同内容的向量"""
         return self._cache_backed_embeddings
+
+    def get_cache_metrics(self) -> dict:
+        """获取向量缓存的命中统计"""
+        return self._cache_backed_embeddings.get_metrics()
@@ -19,27 +19,37 @@
 @File   : indexing_service.py
 """
 import logging
+import multiprocessing
+import os
 import re
+import tempfile
+import time
 import uuid
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
+from threading import BoundedSemaphore
 from uuid import UUID
 
+from flask import Flask, current_app
 from injector import inject
 from langchain_core.documents import Document as LCDocument
 from redis import Redis
 from sqlalchemy import func
+from weaviate.classes.data import DataObject
 from weaviate.classes.query import Filter
+from weaviate.collections import Collection
 
 from internal.core.file_extractor import FileExtractor
 from internal.entity.cache_entity import (
     LOCK_DOCUMENT_UPDATE_ENABLED
 )
 from internal.entity.dataset_entity import DocumentStatus, SegmentStatus
-from internal.exception import NotFoundException
+from internal.exception import NotFoundException, FailException
 from internal.lib.helper import generate_text_hash
-from internal.model import Document, Segment, KeywordTable, DatasetQuery
+from internal.model import Document, Segment, DatasetQuery
 from pkg.sqlalchemy import SQLAlchemy
+from .ann_index_service import AnnIndexService
 from .base_service import BaseService
 from .embeddings_service import EmbeddingsService
 from .jieba_service import JiebaService
@@ -58,37 +68,93 @@ class IndexingService(BaseService):
     jieba_service: JiebaService
     keyword_table_service: KeywordTableService
     vector_database_service: VectorDatabaseService
+    ann_index_service: AnnIndexService
     redis_client: Redis
 
     def build_documents(self, document_ids: list[UUID]) -> None:
+        """以流水线方式构建文档：解析在进程池中并发执行，分割与关键词索引在当前线程执行，向量存储在线程池中并发执行"""
         # 根据传递的文档id获取所有文档
         documents = self.db.session.query(Document).filter(
             Document.id.in_(document_ids)
         ).all()
-        for document in documents:
+        if len(documents) == 0:
+            return
+
+        # 批量更新状态和时间
+        with self.db.auto_commit():
+            self.db.session.query(Document).filter(
+                Document.id.in_([document.id for document in documents])
+            ).update({
+                "status": DocumentStatus.PARSING,
+                "processing_started_at": datetime.now(),
+            })
+
+        flask_app = current_app._get_current_object()
+        completed_workers = int(os.getenv("INDEXING_COMPLETED_WORKERS", 4))
+        # 限制同时处于向量存储阶段的文档数，避免解析速度过快导致片段在内存中堆积
+        completed_semaphore = BoundedSemaphore(completed_workers * 2)
+
+        with (
+            tempfile.TemporaryDirectory() as temp_dir,
+            self._create_parsing_executor() as parsing_executor,
+            ThreadPoolExecutor(max_workers=completed_workers) as completed_executor,
+        ):
+            # 1.下载文件并提交到解析池，解析过程为CPU密集型，下载的同时已提交的文件开始解析
+            parsing_futures = {}
+            for document in documents:
+                try:
+                    document_dir = os.path.join(temp_dir, str(document.id))
+                    os.makedirs(document_dir)
+                    file_path = self.file_extractor.download(document.upload_file, document_dir)
+                    parsing_futures[parsing_executor.submit(FileExtractor.load_from_file, file_path, False, True)] = document
+                except Exception as e:
+                    self._build_document_error(document, e)
+
+            # 2.按解析完成的顺序执行分割、索引，并将向量存储提交到线程池
+            for future in as_completed(parsing_futures):
+                document = parsing_futures[future]
+                try:
+                    lc_documents = self._parsing(document, future.result())
+                    lc_segments = self._splitting(document, lc_documents)
+                    self._indexing(document, lc_segments)
+                except Exception as e:
+                    self._build_document_error(document, e)
+                    continue
+
+                completed_semaphore.acquire()
+                completed_executor.submit(
+                    self._completed_with_app_context,
+                    flask_app,
+                    document.id,
+                    lc_segments,
+                ).add_done_callback(lambda _: completed_semaphore.release())
+
+    @classmethod
+    def _create_parsing_executor(cls) -> Executor:
+        """创建文档解析执行器，守护进程(如celery prefork子进程)不允许创建子进程，此时退化为线程池"""
+        max_workers = int(os.getenv("INDEXING_PARSING_WORKERS", os.cpu_count() or 1))
+        if multiprocessing.current_process().daemon:
+            return ThreadPoolExecutor(max_workers=max_workers)
+        return ProcessPoolExecutor(max_workers=max_workers)
+
+    def _completed_with_app_context(self, flask_app: Flask, document_id: UUID, lc_segments: list[LCDocument]) -> None:
+        """在线程池中执行向量存储，需要单独的应用上下文及数据库会话"""
+        with flask_app.app_context():
+            document = self.get(Document, document_id)
             try:
-                # 更新状态和时间
-                self.update(
-                    document,
-                    status=DocumentStatus.PARSING,
-                    processing_started_at=datetime.now()
-                )
-                # 执行文档加载，更新文档状态和时间
-                lc_documents = self._parsing(document)
-                # 执行文档分割
-                lc_segments = self._splitting(document, lc_documents)
-                # 执行文档索引构建
-                self._indexing(document, lc_segments)
-                # 存储操作
                 self._completed(document, lc_segments)
             except Exception as e:
-                logging.exception("构建文档发生错误信息，错误信息：%(error)s", {"error": e})
-                self.update(
-                    document,
-                    status=DocumentStatus.ERROR,
-                    error=str(e),
-                    stopped_at=datetime.now(),
-                )
+                self._build_document_error(document, e)
+
+    def _build_document_error(self, document: Document, error: Exception) -> None:
+        """记录文档构建过程中的错误信息"""
+        logging.exception("构建文档发生错误信息，错误信息：%(error)s", {"error": error})
+        self.update(
+            document,
+            status=DocumentStatus.ERROR,
+            error=str(error),
+            stopped_at=datetime.now(),
+        )
 
     def update_document_enabled(self, document_id: UUID) -> None:
         cache_key = LOCK_DOCUMENT_UPDATE_ENABLED.format(document_id=document_id)
@@ -130,9 +196,14 @@ class IndexingService(BaseService):
                 # 禁用改为启用，新增关键词
                 enabled_segment_ids = [id for id, _, enabled in segments if enabled is True]
                 self.keyword_table_service.add_keyword_table_from_ids(document.dataset_id, enabled_segment_ids)
+                self.ann_index_service.mark_nodes_added(
+                    document.dataset_id,
+                    [node_id for _, node_id, enabled in segments if enabled is True],
+                )
             else:
                 # 启用改为禁用，删除关键词
                 self.keyword_table_service.delete_keyword_table_from_ids(document.dataset_id, segment_ids)
+                self.ann_index_service.mark_nodes_removed(document.dataset_id, node_ids)
 
         except Exception as e:
             logging.exception("修改向量数据库文档启用状态失败，文档ID：%(document_id)s, 错误信息: %(error)s",
@@ -148,11 +219,10 @@ class IndexingService(BaseService):
 
     def delete_document(self, dataset_id: UUID, document_id: UUID) -> None:
         # 查找该文档下的所有片段id列表
-        segment_ids = [
-            id for id, in self.db.session.query(Segment).with_entities(Segment.id).filter(
-                Segment.document_id == document_id,
-            ).all()
-        ]
+        segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.node_id).filter(
+            Segment.document_id == document_id,
+        ).all()
+        segment_ids = [id for id, _ in segments]
 
         # 删除向量数据库相关文档
         collection = self.vector_database_service.collection
@@ -164,8 +234,9 @@ class IndexingService(BaseService):
                 Segment.document_id == document_id
             ).delete()
 
-        # 删除关键词记录
+        # 删除关键词记录及本地向量索引中的节点
         self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, segment_ids)
+        self.ann_index_service.mark_nodes_removed(dataset_id, [node_id for _, node_id in segments])
 
     def _completed(self, document: Document, lc_segments: list[LCDocument]) -> None:
         """存储文档片段到向量数据库，并完成状态更新"""
@@ -174,12 +245,12 @@ class IndexingService(BaseService):
             lc_segment.metadata["document_enabled"] = True
             lc_segment.metadata["segment_enabled"] = True
 
-        # 调用向量数据库，每次存储10条数据，避免一次传递过多的数据
-        try:
-            for i in range(0, len(lc_segments), 10):
-                chunks = lc_segments[i:i + 10]
-                ids = [chunk.metadata["node_id"] for chunk in chunks]
-                self.vector_database_service.vector_store.add_documents(chunks, ids=ids)
+        # 按token预算划分批次，每个批次执行一次向量化请求+一次批量写入，失败时只影响当前批次
+        collection = self.vector_database_service.collection
+        for chunks in self._split_batches_by_token_budget(lc_segments):
+            ids = [chunk.metadata["node_id"] for chunk in chunks]
+            try:
+                self._store_batch_with_retry(collection, chunks)
                 with self.db.auto_commit():
                     self.db.session.query(Segment).filter(
                         Segment.node_id.in_(ids)
@@ -188,21 +259,22 @@ class IndexingService(BaseService):
                         "completed_at": datetime.now(),
                         "enabled": True,
                     })
-        except Exception as e:
-            logging.exception(
-                "构建文档片段索引发生异常, 错误信息: %(error)s",
-                {"error": e},
-            )
-            with self.db.auto_commit():
-                self.db.session.query(Segment).filter(
-                    Segment.node_id.in_(ids)
-                ).update({
-                    "status": SegmentStatus.ERROR,
-                    "completed_at": None,
-                    "stopped_at": datetime.now(),
-                    "enabled": False,
-                    "error": str(e),
-                })
+                self.ann_index_service.mark_nodes_added(document.dataset_id, ids)
+            except Exception as e:
+                logging.exception(
+                    "构建文档片段索引发生异常, 错误信息: %(error)s",
+                    {"error": e},
+                )
+                with self.db.auto_commit():
+                    self.db.session.query(Segment).filter(
+                        Segment.node_id.in_(ids)
+                    ).update({
+                        "status": SegmentStatus.ERROR,
+                        "completed_at": None,
+                        "stopped_at": datetime.now(),
+                        "enabled": False,
+                        "error": str(e),
+                    })
 
         # 更新文档的状态数据
         self.update(
@@ -212,41 +284,85 @@ class IndexingService(BaseService):
             enabled=True,
         )
 
+    def _split_batches_by_token_budget(self, lc_segments: list[LCDocument]) -> list[list[LCDocument]]:
+        """根据单次向量化请求的token预算及最大条数划分片段批次"""
+        max_tokens = int(os.getenv("EMBEDDING_BATCH_MAX_TOKENS", 100000))
+        max_size = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", 500))
+
+        token_counts = self.embeddings_service.calculate_token_counts(
+            [lc_segment.page_content for lc_segment in lc_segments]
+        )
+        batches, batch, batch_tokens = [], [], 0
+        for lc_segment, token_count in zip(lc_segments, token_counts):
+            if batch and (batch_tokens + token_count > max_tokens or len(batch) >= max_size):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(lc_segment)
+            batch_tokens += token_count
+        if batch:
+            batches.append(batch)
+
+        return batches
+
+    def _store_batch_with_retry(self, collection: Collection, chunks: list[LCDocument]) -> None:
+        """一次性向量化整个批次，并通过weaviate批量接口写入，失败时按指数退避重试，写入以node_id为主键，重试是幂等的"""
+        max_retries = int(os.getenv("EMBEDDING_BATCH_MAX_RETRIES", 3))
+        for attempt in range(max_retries + 1):
+            try:
+                vectors = self.embeddings_service.cache_backed_embeddings.embed_documents(
+                    [chunk.page_content for chunk in chunks]
+                )
+                result = collection.data.insert_many([
+                    DataObject(
+                        properties={**chunk.metadata, "text": chunk.page_content},
+                        uuid=chunk.metadata["node_id"],
+                        vector=vector,
+                    ) for chunk, vector in zip(chunks, vectors)
+                ])
+                if result.has_errors:
+                    raise FailException(
+                        "; ".join(error.message for error in result.errors.values())
+                    )
+                return
+            except Exception as e:
+                if attempt >= max_retries:
+                    raise e
+                logging.warning(
+                    "写入向量数据库批次失败，第%(attempt)s次重试, 错误信息: %(error)s",
+                    {"attempt": attempt + 1, "error": e},
+                )
+                time.sleep(2 ** attempt)
+
     def _indexing(self, document: Document, lc_segments: list[LCDocument]) -> None:
-        for lc_segment in lc_segments:
-            keywords = self.jieba_service.extract_keywords(lc_segment.page_content, 10)
-            self.db.session.query(Segment).filter(
-                Segment.id == lc_segment.metadata["segment_id"]
-            ).update(
+        # 1.一次性提取所有片段的关键词，并在内存中合并
+        segment_keywords = {
+            UUID(lc_segment.metadata["segment_id"]): self.jieba_service.extract_keywords(lc_segment.page_content, 10)
+            for lc_segment in lc_segments
+        }
+
+        # 2.批量更新片段的关键词及状态，整个文档只提交一次
+        indexing_completed_at = datetime.now()
+        with self.db.auto_commit():
+            self.db.session.bulk_update_mappings(Segment, [
                 {
+                    "id": segment_id,
                     "keywords": keywords,
                     "status": SegmentStatus.INDEXING,
-                    "indexing_completed_at": datetime.now()
+                    "indexing_completed_at": indexing_completed_at,
                 }
-            )
-            keyword_table_record = self.keyword_table_service.get_keyword_table_from_dataset_id(document.dataset_id)
-            keyword_table = {
-                field: set(value) for field, value in keyword_table_record.keyword_table.items()
-            }
-            for keyword in keywords:
-                if keyword not in keyword_table:
-                    keyword_table[keyword] = set()
-                keyword_table[keyword].add(lc_segment.metadata["segment_id"])
+                for segment_id, keywords in segment_keywords.items()
+            ])
 
-            self.update(
-                keyword_table_record,
-                keyword_table={field: list(value) for field, value in keyword_table.items()}
-            )
+        # 3.在关键词表锁内一次性写入整个文档的关键词
+        self.keyword_table_service.add_keywords_to_keyword_table(document.dataset_id, segment_keywords)
 
         self.update(
             document,
             indexing_completed_at=datetime.now(),
         )
 
-    def _parsing(self, document: Document) -> list[LCDocument]:
-        # 获取upload_file 并加载Langchain文档
-        upload_file = document.upload_file
-        lc_documents = self.file_extractor.load(upload_file, False, True)
+    def _parsing(self, document: Document, lc_documents: list[LCDocument]) -> list[LCDocument]:
+        # 清除解析后Langchain文档中的多余字符
         for lc_document in lc_documents:
             lc_document.page_content = self._clean_extra_text(lc_document.page_content)
 
@@ -277,36 +393,43 @@ class IndexingService(BaseService):
             Segment.document_id == document.id,
         ).scalar()
 
-        segments = []
-        for lc_segment in lc_segments:
+        # 在内存中生成片段记录，并一次性批量写入数据库
+        segment_rows = []
+        token_counts = self.embeddings_service.calculate_token_counts(
+            [lc_segment.page_content for lc_segment in lc_segments]
+        )
+        for lc_segment, token_count in zip(lc_segments, token_counts):
             position += 1
             content = lc_segment.page_content
-            segment = self.create(
-                Segment,
-                account_id=document.account_id,
-                dataset_id=document.dataset_id,
-                document_id=document.id,
-                node_id=uuid.uuid4(),
-                position=position,
-                content=content,
-                character_count=len(content),
-                token_count=self.embeddings_service.calculate_token_count(content),
-                hash=generate_text_hash(content),
-                status=SegmentStatus.WAITING,
-            )
+            segment_row = {
+                "id": uuid.uuid4(),
+                "account_id": document.account_id,
+                "dataset_id": document.dataset_id,
+                "document_id": document.id,
+                "node_id": uuid.uuid4(),
+                "position": position,
+                "content": content,
+                "character_count": len(content),
+                "token_count": token_count,
+                "hash": generate_text_hash(content),
+                "status": SegmentStatus.WAITING,
+            }
             lc_segment.metadata = {
                 "account_id": str(document.account_id),
                 "dataset_id": str(document.dataset_id),
                 "document_id": str(document.id),
-                "segment_id": str(segment.id),
-                "node_id": str(segment.node_id),
+                "segment_id": str(segment_row["id"]),
+                "node_id": str(segment_row["node_id"]),
                 "document_enabled": False,
                 "segment_enabled": False,
             }
-            segments.append(segment)
+            segment_rows.append(segment_row)
+        with self.db.auto_commit():
+            self.db.session.bulk_insert_mappings(Segment, segment_rows)
+
         self.update(
             document,
-            token_count=sum([segment.token_count for segment in segments]),
+            token_count=sum([segment_row["token_count"] for segment_row in segment_rows]),
             status=DocumentStatus.INDEXING,
             splitting_completed_at=datetime.now(),
         )
@@ -336,9 +459,7 @@ class IndexingService(BaseService):
                 ).delete()
 
                 # 3.删除关联的关键词表记录
-                self.db.session.query(KeywordTable).filter(
-                    KeywordTable.dataset_id == dataset_id,
-                ).delete()
+                self.keyword_table_service.delete_keyword_table_from_dataset_id(dataset_id)
 
                 # 4.删除知识库查询记录
                 self.db.session.query(DatasetQuery).filter(
@@ -349,6 +470,9 @@ class IndexingService(BaseService):
             self.vector_database_service.collection.data.delete_many(
                 where=Filter.by_property("dataset_id").equal(str(dataset_id))
             )
+
+            # 6.删除知识库的本地向量索引
+            self.ann_index_service.delete_index(dataset_id)
         except Exception as e:
             logging.exception(
                 "异步删除知识库关联内容出错, dataset_id: %(dataset_id)s, 错误信息: %(error)s",
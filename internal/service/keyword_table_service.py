@@ -23,12 +23,13 @@ from uuid import UUID
 
 from injector import inject
 from redis import Redis
+from sqlalchemy.dialects.postgresql import insert
 
 from internal.entity.cache_entity import (
     LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE,
     LOCK_EXPIRE_TIME
 )
-from internal.model import KeywordTable, Segment
+from internal.model import SegmentKeyword, Segment
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
 
@@ -36,66 +37,60 @@ from .base_service import BaseService
 @inject
 @dataclass
 class KeywordTableService(BaseService):
+    """关键词倒排表服务，以(知识库, 关键词, 片段)为粒度存储，增删只影响相关片段的记录"""
     db: SQLAlchemy
     redis_client: Redis
 
-    def get_keyword_table_from_dataset_id(self, dataset_id: UUID) -> KeywordTable:
-        keyword_table = self.db.session.query(KeywordTable).filter(
-            KeywordTable.dataset_id == dataset_id
-        ).one_or_none()
-        if keyword_table is None:
-            keyword_table = self.create(KeywordTable, dataset_id=dataset_id, keyword_table={})
-
-        return keyword_table
+    # 单条INSERT语句写入的最大行数
+    INSERT_BATCH_SIZE = 5000
 
     def delete_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
-        # 删除知识库表的多余数据
+        """从倒排表中删除指定片段的全部关键词记录"""
+        if not segment_ids:
+            return
         cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=dataset_id)
-        with self.redis_client.lock(str(cache_key), timeout=LOCK_EXPIRE_TIME):
-            # 获取关键词表
-            keyword_table_record = self.get_keyword_table_from_dataset_id(dataset_id)
-            keyword_table = keyword_table_record.keyword_table.copy()
+        with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
+            with self.db.auto_commit():
+                self.db.session.query(SegmentKeyword).filter(
+                    SegmentKeyword.dataset_id == dataset_id,
+                    SegmentKeyword.segment_id.in_(segment_ids),
+                ).delete(synchronize_session=False)
 
-            segment_ids_to_delete = set([str(segment_id) for segment_id in segment_ids])
-            keywords_to_delete = set()
+    def add_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
+        """根据片段记录上的关键词，将片段写入倒排表"""
+        if not segment_ids:
+            return
+        # 1.根据segment_ids查找片段的关键词信息
+        segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.keywords).filter(
+            Segment.id.in_(segment_ids),
+        ).all()
 
-            for keyword, ids in keyword_table.items():
-                ids_set = set(ids)
-                if segment_ids_to_delete.intersection(ids_set):
-                    keyword_table[keyword] = list(ids_set.difference(segment_ids_to_delete))
-                    if not keyword_table[keyword]:
-                        keywords_to_delete.add(keyword)
-            # 检测空关键词并删除
-            for keyword in keywords_to_delete:
-                del keyword_table[keyword]
+        # 2.写入倒排表，该操作需要上锁，避免与删除操作并发时拿到错误的数据
+        self.add_keywords_to_keyword_table(dataset_id, {id: keywords for id, keywords in segments})
 
-            # 将数据更新到关键词表
-            self.update(keyword_table_record, keyword_table=keyword_table)
+    def add_keywords_to_keyword_table(self, dataset_id: UUID, segment_keywords: dict[UUID, list[str]]) -> None:
+        """将片段id->关键词列表批量写入倒排表，已存在的记录会被忽略"""
+        rows = [
+            {"dataset_id": dataset_id, "keyword": keyword, "segment_id": segment_id}
+            for segment_id, keywords in segment_keywords.items()
+            for keyword in set(keywords)
+        ]
+        if not rows:
+            return
 
-    def add_keyword_table_from_ids(self, dataset_id: UUID, segment_ids: list[UUID]) -> None:
-        # 1.新增知识库关键词表里多余的数据，该操作需要上锁，避免在并发的情况下拿到错误的数据
         cache_key = LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE.format(dataset_id=dataset_id)
         with self.redis_client.lock(cache_key, timeout=LOCK_EXPIRE_TIME):
-            # 2.获取指定知识库的关键词比哦啊
-            keyword_table_record = self.get_keyword_table_from_dataset_id(dataset_id)
-            keyword_table = {
-                field: set(value) for field, value in keyword_table_record.keyword_table.items()
-            }
-
-            # 3.根据segment_ids查找片段的关键词信息
-            segments = self.db.session.query(Segment).with_entities(Segment.id, Segment.keywords).filter(
-                Segment.id.in_(segment_ids),
-            ).all()
-
-            # 4.循环将新关键词添加到关键词表中
-            for id, keywords in segments:
-                for keyword in keywords:
-                    if keyword not in keyword_table:
-                        keyword_table[keyword] = set()
-                    keyword_table[keyword].add(str(id))
+            with self.db.auto_commit():
+                # 分批写入，避免单条语句的参数数量超过数据库上限
+                for i in range(0, len(rows), self.INSERT_BATCH_SIZE):
+                    self.db.session.execute(
+                        insert(SegmentKeyword).values(rows[i:i + self.INSERT_BATCH_SIZE]).on_conflict_do_nothing(
+                            index_elements=["dataset_id", "keyword", "segment_id"],
+                        )
+                    )
 
-            # 5.更新关键词表
-            self.update(
-                keyword_table_record,
-                keyword_table={field: list(value) for field, value in keyword_table.items()}
-            )
+    def delete_keyword_table_from_dataset_id(self, dataset_id: UUID) -> None:
+        """删除知识库下的全部倒排表记录，调用方负责提交事务"""
+        self.db.session.query(SegmentKeyword).filter(
+            SegmentKeyword.dataset_id == dataset_id,
+        ).delete(synchronize_session=False)
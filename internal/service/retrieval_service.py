@@ -18,28 +18,34 @@
 @Author : caixiaorong01@outlook.com
 @File   : retrieval_service.py
 """
+import os
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from uuid import UUID
 
-from flask import Flask
+from flask import Flask, current_app
 from injector import inject
-from langchain.retrievers import EnsembleRetriever
 from langchain_core.documents import Document as LCDocument
+from langchain_core.retrievers import BaseRetriever
 from langchain_core.tools import BaseTool, tool
 from langchain_openai import ChatOpenAI
 from pydantic import BaseModel, Field
 from sqlalchemy import update
 
 from internal.core.agent.entities.agent_entity import DATASET_RETRIEVAL_TOOL_NAME
-from internal.entity.dataset_entity import RetrievalStrategy, RetrievalSource
+from internal.entity.dataset_entity import RetrievalStrategy, RetrievalSource, HybridFusionMode
 from internal.exception import NotFoundException
 from internal.lib.helper import combine_documents
 from internal.model import Dataset, DatasetQuery, Segment
 from pkg.sqlalchemy import SQLAlchemy
+from .ann_index_service import AnnIndexService
 from .base_service import BaseService
 from .jieba_service import JiebaService
 from .vector_database_service import VectorDatabaseService
 
+# 混合检索中全文检索使用的共享线程池
+_hybrid_executor = ThreadPoolExecutor(max_workers=int(os.getenv("HYBRID_SEARCH_WORKERS", 8)))
+
 
 @inject
 @dataclass
@@ -47,6 +53,7 @@ class RetrievalService(BaseService):
     db: SQLAlchemy
     vector_database_service: VectorDatabaseService
     jieba_service: JiebaService
+    ann_index_service: AnnIndexService
 
     def search_in_datasets(
             self,
@@ -69,17 +76,55 @@ class RetrievalService(BaseService):
             raise NotFoundException("当前无知识库可执行检索")
         dataset_ids = [dataset.id for dataset in datasets]
 
-        from internal.core.retrievers import SemanticRetriever, FullTextRetriever, RAGFusionRetriever
-        # 构建不同检索器
-        semantic_retriever = SemanticRetriever(
+        # 根据不同的检索策略按需构建检索器并执行检索
+        if retrieval_strategy == RetrievalStrategy.SEMANTIC:
+            lc_documents = self._create_semantic_retriever(dataset_ids, k, score).invoke(query)[:k]
+        elif retrieval_strategy == RetrievalStrategy.FULL_TEXT:
+            lc_documents = self._create_full_text_retriever(dataset_ids, k).invoke(query)[:k]
+        elif retrieval_strategy == RetrievalStrategy.RAG_FUSION:
+            lc_documents = self._create_rag_fusion_retriever().invoke(query)[:k]
+        else:
+            lc_documents = self._hybrid_search(query, dataset_ids, k, score)
+
+        # 添加知识库查询记录
+        unique_dataset_ids = list(set(str(lc_document.metadata["dataset_id"]) for lc_document in lc_documents))
+        for dataset_id in unique_dataset_ids:
+            self.create(
+                DatasetQuery,
+                dataset_id=dataset_id,
+                query=query,
+                source=retrival_source,
+                # todo:等待APP配置模块完成后进行调整
+                source_app_id=None,
+                created_by=account_id,
+            )
+        # 批量更新片段的命中次数，召回次数，涵盖了构建+执行语句
+        with self.db.auto_commit():
+            stmt = (
+                update(Segment)
+                .where(Segment.id.in_([lc_document.metadata["segment_id"] for lc_document in lc_documents]))
+                .values(hit_count=Segment.hit_count + 1)
+            )
+            self.db.session.execute(stmt)
+
+        return lc_documents
+
+    def _create_semantic_retriever(self, dataset_ids: list[UUID], k: int, score: float) -> BaseRetriever:
+        from internal.core.retrievers import SemanticRetriever
+        return SemanticRetriever(
             dataset_ids=dataset_ids,
             vector_store=self.vector_database_service.vector_store,
+            collection=self.vector_database_service.collection,
+            ann_index_service=self.ann_index_service,
             search_kwargs={
                 "k": k,
                 "score_threshold": score,
             }
         )
-        full_text_retriever = FullTextRetriever(
+
+    def _create_full_text_retriever(self, dataset_ids: list[UUID], k: int) -> BaseRetriever:
+        from internal.core.retrievers import FullTextRetriever
+        return FullTextRetriever(
             db=self.db,
             dataset_ids=dataset_ids,
             jieba_service=self.jieba_service,
@@ -87,11 +132,9 @@ class RetrievalService(BaseService):
                 "k": k
             }
         )
-        hybrid_retriever = EnsembleRetriever(
-            retrievers=[semantic_retriever, full_text_retriever],
-            weights=[0.5, 0.5]
-        )
 
+    def _create_rag_fusion_retriever(self) -> BaseRetriever:
+        from internal.core.retrievers import RAGFusionRetriever
         retriever = self.vector_database_service.vector_store.as_retriever(
             search_type="mmr",
             # search_kwargs={
@@ -104,45 +147,66 @@ class RetrievalService(BaseService):
             #     ])
             # }
         )
-        rag_fusion_retriever = RAGFusionRetriever.from_llm(
+        return RAGFusionRetriever.from_llm(
             retriever=retriever,
             llm=ChatOpenAI(model="gpt-4o", temperature=0),
             include_original=True
         )
 
-        # 执行检索
-        # 根据不同的检索策略执行检索
-        if retrieval_strategy == RetrievalStrategy.SEMANTIC:
-            lc_documents = semantic_retriever.invoke(query)[:k]
-        elif retrieval_strategy == RetrievalStrategy.FULL_TEXT:
-            lc_documents = full_text_retriever.invoke(query)[:k]
-        elif retrieval_strategy == RetrievalStrategy.RAG_FUSION:
-            lc_documents = rag_fusion_retriever.invoke(query)[:k]
-        else:
-            lc_documents = hybrid_retriever.invoke(query)[:k]
+    def _hybrid_search(self, query: str, dataset_ids: list[UUID], k: int, score: float) -> list[LCDocument]:
+        """混合检索，语义检索与全文检索并发执行，耗时取决于较慢的一路，再按配置的融合方式合并结果"""
+        semantic_retriever = self._create_semantic_retriever(dataset_ids, k, score)
+        full_text_retriever = self._create_full_text_retriever(dataset_ids, k)
 
-        # 添加知识库查询记录
-        unique_dataset_ids = list(set(str(lc_document.metadata["dataset_id"]) for lc_document in lc_documents))
-        for dataset_id in unique_dataset_ids:
-            self.create(
-                DatasetQuery,
-                dataset_id=dataset_id,
-                query=query,
-                source=retrival_source,
-                # todo:等待APP配置模块完成后进行调整
-                source_app_id=None,
-                created_by=account_id,
-            )
-        # 批量更新片段的命中次数，召回次数，涵盖了构建+执行语句
-        with self.db.auto_commit():
-            stmt = (
-                update(Segment)
-                .where(Segment.id.in_([lc_document.metadata["segment_id"] for lc_document in lc_documents]))
-                .values(hit_count=Segment.hit_count + 1)
-            )
-            self.db.session.execute(stmt)
+        # 全文检索在线程池中执行，需要独立的应用上下文及数据库会话
+        flask_app = current_app._get_current_object()
 
-        return lc_documents
+        def full_text_search() -> list[LCDocument]:
+            with flask_app.app_context():
+                return full_text_retriever.invoke(query)
+
+        full_text_future = _hybrid_executor.submit(full_text_search)
+        semantic_documents = semantic_retriever.invoke(query)
+        full_text_documents = full_text_future.result()
+
+        semantic_weight = float(os.getenv("HYBRID_SEMANTIC_WEIGHT", 0.5))
+        return self.fuse_documents(
+            [semantic_documents, full_text_documents],
+            [semantic_weight, 1 - semantic_weight],
+            k,
+            os.getenv("HYBRID_FUSION_MODE", HybridFusionMode.RRF),
+        )
+
+    @classmethod
+    def fuse_documents(
+            cls,
+            documents_list: list[list[LCDocument]],
+            weights: list[float],
+            k: int,
+            mode: str = HybridFusionMode.RRF,
+    ) -> list[LCDocument]:
+        """将多路检索结果按片段去重后融合排序，rrf按排名倒数加权，weighted按归一化得分加权"""
+        rrf_k = int(os.getenv("HYBRID_RRF_K", 60))
+        fused_scores: dict[str, float] = {}
+        fused_documents: dict[str, LCDocument] = {}
+        for documents, weight in zip(documents_list, weights):
+            scores = [document.metadata.get("score", 0) for document in documents]
+            max_score, min_score = max(scores, default=0), min(scores, default=0)
+            for rank, document in enumerate(documents):
+                key = str(document.metadata["segment_id"])
+                if mode == HybridFusionMode.WEIGHTED:
+                    # 全文检索没有有效得分时，使用排名计算归一化得分
+                    if max_score > min_score:
+                        normalized_score = (scores[rank] - min_score) / (max_score - min_score)
+                    else:
+                        normalized_score = 1 - rank / len(documents)
+                    fused_scores[key] = fused_scores.get(key, 0) + weight * normalized_score
+                else:
+                    fused_scores[key] = fused_scores.get(key, 0) + weight / (rrf_k + rank + 1)
+                fused_documents.setdefault(key, document)
+
+        sorted_keys = sorted(fused_scores, key=lambda key: fused_scores[key], reverse=True)
+        return [fused_documents[key] for key in sorted_keys[:k]]
 
     def create_langchain_tool_from_search(
             self,
@@ -41,6 +41,7 @@ from internal.schema.segment_schema import (
 )
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
+from .ann_index_service import AnnIndexService
 from .base_service import BaseService
 from .embeddings_service import EmbeddingsService
 from .jieba_service import JiebaService
@@ -57,6 +58,7 @@ class SegmentService(BaseService):
     vector_database_service: VectorDatabaseService
     embeddings_service: EmbeddingsService
     jieba_service: JiebaService
+    ann_index_service: AnnIndexService
 
     def create_segment(self, dataset_id: UUID, document_id: UUID, req: CreateSegmentReq, account: Account) -> Segment:
         token_count = self.embeddings_service.calculate_token_count(req.content.data)
@@ -123,6 +125,7 @@ class SegmentService(BaseService):
             )
             if document.enabled is True:
                 self.keyword_table_service.add_keyword_table_from_ids(dataset_id, [segment.id])
+                self.ann_index_service.mark_nodes_added(dataset_id, [segment.node_id])
         except Exception as e:
             logging.exception("新增文档片段内容发生异常，错误信息: %(error)s", {"error": e})
             if segment:
@@ -202,8 +205,9 @@ class SegmentService(BaseService):
                     properties={
                         "text": req.content.data,
                     },
-                    vector=self.embeddings_service.embeddings.embed_query(req.content.data)
+                    vector=self.embeddings_service.cache_backed_embeddings.embed_query(req.content.data)
                 )
+                self.ann_index_service.mark_stale(dataset_id)
         except Exception as e:
             logging.exception(
                 "更新文档片段记录失败, segment_id: %(segment_id)s, 错误信息: %(error)s",
@@ -249,8 +253,10 @@ class SegmentService(BaseService):
 
                 if enabled is True and document.enabled is True:
                     self.keyword_table_service.add_keyword_table_from_ids(dataset_id, [segment_id])
+                    self.ann_index_service.mark_nodes_added(dataset_id, [segment.node_id])
                 else:
                     self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
+                    self.ann_index_service.mark_nodes_removed(dataset_id, [segment.node_id])
                 # 同步处理向量数据库数据
                 self.vector_database_service.collection.data.update(
                     uuid=segment.node_id,
@@ -331,8 +337,9 @@ class SegmentService(BaseService):
         document = segment.document
         self.delete(segment)
 
-        # 4.同步删除关键词表中属于该片段的关键词
+        # 4.同步删除关键词表及本地向量索引中属于该片段的记录
         self.keyword_table_service.delete_keyword_table_from_ids(dataset_id, [segment_id])
+        self.ann_index_service.mark_nodes_removed(dataset_id, [segment.node_id])
 
         # 5.同步删除向量数据库存储的记录
         try:
@@ -18,18 +18,32 @@
 @Author : caixiaorong01@outlook.com
 @File   : vector_database_service.py
 """
+import logging
+import os
+import threading
+import time
 from dataclasses import dataclass
+from typing import Optional
 
+from flask import current_app
 from flask_weaviate import FlaskWeaviate
 from injector import inject
 from langchain_core.vectorstores import VectorStoreRetriever
 from langchain_weaviate import WeaviateVectorStore
+from weaviate import WeaviateClient
 from weaviate.collections import Collection
 
 from .embeddings_service import EmbeddingsService
 
 COLLECTION_NAME = "Dataset"
 
+# 进程内共享的weaviate客户端及向量数据库，FlaskWeaviate默认在每个应用上下文中新建并关闭客户端
+_client_lock = threading.Lock()
+_client: Optional[WeaviateClient] = None
+_client_pid: Optional[int] = None
+_client_checked_at: float = 0
+_vector_store: Optional[WeaviateVectorStore] = None
+
 
 @inject
 @dataclass
@@ -38,14 +52,62 @@ class VectorDatabaseService:
     embeddings_service: EmbeddingsService
     weaviate: FlaskWeaviate
 
+    @property
+    def client(self) -> WeaviateClient:
+        """获取进程内共享的weaviate客户端，进程fork后重新创建，并按固定间隔执行健康检查，不可用时重连"""
+        global _client, _client_pid, _client_checked_at, _vector_store
+        health_check_interval = current_app.config.get("WEAVIATE_HEALTH_CHECK_INTERVAL", 30)
+
+        # 1.在锁内判断是否需要健康检查，到期时由当前线程认领检查，其他线程继续使用现有客户端
+        with _client_lock:
+            client = _client if _client_pid == os.getpid() else None
+            if client is not None:
+                now = time.monotonic()
+                if now - _client_checked_at < health_check_interval:
+                    return client
+                _client_checked_at = now
+
+        # 2.在锁外执行健康检查，避免网络调用期间阻塞其他线程的检索
+        if client is not None:
+            try:
+                is_ready = client.is_ready()
+            except Exception:
+                is_ready = False
+            if is_ready:
+                return client
+            logging.warning("weaviate客户端健康检查失败，重新建立连接")
+
+        # 3.客户端不存在或不可用时重新建立连接，其他线程已完成重连则直接复用
+        with _client_lock:
+            if _client is not None and _client_pid == os.getpid() and _client is not client:
+                return _client
+            if client is not None:
+                try:
+                    client.close()
+                except Exception:
+                    pass
+
+            # fork出的子进程不能复用父进程的连接，直接丢弃并新建客户端
+            _client = WeaviateClient(**self.weaviate.weaviate_config)
+            _client.connect()
+            _client_pid = os.getpid()
+            _client_checked_at = time.monotonic()
+            _vector_store = None
+            return _client
+
     @property
     def vector_store(self) -> WeaviateVectorStore:
-        return WeaviateVectorStore(
-            client=self.weaviate.client,
-            index_name=COLLECTION_NAME,
-            text_key="text",
-            embedding=self.embeddings_service.embeddings
-        )
+        global _vector_store
+        client = self.client
+        with _client_lock:
+            if _vector_store is None:
+                _vector_store = WeaviateVectorStore(
+                    client=client,
+                    index_name=COLLECTION_NAME,
+                    text_key="text",
+                    embedding=self.embeddings_service.cache_backed_embeddings
+                )
+            return _vector_store
 
     def get_retriever(self) -> VectorStoreRetriever:
         """获取检索器"""
@@ -53,4 +115,4 @@ class VectorDatabaseService:
 
     @property
     def collection(self) -> Collection:
-        return self.weaviate.client.collections.get(COLLECTION_NAME)
+        return self.client.collections.get(COLLECTION_NAME)
@@ -30,7 +30,7 @@ from injector import inject
 from sqlalchemy import desc
 
 from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
-from internal.core.workflow import Workflow as WorkflowTool
+from internal.core.workflow import Workflow as WorkflowTool, compiled_workflow_cache
 from internal.core.workflow.entities.edge_entity import BaseEdgeData
 from internal.core.workflow.entities.node_entity import NodeType, BaseNodeData
 from internal.core.workflow.entities.workflow_entity import WorkflowConfig
@@ -104,8 +104,9 @@ class WorkflowService(BaseService):
         # 获取工作流基础信息并校验权限
         workflow = self.get_workflow(workflow_id, account)
 
-        # 删除工作流
+        # 删除工作流并失效对应的已编译缓存
         self.delete(workflow)
+        compiled_workflow_cache.invalidate(workflow.id)
 
         return workflow
 
@@ -399,6 +400,9 @@ class WorkflowService(BaseService):
             "is_debug_passed": False,
         })
 
+        # 失效旧版本的已编译工作流缓存
+        compiled_workflow_cache.invalidate(workflow.id)
+
         return workflow
 
     def cancel_publish_workflow(self, workflow_id: UUID, account: Account) -> Workflow:
@@ -416,8 +420,16 @@ class WorkflowService(BaseService):
             "is_debug_passed": False,
         })
 
+        # 失效已编译工作流缓存
+        compiled_workflow_cache.invalidate(workflow.id)
+
         return workflow
 
+    @classmethod
+    def get_compiled_workflow_cache_metrics(cls) -> dict:
+        """获取当前进程已编译工作流缓存的指标"""
+        return compiled_workflow_cache.get_metrics()
+
     def _validate_graph(self, workflow_id: UUID, graph: dict[str, Any], account: Account) -> dict[str, Any]:
         """校验传递的graph信息，涵盖nodes和edges对应的数据，该函数使用相对宽松的校验方式，并且因为是草稿，不需要校验节点与边的关系"""
         # 提取nodes和edges数据
@@ -0,0 +1,35 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 21:20
+@Author : caixiaorong01@outlook.com
+@File   : analysis_task.py
+"""
+from datetime import date, timedelta
+from typing import Optional
+
+from celery import shared_task
+
+
+@shared_task
+def rollup_app_daily_stats(stat_date: Optional[str] = None) -> None:
+    """汇总所有应用指定日期(默认昨天)的消息统计数据，日期格式为YYYY-MM-DD"""
+    from app.http.module import injector
+    from internal.service import AnalysisService
+
+    start_date = date.fromisoformat(stat_date) if stat_date else date.today() - timedelta(days=1)
+    analysis_service = injector.get(AnalysisService)
+    analysis_service.rollup_daily_stats(start_date, start_date + timedelta(days=1))
@@ -29,3 +29,12 @@ def delete_dataset(dataset_id: UUID) -> None:
     from internal.service.indexing_service import IndexingService
     indexing_service = injector.get(IndexingService)
     indexing_service.delete_dataset(dataset_id)
+
+
+@shared_task
+def rebuild_ann_index(dataset_id: UUID) -> None:
+    """重建知识库的本地向量索引副本"""
+    from app.http.module import injector
+    from internal.service.ann_index_service import AnnIndexService
+    ann_index_service = injector.get(AnnIndexService)
+    ann_index_service.rebuild(dataset_id)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 20:10
+@Author : caixiaorong01@outlook.com
+@File   : background_queue.py
+"""
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Callable, Optional
+
+
+class BackgroundQueue:
+    """进程内有界后台任务队列，由固定数量的守护线程顺序消费，队列已满时提交方短暂阻塞以限制积压延迟
+    进程正常退出时会在drain_timeout内等待已排队的任务执行完成
+    """
+
+    def __init__(
+            self,
+            name: str,
+            max_size: int = 1000,
+            workers: int = 1,
+            put_timeout: float = 1,
+            drain_timeout: float = 10,
+    ):
+        self.name = name
+        self.max_size = max_size
+        self.workers = max(workers, 1)
+        self.put_timeout = put_timeout
+        self.drain_timeout = drain_timeout
+        self._queue: Optional[queue.Queue] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._metrics_lock = threading.Lock()
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._total_wait_time = 0.0
+        self._max_wait_time = 0.0
+        self._total_run_time = 0.0
+        self._max_run_time = 0.0
+
+        # 消费线程为守护线程，进程退出(如gunicorn worker重启)时先等待队列中的任务执行完成，fork出的子进程同样生效
+        atexit.register(self.shutdown)
+
+    def _get_queue(self) -> queue.Queue:
+        """获取当前进程的任务队列，fork后的子进程不会继承父进程的消费线程，需要重新创建"""
+        pid = os.getpid()
+        if self._queue is None or self._pid != pid:
+            with self._lock:
+                if self._queue is None or self._pid != pid:
+                    self._queue = queue.Queue(maxsize=self.max_size)
+                    self._pid = pid
+                    for index in range(self.workers):
+                        threading.Thread(
+                            target=self._run,
+                            args=(self._queue,),
+                            name=f"{self.name}-{index}",
+                            daemon=True,
+                        ).start()
+        return self._queue
+
+    def _run(self, task_queue: queue.Queue) -> None:
+        """消费线程入口，单个任务异常只记录日志，不影响后续任务"""
+        while True:
+            func, args, kwargs, submitted_at = task_queue.get()
+            started_at = time.monotonic()
+            succeeded = False
+            try:
+                func(*args, **kwargs)
+                succeeded = True
+            except Exception as e:
+                logging.exception("后台任务执行失败, 队列: %(name)s, 错误信息: %(error)s", {"name": self.name, "error": e})
+            finally:
+                # 记录任务执行结果、排队等待时间与执行时间，多个消费线程并发更新需要加锁
+                wait_time = started_at - submitted_at
+                run_time = time.monotonic() - started_at
+                with self._metrics_lock:
+                    if succeeded:
+                        self._processed += 1
+                    else:
+                        self._failed += 1
+                    self._total_wait_time += wait_time
+                    self._max_wait_time = max(self._max_wait_time, wait_time)
+                    self._total_run_time += run_time
+                    self._max_run_time = max(self._max_run_time, run_time)
+                task_queue.task_done()
+
+    def submit(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> bool:
+        """提交后台任务，队列在等待时间内仍然已满则返回False，由调用方决定是否同步执行"""
+        try:
+            if self.put_timeout > 0:
+                self._get_queue().put((func, args, kwargs, time.monotonic()), timeout=self.put_timeout)
+            else:
+                self._get_queue().put_nowait((func, args, kwargs, time.monotonic()))
+            return True
+        except queue.Full:
+            with self._metrics_lock:
+                self._rejected += 1
+            logging.warning("后台任务队列已满, 队列: %(name)s", {"name": self.name})
+            return False
+
+    def shutdown(self, timeout: Optional[float] = None) -> bool:
+        """等待当前进程队列中的任务执行完成，最多等待timeout秒(默认drain_timeout)，返回是否全部完成"""
+        task_queue = self._queue
+        if task_queue is None or self._pid != os.getpid():
+            return True
+
+        deadline = time.monotonic() + (self.drain_timeout if timeout is None else timeout)
+        with task_queue.all_tasks_done:
+            while task_queue.unfinished_tasks:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logging.warning(
+                        "后台任务队列等待超时，仍有任务未完成, 队列: %(name)s, 数量: %(count)s",
+                        {"name": self.name, "count": task_queue.unfinished_tasks},
+                    )
+                    return False
+                task_queue.all_tasks_done.wait(remaining)
+        return True
+
+    def get_metrics(self) -> dict:
+        """获取队列指标，数据为当前进程内的统计，耗时单位为秒"""
+        with self._metrics_lock:
+            completed = self._processed + self._failed
+            return {
+                "name": self.name,
+                "pending": self._queue.qsize() if self._queue is not None else 0,
+                "max_size": self.max_size,
+                "processed": self._processed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "avg_wait_time": self._total_wait_time / completed if completed > 0 else 0,
+                "max_wait_time": self._max_wait_time,
+                "avg_run_time": self._total_run_time / completed if completed > 0 else 0,
+                "max_run_time": self._max_run_time,
+            }
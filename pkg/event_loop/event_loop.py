@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 19:05
+@Author : caixiaorong01@outlook.com
+@File   : event_loop.py
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 进程内共享的后台事件循环，按进程id区分，fork后的子进程会重新创建
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_pid: Optional[int] = None
+_loop_lock = threading.Lock()
+
+
+def _run_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """后台线程入口，持续运行事件循环"""
+    asyncio.set_event_loop(loop)
+    loop.run_forever()
+
+
+def _create_loop() -> asyncio.AbstractEventLoop:
+    """创建事件循环并在守护线程中启动，同步代码(如同步工具、同步图节点)通过默认执行器运行"""
+    loop = asyncio.new_event_loop()
+    loop.set_default_executor(ThreadPoolExecutor(
+        max_workers=int(os.getenv("EVENT_LOOP_EXECUTOR_WORKERS", 64)),
+        thread_name_prefix="event-loop-executor",
+    ))
+    thread = threading.Thread(target=_run_loop, args=(loop,), name="shared-event-loop", daemon=True)
+    thread.start()
+    return loop
+
+
+def get_event_loop() -> asyncio.AbstractEventLoop:
+    """获取当前进程共享的后台事件循环"""
+    global _loop, _loop_pid
+
+    pid = os.getpid()
+    if _loop is None or _loop_pid != pid or _loop.is_closed():
+        with _loop_lock:
+            if _loop is None or _loop_pid != pid or _loop.is_closed():
+                _loop = _create_loop()
+                _loop_pid = pid
+
+    return _loop
+
+
+def submit_coroutine(coro: Coroutine[Any, Any, T]) -> Future:
+    """将协程提交到共享事件循环执行，立即返回可跨线程等待的Future"""
+    return asyncio.run_coroutine_threadsafe(coro, get_event_loop())
+
+
+def run_coroutine_sync(coro: Coroutine[Any, Any, T], timeout: Optional[float] = None) -> T:
+    """在同步代码中执行协程并等待结果，复用共享事件循环，替代每次调用asyncio.run创建新的事件循环"""
+    loop = get_event_loop()
+    try:
+        running_loop = asyncio.get_running_loop()
+    except RuntimeError:
+        running_loop = None
+    if running_loop is loop:
+        # 在共享事件循环线程内阻塞等待会导致死锁
+        coro.close()
+        raise RuntimeError("不能在共享事件循环线程中同步等待协程，请直接使用await")
+
+    return asyncio.run_coroutine_threadsafe(coro, loop).result(timeout=timeout)
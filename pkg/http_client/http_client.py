@@ -0,0 +1,148 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2025/5/8 14:26
+@Author : caixiaorong01@outlook.com
+@File   : http_client.py
+"""
+import asyncio
+import os
+import threading
+import weakref
+from http.cookiejar import DefaultCookiePolicy
+from typing import Any, Optional
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 进程内共享的同步会话，按进程id区分，避免fork后子进程复用父进程的连接
+_session: Optional[requests.Session] = None
+_session_pid: Optional[int] = None
+_session_lock = threading.Lock()
+
+# 异步客户端与事件循环绑定，每个事件循环各自持有一个客户端
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def _get_timeout() -> tuple[float, float]:
+    """获取(连接超时, 读取超时)配置"""
+    return (
+        float(os.getenv("HTTP_CLIENT_CONNECT_TIMEOUT", 5)),
+        float(os.getenv("HTTP_CLIENT_READ_TIMEOUT", 30)),
+    )
+
+
+def _get_pool_size() -> tuple[int, int]:
+    """获取(每个进程缓存的主机连接池数量, 每个主机的最大连接数)配置"""
+    return (
+        int(os.getenv("HTTP_CLIENT_POOL_CONNECTIONS", 20)),
+        int(os.getenv("HTTP_CLIENT_POOL_MAXSIZE", 50)),
+    )
+
+
+def _create_session() -> requests.Session:
+    """创建带有按主机连接池、重试退避策略的会话"""
+    pool_connections, pool_maxsize = _get_pool_size()
+    retry = Retry(
+        total=int(os.getenv("HTTP_CLIENT_MAX_RETRIES", 2)),
+        backoff_factor=float(os.getenv("HTTP_CLIENT_BACKOFF_FACTOR", 0.5)),
+        status_forcelist=(502, 503, 504),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # 会话在所有请求之间共享，拒绝保存响应中的cookie，避免不同工具/用户之间串用
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+
+    return session
+
+
+def get_session() -> requests.Session:
+    """获取当前进程共享的同步会话"""
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = _create_session()
+                _session_pid = pid
+
+    return _session
+
+
+def send_request(method: str, url: str, **kwargs: Any) -> requests.Response:
+    """使用共享会话发起同步请求，未传递timeout时使用默认超时配置"""
+    kwargs.setdefault("timeout", _get_timeout())
+    return get_session().request(method=method, url=str(url), **kwargs)
+
+
+def get_async_client() -> httpx.AsyncClient:
+    """获取当前事件循环共享的异步客户端"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        with _async_clients_lock:
+            client = _async_clients.get(loop)
+            if client is None:
+                connect_timeout, read_timeout = _get_timeout()
+                pool_connections, pool_maxsize = _get_pool_size()
+                client = httpx.AsyncClient(
+                    timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                    limits=httpx.Limits(
+                        max_connections=pool_connections * pool_maxsize,
+                        max_keepalive_connections=pool_maxsize,
+                    ),
+                    transport=httpx.AsyncHTTPTransport(retries=int(os.getenv("HTTP_CLIENT_MAX_RETRIES", 2))),
+                )
+                _async_clients[loop] = client
+
+    return client
+
+
+def _drop_none(value: Any) -> Any:
+    """与requests保持一致，移除字典中值为None的参数"""
+    if isinstance(value, dict):
+        return {k: v for k, v in value.items() if v is not None}
+    return value
+
+
+async def async_send_request(method: str, url: str, **kwargs: Any) -> httpx.Response:
+    """使用共享异步客户端发起请求，参数与send_request保持一致"""
+    for key in ("params", "data", "headers"):
+        if key in kwargs:
+            kwargs[key] = _drop_none(kwargs[key])
+    if "timeout" in kwargs and isinstance(kwargs["timeout"], tuple):
+        connect_timeout, read_timeout = kwargs["timeout"]
+        kwargs["timeout"] = httpx.Timeout(read_timeout, connect=connect_timeout)
+
+    client = get_async_client()
+    cookies = kwargs.pop("cookies", None)
+    if cookies:
+        # httpx已废弃单次请求携带cookies，统一转换为请求头
+        cookie_header = "; ".join(f"{k}={v}" for k, v in cookies.items())
+        headers = {**(kwargs.pop("headers", None) or {})}
+        headers["Cookie"] = "; ".join(filter(None, [headers.get("Cookie"), cookie_header]))
+        kwargs["headers"] = headers
+
+    return await client.request(method.upper(), str(url), **kwargs)
@@ -18,6 +18,7 @@
 @Author : caixiaorong01@outlook.com
 @File   : __init__.py.py
 """
+from .preload import set_preloaded, get_preloaded, count_queries, QueryCounter
 from .sqlalchemy import SQLAlchemy
 
-__all__ = ["SQLAlchemy"]
+__all__ = ["SQLAlchemy", "set_preloaded", "get_preloaded", "count_queries", "QueryCounter"]
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 21:40
+@Author : caixiaorong01@outlook.com
+@File   : preload.py
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+T = TypeVar("T")
+
+# 模型实例上存储预加载数据的属性名，非映射字段，不会写入数据库
+_PRELOADED_ATTR = "_preloaded_values"
+
+
+def set_preloaded(instance: Any, name: str, value: Any) -> None:
+    """为模型实例设置预加载的属性值，通常由列表接口在一次分组查询后批量设置"""
+    preloaded = instance.__dict__.get(_PRELOADED_ATTR)
+    if preloaded is None:
+        preloaded = {}
+        setattr(instance, _PRELOADED_ATTR, preloaded)
+    preloaded[name] = value
+
+
+def get_preloaded(instance: Any, name: str, loader: Callable[[], T]) -> T:
+    """获取模型实例预加载的属性值，未预加载时调用loader单独查询"""
+    preloaded = instance.__dict__.get(_PRELOADED_ATTR)
+    if preloaded is not None and name in preloaded:
+        return preloaded[name]
+    return loader()
+
+
+class QueryCounter:
+    """SQL执行次数统计结果"""
+
+    def __init__(self):
+        self.count = 0
+        self.statements: list[str] = []
+
+
+@contextmanager
+def count_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """统计上下文内在指定引擎上执行的SQL次数，用于校验列表接口的查询数量不随数据行数增长"""
+    counter = QueryCounter()
+
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        counter.count += 1
+        counter.statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _before_cursor_execute)
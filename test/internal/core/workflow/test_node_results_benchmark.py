@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 21:15
+@Author : caixiaorong01@outlook.com
+@File   : test_node_results_benchmark.py
+"""
+import random
+import time
+import uuid
+from typing import Any
+
+import pytest
+
+from internal.core.workflow.entities.node_entity import BaseNodeData, NodeResult, NodeStatus, NodeType
+from internal.core.workflow.entities.variable_entity import (
+    VariableEntity,
+    VariableValueType,
+    VARIABLE_TYPE_MAP,
+    VARIABLE_TYPE_DEFAULT_VALUE_MAP,
+)
+from internal.core.workflow.entities.workflow_entity import NodeResults, _process_node_results
+from internal.core.workflow.utils.helper import extract_variables_from_state
+
+# 每个节点引用的上游变量数量
+REF_COUNT_PER_NODE = 5
+
+
+def _legacy_process_node_results(left: list[NodeResult], right: list[NodeResult]) -> list[NodeResult]:
+    """优化前的节点结果归纳函数，每一步合并都复制整个列表"""
+    left = left or []
+    right = right or []
+    return left + right
+
+
+def _legacy_extract_variables_from_state(variables: list[VariableEntity], state: dict) -> dict[str, Any]:
+    """优化前的变量提取函数，每个引用变量都线性遍历所有节点结果"""
+    variables_dict = {}
+    for variable in variables:
+        variable_type_cls = VARIABLE_TYPE_MAP.get(variable.type)
+        if variable.value.type == VariableValueType.LITERAL:
+            variables_dict[variable.name] = variable_type_cls(variable.value.content)
+        else:
+            for node_result in state["node_results"]:
+                if node_result.node_data.id == variable.value.content.ref_node_id:
+                    variables_dict[variable.name] = variable_type_cls(node_result.outputs.get(
+                        variable.value.content.ref_var_name,
+                        VARIABLE_TYPE_DEFAULT_VALUE_MAP.get(variable.type)
+                    ))
+    return variables_dict
+
+
+def _build_workflow(node_count: int) -> list[tuple[NodeResult, list[VariableEntity]]]:
+    """构建线性工作流，每个节点输出一个变量，并随机引用若干个上游节点的输出"""
+    rng = random.Random(node_count)
+    nodes = []
+    for index in range(node_count):
+        node_data = BaseNodeData(id=uuid.uuid4(), node_type=NodeType.CODE, title=f"node_{index}")
+        variables = [
+            VariableEntity(
+                name=f"var_{ref_index}",
+                value={
+                    "type": VariableValueType.REF,
+                    "content": {"ref_node_id": nodes[ref_index][0].node_data.id, "ref_var_name": "output"},
+                },
+            )
+            for ref_index in rng.sample(range(index), min(index, REF_COUNT_PER_NODE))
+        ]
+        node_result = NodeResult(
+            node_data=node_data,
+            status=NodeStatus.SUCCEEDED,
+            outputs={"output": f"output_{index}"},
+        )
+        nodes.append((node_result, variables))
+    return nodes
+
+
+def _run_workflow(nodes, process_node_results, extract_variables) -> tuple[float, list[dict[str, Any]]]:
+    """模拟工作流逐个节点运行：提取引用变量后将节点结果归纳进状态，返回耗时与每个节点提取到的变量"""
+    state = {"node_results": []}
+    extracted = []
+    start_at = time.perf_counter()
+    for node_result, variables in nodes:
+        extracted.append(extract_variables(variables, state))
+        state["node_results"] = process_node_results(state["node_results"], [node_result])
+    return time.perf_counter() - start_at, extracted
+
+
+@pytest.mark.parametrize("node_count", [100, 500])
+def test_extract_variables_benchmark(node_count):
+    nodes = _build_workflow(node_count)
+
+    legacy_latency, legacy_extracted = _run_workflow(
+        nodes, _legacy_process_node_results, _legacy_extract_variables_from_state,
+    )
+    latency, extracted = _run_workflow(nodes, _process_node_results, extract_variables_from_state)
+    print(f"\n{node_count}个节点: 优化前 {legacy_latency * 1000:.2f}ms, 优化后 {latency * 1000:.2f}ms")
+
+    # 优化前后提取到的变量必须一致，节点数量较多时索引查找应明显快于线性遍历
+    assert extracted == legacy_extracted
+    if node_count >= 500:
+        assert latency < legacy_latency
+
+
+def test_node_results_last_result_wins():
+    node_data = BaseNodeData(id=uuid.uuid4(), node_type=NodeType.CODE)
+    first = NodeResult(node_data=node_data, outputs={"output": "first"})
+    last = NodeResult(node_data=node_data, outputs={"output": "last"})
+
+    node_results = _process_node_results([first], [last])
+
+    assert isinstance(node_results, NodeResults)
+    assert list(node_results) == [first, last]
+    assert node_results.get_by_node_id(node_data.id) is last
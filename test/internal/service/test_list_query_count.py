@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 21:50
+@Author : caixiaorong01@outlook.com
+@File   : test_list_query_count.py
+"""
+import uuid
+from types import SimpleNamespace
+from typing import Callable
+
+from flask import request
+
+from app.http.module import injector
+from internal.entity.app_entity import AppConfigType, AppStatus
+from internal.model import App, AppConfig, AppConfigVersion, AppDatasetJoin, Dataset, Document, Segment
+from internal.schema.app_schema import GetAppsWithPageReq, GetAppsWithPageResp
+from internal.schema.dataset_schema import GetDatasetsWithPageReq, GetDatasetsWithPageResp
+from internal.schema.document_schema import GetDocumentsWithPageReq, GetDocumentsWithPageResp
+from internal.service import AppService, DatasetService, DocumentService
+from pkg.sqlalchemy import count_queries
+
+# 多行数据的数量，需要小于默认分页条数
+ROW_COUNT = 10
+
+
+def _count_list_queries(app, db, list_rows: Callable[[], list], resp_cls) -> int:
+    """统计列表接口(服务查询+响应序列化)执行的SQL数量"""
+    with app.test_request_context():
+        with count_queries(db.engine) as counter:
+            resp_cls(many=True).dump(list_rows())
+    return counter.count
+
+
+def _create_dataset(db, account_id: uuid.UUID, index: int) -> Dataset:
+    """创建知识库，并为其添加文档、片段及关联应用"""
+    dataset = Dataset(account_id=account_id, name=f"dataset_{index}")
+    db.session.add(dataset)
+    db.session.flush()
+
+    document = Document(
+        account_id=account_id,
+        dataset_id=dataset.id,
+        upload_file_id=uuid.uuid4(),
+        process_rule_id=uuid.uuid4(),
+        name=f"document_{index}",
+        character_count=100,
+    )
+    db.session.add(document)
+    db.session.flush()
+
+    db.session.add(Segment(
+        account_id=account_id,
+        dataset_id=dataset.id,
+        document_id=document.id,
+        node_id=uuid.uuid4(),
+        hit_count=1,
+    ))
+    db.session.add(AppDatasetJoin(app_id=uuid.uuid4(), dataset_id=dataset.id))
+    db.session.flush()
+    return dataset
+
+
+def _create_app(db, account_id: uuid.UUID, index: int) -> App:
+    """创建应用，偶数为已发布应用，奇数为草稿应用，均带有草稿配置"""
+    app = App(account_id=account_id, name=f"app_{index}", status=AppStatus.DRAFT)
+    db.session.add(app)
+    db.session.flush()
+
+    db.session.add(AppConfigVersion(app_id=app.id, config_type=AppConfigType.DRAFT))
+    if index % 2 == 0:
+        app_config = AppConfig(app_id=app.id)
+        db.session.add(app_config)
+        db.session.flush()
+        app.app_config_id = app_config.id
+        app.status = AppStatus.PUBLISHED
+    db.session.flush()
+    return app
+
+
+def test_get_datasets_with_page_query_count(app, db):
+    dataset_service = injector.get(DatasetService)
+
+    query_counts = []
+    for row_count in (1, ROW_COUNT):
+        account = SimpleNamespace(id=uuid.uuid4())
+        for index in range(row_count):
+            _create_dataset(db, account.id, index)
+
+        query_counts.append(_count_list_queries(
+            app, db,
+            lambda: dataset_service.get_datasets_with_page(GetDatasetsWithPageReq(request.args), account)[0],
+            GetDatasetsWithPageResp,
+        ))
+
+    assert query_counts[0] == query_counts[1]
+
+
+def test_get_documents_with_page_query_count(app, db):
+    document_service = injector.get(DocumentService)
+
+    query_counts = []
+    for row_count in (1, ROW_COUNT):
+        account = SimpleNamespace(id=uuid.uuid4())
+        dataset = _create_dataset(db, account.id, 0)
+        for index in range(1, row_count):
+            db.session.add(Document(
+                account_id=account.id,
+                dataset_id=dataset.id,
+                upload_file_id=uuid.uuid4(),
+                process_rule_id=uuid.uuid4(),
+                name=f"document_{index}",
+            ))
+        db.session.flush()
+
+        query_counts.append(_count_list_queries(
+            app, db,
+            lambda: document_service.get_document_with_page(
+                dataset.id, GetDocumentsWithPageReq(request.args), account,
+            )[0],
+            GetDocumentsWithPageResp,
+        ))
+
+    assert query_counts[0] == query_counts[1]
+
+
+def test_get_apps_with_page_query_count(app, db):
+    app_service = injector.get(AppService)
+
+    query_counts = []
+    for row_count in (1, ROW_COUNT):
+        account = SimpleNamespace(id=uuid.uuid4())
+        for index in range(row_count):
+            _create_app(db, account.id, index)
+
+        query_counts.append(_count_list_queries(
+            app, db,
+            lambda: app_service.get_apps_with_page(GetAppsWithPageReq(request.args), account)[0],
+            GetAppsWithPageResp,
+        ))
+
+    assert query_counts[0] == query_counts[1]
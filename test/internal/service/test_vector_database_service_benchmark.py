@@ -0,0 +1,58 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+# Copyright [2025] [caixiaorong]
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+"""
+@Time   : 2026/10/18 21:35
+@Author : caixiaorong01@outlook.com
+@File   : test_vector_database_service_benchmark.py
+"""
+import time
+
+from langchain_weaviate import WeaviateVectorStore
+from weaviate import WeaviateClient
+
+from app.http.module import injector
+from internal.service import VectorDatabaseService
+from internal.service.vector_database_service import COLLECTION_NAME
+
+# 每种方式获取向量数据库的次数
+QUERY_COUNT = 20
+
+
+def test_vector_store_per_query_overhead(app):
+    """对比每次查询新建客户端+向量数据库与进程内共享客户端的单次查询额外开销"""
+    with app.app_context():
+        vector_database_service = injector.get(VectorDatabaseService)
+        weaviate_config = vector_database_service.weaviate.weaviate_config
+        embeddings = vector_database_service.embeddings_service.cache_backed_embeddings
+
+        # 1.优化前：每个应用上下文新建并连接客户端，每次访问都构建向量数据库(包含集合是否存在的检查)，最后关闭客户端
+        start_at = time.perf_counter()
+        for _ in range(QUERY_COUNT):
+            client = WeaviateClient(**weaviate_config)
+            client.connect()
+            WeaviateVectorStore(client=client, index_name=COLLECTION_NAME, text_key="text", embedding=embeddings)
+            client.close()
+        legacy_latency = (time.perf_counter() - start_at) / QUERY_COUNT
+
+        # 2.优化后：进程内共享客户端与向量数据库，首次访问完成连接后不计入统计
+        vector_database_service.vector_store
+        start_at = time.perf_counter()
+        for _ in range(QUERY_COUNT):
+            vector_database_service.vector_store
+        latency = (time.perf_counter() - start_at) / QUERY_COUNT
+
+    print(f"\n单次查询额外开销: 优化前 {legacy_latency * 1000:.2f}ms, 优化后 {latency * 1000:.3f}ms")
+    assert latency < legacy_latency